@@ -1,22 +1,234 @@
 from PyQt5.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
-    QFrame, QLineEdit, QComboBox, QMessageBox, QFileDialog, QCheckBox
+    QApplication, QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+    QFrame, QLineEdit, QComboBox, QMessageBox, QFileDialog, QCheckBox, QProgressDialog,
+    QTreeWidget, QTreeWidgetItem, QListWidget, QListWidgetItem, QShortcut, QFormLayout, QHeaderView
 )
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont
-from utils import AnimatedButton, FlashcardDialog
-import json
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont, QKeySequence
+from utils import AnimatedButton, FlashcardDialog, CodeDelegate, ThumbnailCache, ThumbnailDelegate
+from exporter import detect_format, export_cards
+from data import read_cards
+from related import RELATED_COUNT
+from batch import BatchEdit, CASE_MODES
+import bisect
+
+EXPORT_FILTER_FORMATS = {
+    "JSON Files (*.json)": ("json", False),
+    "NDJSON Files (*.ndjson)": ("ndjson", False),
+    "CSV Files (*.csv)": ("csv", False),
+    "Gzipped JSON (*.json.gz)": ("json", True),
+    "Gzipped NDJSON (*.ndjson.gz)": ("ndjson", True),
+}
+EXPORT_FILTERS = ";;".join(EXPORT_FILTER_FORMATS)
+IMPORT_FILTERS = "Flashcard Files (*.json *.ndjson *.jsonl *.csv *.gz);;All Files (*)"
+TAG_FILTER_HELP = "Combine tags with AND, OR, NOT and parentheses"
+BATCH_PREVIEW_ROWS = 200
+BATCH_PREVIEW_DELAY_MS = 300
+BATCH_PREVIEW_SCAN = 20000  # cards the live preview plans at most; the full scope is planned on apply
+DIFF_REFRESH_ROWS = 500  # larger diffs redraw the table once instead of moving rows one at a time
+
+class DuplicateReviewDialog(QDialog):
+    """Lists near-duplicate clusters; checked clusters are merged into their first card."""
+    def __init__(self, parent, clusters):
+        super().__init__(parent)
+        self.setWindowTitle("🧬 Near-Duplicate Cards")
+        self.resize(800, 500)
+        self.clusters = clusters
+        layout = QVBoxLayout()
+        layout.setSpacing(12)
+
+        duplicates = sum(len(cluster) - 1 for cluster in clusters)
+        summary = QLabel(f"{len(clusters)} clusters, {duplicates} duplicate cards. "
+                         "Merging keeps the first card of each checked cluster.")
+        summary.setStyleSheet("color: #1e293b; font-size: 14px;")
+        layout.addWidget(summary)
+
+        self.tree = QTreeWidget()
+        self.tree.setColumnCount(3)
+        self.tree.setHeaderLabels(["Question", "Answer", "Similarity"])
+        self.tree.setColumnWidth(0, 380)
+        self.tree.setColumnWidth(1, 260)
+        for cluster in clusters:
+            keeper = cluster[0][0]
+            top = QTreeWidgetItem([keeper["question"], keeper["answer"], f"{len(cluster)} cards"])
+            top.setFlags(top.flags() | Qt.ItemIsUserCheckable)
+            top.setCheckState(0, Qt.Checked)
+            for card, similarity in cluster[1:]:
+                QTreeWidgetItem(top, [card["question"], card["answer"], f"{similarity:.0%}"])
+            self.tree.addTopLevelItem(top)
+        layout.addWidget(self.tree)
+
+        button_layout = QHBoxLayout()
+        merge_button = AnimatedButton("🧬 Merge Checked", "green")
+        merge_button.clicked.connect(self.accept)
+        cancel_button = AnimatedButton("❌ Cancel", "red")
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(merge_button)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+    def checked_clusters(self):
+        return [cluster for i, cluster in enumerate(self.clusters)
+                if self.tree.topLevelItem(i).checkState(0) == Qt.Checked]
+
+class BatchEditDialog(QDialog):
+    """Find/replace, trim, case and tag changes over a set of cards, with a preview of the result."""
+    def __init__(self, parent, scopes):
+        super().__init__(parent)
+        self.setWindowTitle("🧰 Batch Edit")
+        self.resize(900, 600)
+        self.scopes = scopes  # label -> cards
+        self.edit = None
+        self.cards = []
+        self.changes = []  # None when the preview only planned part of the scope
+        layout = QVBoxLayout()
+        layout.setSpacing(10)
+
+        form = QFormLayout()
+        self.scope_combo = QComboBox()
+        self.scope_combo.addItems([f"{label} ({len(cards)})" for label, cards in scopes.items()])
+        form.addRow("Apply to:", self.scope_combo)
+        self.find_input = QLineEdit()
+        self.replace_input = QLineEdit()
+        find_row = QHBoxLayout()
+        find_row.addWidget(self.find_input)
+        self.regex_check = QCheckBox("Regular expression")
+        self.case_sensitive_check = QCheckBox("Match case")
+        self.case_sensitive_check.setChecked(True)
+        find_row.addWidget(self.regex_check)
+        find_row.addWidget(self.case_sensitive_check)
+        form.addRow("Find:", find_row)
+        form.addRow("Replace with:", self.replace_input)
+        text_row = QHBoxLayout()
+        self.question_check = QCheckBox("Questions")
+        self.answer_check = QCheckBox("Answers")
+        self.question_check.setChecked(True)
+        self.answer_check.setChecked(True)
+        self.trim_check = QCheckBox("Trim whitespace")
+        self.case_combo = QComboBox()
+        self.case_combo.addItems(["Keep case"] + [f"{mode} case" for mode in CASE_MODES])
+        for widget in (self.question_check, self.answer_check, self.trim_check, self.case_combo):
+            text_row.addWidget(widget)
+        text_row.addStretch()
+        form.addRow("Text:", text_row)
+        self.add_tags_input = QLineEdit()
+        self.add_tags_input.setPlaceholderText("comma-separated")
+        self.remove_tags_input = QLineEdit()
+        self.remove_tags_input.setPlaceholderText("comma-separated")
+        form.addRow("Add tags:", self.add_tags_input)
+        form.addRow("Remove tags:", self.remove_tags_input)
+        layout.addLayout(form)
+
+        self.summary = QLabel()
+        self.summary.setStyleSheet("color: #1e293b; font-size: 14px;")
+        layout.addWidget(self.summary)
+        self.preview = QTableWidget()
+        self.preview.setColumnCount(3)
+        self.preview.setHorizontalHeaderLabels(["Question", "Answer", "Tags"])
+        self.preview.horizontalHeader().setStretchLastSection(True)
+        self.preview.setColumnWidth(0, 330)
+        self.preview.setColumnWidth(1, 330)
+        self.preview.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.preview)
+
+        button_layout = QHBoxLayout()
+        self.apply_button = AnimatedButton("✅ Apply", "green")
+        self.apply_button.clicked.connect(self.apply)
+        cancel_button = AnimatedButton("❌ Cancel", "red")
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(self.apply_button)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        # The preview waits for typing to pause and plans only what it can show.
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(BATCH_PREVIEW_DELAY_MS)
+        self.preview_timer.timeout.connect(self.update_preview)
+        for line_edit in (self.find_input, self.replace_input, self.add_tags_input, self.remove_tags_input):
+            line_edit.textChanged.connect(self.preview_timer.start)
+        for check in (self.regex_check, self.case_sensitive_check, self.question_check, self.answer_check,
+                      self.trim_check):
+            check.toggled.connect(self.preview_timer.start)
+        for combo in (self.scope_combo, self.case_combo):
+            combo.currentIndexChanged.connect(self.preview_timer.start)
+        self.update_preview()
+
+    def batch_edit(self):
+        """The BatchEdit described by the form; raises ValueError if it is invalid."""
+        case_index = self.case_combo.currentIndex()
+        return BatchEdit(
+            self.find_input.text(), self.replace_input.text(), regex=self.regex_check.isChecked(),
+            match_case=self.case_sensitive_check.isChecked(),
+            fields=[field for field, check in (("question", self.question_check), ("answer", self.answer_check))
+                    if check.isChecked()],
+            trim=self.trim_check.isChecked(), case=list(CASE_MODES)[case_index - 1] if case_index else None,
+            add_tags=self.add_tags_input.text(), remove_tags=self.remove_tags_input.text())
+
+    def update_preview(self):
+        """Plan the first changes of the edit and show them as before → after.
+
+        Planning stops once the preview is full or BATCH_PREVIEW_SCAN cards
+        were looked at, so typing stays responsive on a large deck; the
+        complete plan is then made when the edit is applied.
+        """
+        self.preview_timer.stop()
+        self.edit, self.changes = None, []
+        self.preview.setRowCount(0)
+        try:
+            edit = self.batch_edit()
+            cards = list(self.scopes.values())[self.scope_combo.currentIndex()]
+            sample = cards[:BATCH_PREVIEW_SCAN]
+            changes, emptied = ([], []) if edit.is_empty() else edit.plan(sample, limit=BATCH_PREVIEW_ROWS + 1)
+        except ValueError as e:
+            self.summary.setText(f"⚠️ {e}")
+            self.apply_button.setEnabled(False)
+            return
+        self.edit, self.cards = edit, cards
+        complete = edit.is_empty() or (len(changes) <= BATCH_PREVIEW_ROWS and len(sample) == len(cards))
+        self.changes = changes if complete else None
+        if complete:
+            text = f"{len(changes)} of {len(cards)} cards will change."
+        elif len(changes) > BATCH_PREVIEW_ROWS:
+            text = (f"More than {BATCH_PREVIEW_ROWS} of {len(cards)} cards will change; showing the first "
+                    f"{BATCH_PREVIEW_ROWS}. The rest are worked out when you apply.")
+        else:
+            text = (f"{len(changes)} of the first {len(sample)} cards will change; the other "
+                    f"{len(cards) - len(sample)} are checked when you apply.")
+        if emptied:
+            text += f" {len(emptied)} skipped because a question or answer would become empty."
+        self.summary.setText(text)
+        self.apply_button.setEnabled(bool(changes) or not complete)
+        shown = changes[:BATCH_PREVIEW_ROWS]
+        self.preview.setRowCount(len(shown))
+        for row, (card, fields) in enumerate(shown):
+            pairs = ((card["question"], fields["question"]), (card["answer"], fields["answer"]),
+                     (", ".join(card.get("tags", ())), ", ".join(fields.get("tags", ()))))
+            for column, (before, after) in enumerate(pairs):
+                text = before if before == after else f"{before}  →  {after}"
+                self.preview.setItem(row, column, QTableWidgetItem(text))
+
+    def apply(self):
+        if self.preview_timer.isActive():
+            self.update_preview()
+        if self.edit is not None and (self.changes is None or self.changes):
+            self.accept()
 
 class AdminPanel(QDialog):
     """Modern admin panel for flashcard management with enhanced features."""
-    def __init__(self, parent=None, data=None):
+    def __init__(self, parent=None, deck=None):
         super().__init__(parent)
         self.setWindowTitle("Admin Panel")
         self.resize(900, 650)
-        self.data = data
+        # Card changes go through the deck so its indexes stay in sync; see deck.py.
+        self.deck = deck
+        self.data = deck.data
         self.parent_app = parent
+        self.tag_mask = None
+        self.visible_ids = []
         self.sort_order = Qt.AscendingOrder
-        self.sort_column = 1  # Default sort by question
         self.setup_ui()
 
     def setup_ui(self):
@@ -58,8 +270,17 @@ class AdminPanel(QDialog):
             }
         """)
         self.search_input.textChanged.connect(self.filter_table)
+        tag_label = QLabel("🏷️ Tags:")
+        tag_label.setStyleSheet("color: #1e293b; font-weight: bold; font-size: 14px;")
+        self.tag_input = QLineEdit()
+        self.tag_input.setPlaceholderText("python AND recursion NOT beginner")
+        self.tag_input.setToolTip(TAG_FILTER_HELP)
+        self.tag_input.setStyleSheet(self.search_input.styleSheet())
+        self.tag_input.textChanged.connect(self.filter_table)
         search_layout.addWidget(search_label)
-        search_layout.addWidget(self.search_input)
+        search_layout.addWidget(self.search_input, 2)
+        search_layout.addWidget(tag_label)
+        search_layout.addWidget(self.tag_input, 1)
         layout.addWidget(search_frame)
 
         # Sort controls
@@ -83,10 +304,20 @@ class AdminPanel(QDialog):
         self.sort_button = AnimatedButton("↕️ Toggle Sort", "purple")
         self.sort_button.setToolTip("Toggle between ascending and descending order")
         self.sort_button.clicked.connect(self.toggle_sort)
+        self.sort_combo.currentIndexChanged.connect(self.sort_table)
         sort_layout.addWidget(sort_label)
         sort_layout.addWidget(self.sort_combo)
         sort_layout.addWidget(self.sort_button)
         sort_layout.addStretch()
+        self.undo_button = AnimatedButton("↶ Undo", "blue")
+        self.undo_button.clicked.connect(self.undo)
+        self.redo_button = AnimatedButton("↷ Redo", "blue")
+        self.redo_button.clicked.connect(self.redo)
+        sort_layout.addWidget(self.undo_button)
+        sort_layout.addWidget(self.redo_button)
+        QShortcut(QKeySequence("Ctrl+Z"), self, self.undo)
+        for keys in ("Ctrl+Y", "Ctrl+Shift+Z"):
+            QShortcut(QKeySequence(keys), self, self.redo)
         layout.addWidget(sort_frame)
 
         # Button frame
@@ -110,11 +341,17 @@ class AdminPanel(QDialog):
         self.refresh_button.setToolTip("Refresh the flashcard table")
         self.refresh_button.clicked.connect(self.refresh_table)
         self.export_button = AnimatedButton("📤 Export", "teal")
-        self.export_button.setToolTip("Export flashcards to JSON")
+        self.export_button.setToolTip("Export the flashcards shown in the table to JSON, NDJSON or CSV")
         self.export_button.clicked.connect(self.export_flashcards)
         self.import_button = AnimatedButton("📥 Import", "blue")
         self.import_button.setToolTip("Import flashcards from JSON")
         self.import_button.clicked.connect(self.import_flashcards)
+        self.duplicates_button = AnimatedButton("🧬 Duplicates", "orange")
+        self.duplicates_button.setToolTip("Find and merge near-duplicate flashcards")
+        self.duplicates_button.clicked.connect(self.find_duplicates)
+        self.batch_button = AnimatedButton("🧰 Batch Edit", "purple")
+        self.batch_button.setToolTip("Find/replace, trim, change case or tags across the shown or checked cards")
+        self.batch_button.clicked.connect(self.batch_edit)
 
         button_layout.addWidget(self.add_button)
         button_layout.addWidget(self.edit_button)
@@ -123,13 +360,15 @@ class AdminPanel(QDialog):
         button_layout.addWidget(self.refresh_button)
         button_layout.addWidget(self.export_button)
         button_layout.addWidget(self.import_button)
+        button_layout.addWidget(self.duplicates_button)
+        button_layout.addWidget(self.batch_button)
         layout.addWidget(button_frame)
 
         # Table
         self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["Select", "#", "Question", "Answer"])
-        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setColumnCount(6)
+        self.table.setHorizontalHeaderLabels(["Select", "#", "Question", "Answer", "Tags", "🖼️"])
+        self.table.horizontalHeader().setSectionResizeMode(4, QHeaderView.Stretch)
         self.table.setStyleSheet("""
             QTableWidget {
                 background: white;
@@ -157,9 +396,32 @@ class AdminPanel(QDialog):
             }
         """)
         self.table.setColumnWidth(0, 50)  # Narrow column for checkboxes
+        self.table.setItemDelegate(CodeDelegate(self.table))
+        # Thumbnails are decoded in the background, only for the rows that get painted.
+        self.thumbnails = ThumbnailCache(self.deck.media, parent=self)
+        self.table.setItemDelegateForColumn(5, ThumbnailDelegate(self.table, self.thumbnails))
+        self.table.setColumnWidth(5, self.thumbnails.bound.width() + 16)
         self.table.setSelectionBehavior(QTableWidget.SelectRows)  # Ensure row selection
+        self.table.currentCellChanged.connect(lambda row, *_: self.show_related(row))
         layout.addWidget(self.table)
 
+        # Related cards for the current row
+        related_label = QLabel("🔗 Related cards:")
+        related_label.setStyleSheet("color: #1e293b; font-weight: bold; font-size: 14px;")
+        layout.addWidget(related_label)
+        self.related_list = QListWidget()
+        self.related_list.setMaximumHeight(110)
+        self.related_list.setStyleSheet("""
+            QListWidget {
+                background: white;
+                border: 2px solid #d1d9e6;
+                border-radius: 8px;
+                font-size: 13px;
+            }
+        """)
+        self.related_list.itemDoubleClicked.connect(self.select_related)
+        layout.addWidget(self.related_list)
+
         # Close button
         close_button = AnimatedButton("🚪 Close", "teal")
         close_button.setToolTip("Close the admin panel")
@@ -169,56 +431,194 @@ class AdminPanel(QDialog):
         self.setLayout(layout)
         self.refresh_table()
 
+    @property
+    def indexes(self):
+        return self.deck.indexes
+
+    def done(self, result):
+        self.thumbnails.close()
+        super().done(result)
+
     def refresh_table(self):
         """Refresh the table with current flashcards."""
-        self.table.setRowCount(len(self.data["flashcards"]))
-        for i, card in enumerate(self.data["flashcards"]):
-            # Checkbox column
-            checkbox = QTableWidgetItem()
-            checkbox.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
-            checkbox.setCheckState(Qt.Unchecked)
-            self.table.setItem(i, 0, checkbox)
-            # Other columns
-            self.table.setItem(i, 1, QTableWidgetItem(str(i + 1)))
-            self.table.setItem(i, 2, QTableWidgetItem(card["question"]))
-            self.table.setItem(i, 3, QTableWidgetItem(card["answer"]))
-        self.sort_table()
+        self.filter_table()
+        self.update_history_buttons()
+
+    def update_history_buttons(self):
+        history = self.deck.history
+        self.undo_button.setEnabled(history.can_undo())
+        self.undo_button.setToolTip(f"Undo {history.undo_label()} (Ctrl+Z)" if history.can_undo()
+                                    else "Nothing to undo")
+        self.redo_button.setEnabled(history.can_redo())
+        self.redo_button.setToolTip(f"Redo {history.redo_label()} (Ctrl+Y)" if history.can_redo()
+                                    else "Nothing to redo")
+
+    def undo(self):
+        """Revert the last edit, updating only the rows it touched."""
+        self.apply_history_step(self.run_with_progress("Undoing...", lambda _report: self.deck.undo()))
+
+    def redo(self):
+        """Reapply the last undone edit."""
+        self.apply_history_step(self.run_with_progress("Redoing...", lambda _report: self.deck.redo()))
+
+    def run_with_progress(self, text, action):
+        """Call `action(report)` behind a progress dialog that deck edits made meanwhile report to as well."""
+        progress = QProgressDialog(text, None, 0, 0, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+
+        def report(done, total):
+            progress.setMaximum(total)
+            progress.setValue(done)
+            QApplication.processEvents()
+
+        self.deck.progress = report
+        try:
+            return action(report)
+        finally:
+            self.deck.progress = None
+            progress.reset()
+
+    def apply_history_step(self, step):
+        if step is None:
+            return
+        _label, diff = step
+        self.parent_app.save_data()
+        if self.parent_app.admin_panel is self:
+            self.parent_app.apply_card_diff(diff)
+        else:
+            self.apply_card_diff(diff)
+        self.update_history_buttons()
+
+    def set_table_row(self, row, card):
+        """Fill one table row; the checkbox item carries the card id."""
+        checkbox = QTableWidgetItem()
+        checkbox.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
+        checkbox.setCheckState(Qt.Unchecked)
+        checkbox.setData(Qt.UserRole, card["id"])
+        self.table.setItem(row, 0, checkbox)
+        self.table.setItem(row, 1, QTableWidgetItem(str(row + 1)))
+        self.table.setItem(row, 2, QTableWidgetItem(card["question"]))
+        self.table.setItem(row, 3, QTableWidgetItem(card["answer"]))
+        self.table.setItem(row, 4, QTableWidgetItem(", ".join(card.get("tags", ()))))
+        media = card.get("media", ())
+        media_item = QTableWidgetItem()
+        if media:
+            media_item.setData(Qt.UserRole, media[0])
+            media_item.setToolTip(f"{len(media)} images")
+        self.table.setItem(row, 5, media_item)
+
+    def matches_search(self, card):
+        return self.deck.matches_text(card, self.search_input.text())
+
+    def matches_filter(self, card):
+        """Whether a card passes both the tag filter and the text search."""
+        if self.tag_mask is not None and not self.indexes["tags"].contains(self.tag_mask, card["id"]):
+            return False
+        return self.matches_search(card)
+
+    def sort_field(self):
+        return "question" if self.sort_combo.currentIndex() == 0 else "answer"
+
+    def sort_index(self):
+        return self.indexes[self.sort_field()]
 
     def filter_table(self):
-        """Filter table based on search input."""
-        search_text = self.search_input.text().lower()
-        filtered_cards = [
-            card for card in self.data["flashcards"]
-            if search_text in card["question"].lower() or search_text in card["answer"].lower()
-        ]
-        self.table.setRowCount(len(filtered_cards))
-        for i, card in enumerate(filtered_cards):
-            checkbox = QTableWidgetItem()
-            checkbox.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
-            checkbox.setCheckState(Qt.Unchecked)
-            self.table.setItem(i, 0, checkbox)
-            self.table.setItem(i, 1, QTableWidgetItem(str(i + 1)))
-            self.table.setItem(i, 2, QTableWidgetItem(card["question"]))
-            self.table.setItem(i, 3, QTableWidgetItem(card["answer"]))
-        self.sort_table()
+        """Show the cards matching the tag filter and search in the presorted order."""
+        try:
+            self.tag_mask = self.deck.tag_mask(self.tag_input.text())
+        except ValueError as e:
+            self.tag_input.setToolTip(f"Invalid tag filter: {e}")
+            return
+        self.tag_input.setToolTip(TAG_FILTER_HELP)
+        self.visible_ids = self.deck.search(self.search_input.text(), self.tag_mask, self.sort_field(),
+                                            reverse=self.sort_order == Qt.DescendingOrder)
+        self.table.setRowCount(len(self.visible_ids))
+        for i, card_id in enumerate(self.visible_ids):
+            self.set_table_row(i, self.indexes.by_id[card_id])
+
+    def apply_card_diff(self, diff):
+        """Update only the rows touched by an external change, keeping the sort order."""
+        if len(diff["added"]) + len(diff["updated"]) + len(diff["removed"]) > DIFF_REFRESH_ROWS:
+            self.filter_table()
+            return
+        changed = set(diff["removed"]) | {card["id"] for card in diff["updated"]}
+        first_row = len(self.visible_ids)
+        for row in reversed([row for row, card_id in enumerate(self.visible_ids) if card_id in changed]):
+            self.table.removeRow(row)
+            del self.visible_ids[row]
+            first_row = row
+        index = self.sort_index()
+        descending = self.sort_order == Qt.DescendingOrder
+        sort_keys = [index.sort_key(card_id) for card_id in self.visible_ids]
+        if descending:
+            sort_keys.reverse()
+        for card in diff["updated"] + diff["added"]:
+            if not self.matches_filter(card):
+                continue
+            key = index.sort_key(card["id"])
+            position = bisect.bisect_left(sort_keys, key)
+            sort_keys.insert(position, key)
+            row = len(sort_keys) - 1 - position if descending else position
+            self.visible_ids.insert(row, card["id"])
+            self.table.insertRow(row)
+            self.set_table_row(row, card)
+            first_row = min(first_row, row)
+        for row in range(first_row, self.table.rowCount()):
+            self.table.item(row, 1).setText(str(row + 1))
+
+    def show_related(self, row):
+        """List the cards most similar to the card in `row`."""
+        self.related_list.clear()
+        card = self.card_at(row) if 0 <= row < self.table.rowCount() else None
+        if card is None:
+            return
+        index = self.indexes["related"]
+        if not index.ready:
+            item = QListWidgetItem("Still indexing the deck for related cards…")
+            item.setFlags(Qt.NoItemFlags)
+            self.related_list.addItem(item)
+            return
+        for card_id, score in index.related([card["id"]], RELATED_COUNT).get(card["id"], []):
+            related = self.indexes.by_id.get(card_id)
+            if related is None:
+                continue
+            item = QListWidgetItem(f"{score:.0%}  {related['question']}  →  {related['answer']}")
+            item.setData(Qt.UserRole, card_id)
+            self.related_list.addItem(item)
+
+    def select_related(self, item):
+        """Jump to a related card's row if it is shown in the table."""
+        card_id = item.data(Qt.UserRole)
+        if card_id in self.visible_ids:
+            self.table.selectRow(self.visible_ids.index(card_id))
 
     def sort_table(self):
-        """Sort table based on selected column and order."""
-        column = self.sort_combo.currentIndex() + 2  # 2 for Question, 3 for Answer
-        self.table.sortItems(column, self.sort_order)
+        """Show the current view in the selected order; a lookup in the presorted index."""
+        self.filter_table()
 
     def toggle_sort(self):
         """Toggle sort order between ascending and descending."""
         self.sort_order = Qt.DescendingOrder if self.sort_order == Qt.AscendingOrder else Qt.AscendingOrder
         self.sort_table()
 
+    def checked_ids(self):
+        """Ids of the cards whose row checkbox is ticked."""
+        checked = [self.table.item(row, 0).data(Qt.UserRole) for row in range(self.table.rowCount())
+                   if self.table.item(row, 0).checkState() == Qt.Checked]
+        return [card_id for card_id in checked if card_id in self.indexes.by_id]
+
+    def card_at(self, row):
+        """The card shown in a table row, looked up by id."""
+        return self.indexes.by_id.get(self.table.item(row, 0).data(Qt.UserRole))
+
     def add_flashcard(self):
         """Add a new flashcard."""
-        dialog = FlashcardDialog(self)
+        dialog = FlashcardDialog(self, store=self.deck.media)
         if dialog.exec_():
             question, answer = dialog.get_data()
             if question and answer:
-                self.data["flashcards"].append({"question": question, "answer": answer})
+                self.deck.add_card(question, answer, dialog.get_tags(), dialog.get_media())
                 self.parent_app.save_data()
                 self.refresh_table()
                 QMessageBox.information(self, "Success", "Flashcard added successfully!")
@@ -236,21 +636,16 @@ class AdminPanel(QDialog):
             QMessageBox.warning(self, "Error", "Please select a flashcard to edit.")
             return
             
-        # Find original card index
-        question = self.table.item(current_row, 2).text()
-        answer = self.table.item(current_row, 3).text()
-        original_index = next((i for i, card in enumerate(self.data["flashcards"])
-                             if card["question"] == question and card["answer"] == answer), None)
-        if original_index is None:
+        card = self.card_at(current_row)
+        if card is None:
             QMessageBox.warning(self, "Error", "Selected flashcard not found in data.")
             return
-        card = self.data["flashcards"][original_index]
-        dialog = FlashcardDialog(self, card["question"], card["answer"], edit_mode=True)
+        dialog = FlashcardDialog(self, card["question"], card["answer"], edit_mode=True,
+                                 tags=card.get("tags", ()), media=card.get("media", ()), store=self.deck.media)
         if dialog.exec_():
             question, answer = dialog.get_data()
             if question and answer:
-                self.data["flashcards"][original_index]["question"] = question
-                self.data["flashcards"][original_index]["answer"] = answer
+                self.deck.update_card(card, question, answer, dialog.get_tags(), dialog.get_media())
                 self.parent_app.save_data()
                 self.refresh_table()
                 QMessageBox.information(self, "Success", "Flashcard updated successfully!")
@@ -271,13 +666,9 @@ class AdminPanel(QDialog):
                                    f"Are you sure you want to delete the flashcard:\n'{question}'?",
                                    QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
-            # Find original card index
-            question = self.table.item(current_row, 2).text()
-            answer = self.table.item(current_row, 3).text()
-            original_index = next((i for i, card in enumerate(self.data["flashcards"])
-                                if card["question"] == question and card["answer"] == answer), None)
-            if original_index is not None:
-                self.data["flashcards"].pop(original_index)
+            card = self.card_at(current_row)
+            if card is not None:
+                self.deck.remove_cards([card["id"]])
                 self.parent_app.save_data()
                 self.refresh_table()
                 QMessageBox.information(self, "Success", "Flashcard deleted successfully!")
@@ -286,58 +677,117 @@ class AdminPanel(QDialog):
 
     def delete_selected_flashcards(self):
         """Delete all selected flashcards."""
-        selected_indices = []
-        for row in range(self.table.rowCount()):
-            if self.table.item(row, 0).checkState() == Qt.Checked:
-                question = self.table.item(row, 2).text()
-                answer = self.table.item(row, 3).text()
-                original_index = next((i for i, card in enumerate(self.data["flashcards"])
-                                    if card["question"] == question and card["answer"] == answer), None)
-                if original_index is not None:
-                    selected_indices.append(original_index)
-        
-        if not selected_indices:
+        selected_ids = self.checked_ids()
+
+        if not selected_ids:
             QMessageBox.warning(self, "Error", "No flashcards selected.")
             return
 
         reply = QMessageBox.question(self, "Delete Confirmation",
-                                   f"Are you sure you want to delete {len(selected_indices)} selected flashcards?",
+                                   f"Are you sure you want to delete {len(selected_ids)} selected flashcards?",
                                    QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
-            # Sort indices in descending order to avoid index shifting
-            selected_indices.sort(reverse=True)
-            for index in selected_indices:
-                self.data["flashcards"].pop(index)
+            self.deck.remove_cards(selected_ids)
             self.parent_app.save_data()
             self.refresh_table()
-            QMessageBox.information(self, "Success", f"{len(selected_indices)} flashcards deleted successfully!")
+            QMessageBox.information(self, "Success", f"{len(selected_ids)} flashcards deleted successfully!")
+
+    def find_duplicates(self):
+        """Find near-duplicate cards and merge the clusters the user confirms."""
+        total = len(self.data["flashcards"])
+        progress = QProgressDialog("Scanning for duplicates...", None, 0, total, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+
+        def report(done, _total):
+            progress.setValue(done)
+            QApplication.processEvents()
+
+        clusters = self.deck.find_duplicates(progress=report)
+        progress.setValue(total)
+        if not clusters:
+            QMessageBox.information(self, "No Duplicates", "No near-duplicate flashcards found.")
+            return
+        dialog = DuplicateReviewDialog(self, clusters)
+        if not dialog.exec_():
+            return
+        merged = self.deck.merge_duplicates(dialog.checked_clusters())
+        if not merged:
+            return
+        self.parent_app.save_data()
+        self.refresh_table()
+        QMessageBox.information(self, "Success", f"{merged} duplicate flashcards merged.")
+
+    def batch_edit(self):
+        """Edit the shown or checked cards in one step: one save, one table refresh, one undo."""
+        by_id = self.indexes.by_id
+        scopes = {"Shown cards": [by_id[card_id] for card_id in self.visible_ids]}
+        checked = self.checked_ids()
+        if checked:
+            scopes = {"Checked cards": [by_id[card_id] for card_id in checked], **scopes}
+        dialog = BatchEditDialog(self, scopes)
+        if not dialog.exec_():
+            return
+
+        def apply(report):
+            changes = dialog.changes
+            if changes is None:
+                changes, _ = dialog.edit.plan(dialog.cards, progress=report)
+            if changes:
+                self.deck.edit_cards(changes)
+            return changes
+
+        changes = self.run_with_progress("Applying batch edit...", apply)
+        if not changes:
+            QMessageBox.information(self, "No Changes", "None of the cards would change.")
+            return
+        self.parent_app.save_data()
+        self.refresh_table()
+        QMessageBox.information(self, "Success", f"{len(changes)} flashcards updated.")
 
     def export_flashcards(self):
-        """Export flashcards to a JSON file."""
-        file_name, _ = QFileDialog.getSaveFileName(self, "Export Flashcards", "", "JSON Files (*.json)")
-        if file_name:
-            try:
-                with open(file_name, 'w', encoding='utf-8') as f:
-                    json.dump(self.data["flashcards"], f, indent=2)
-                QMessageBox.information(self, "Success", "Flashcards exported successfully!")
-            except Exception as e:
-                QMessageBox.warning(self, "Error", f"Failed to export flashcards: {e}")
+        """Export the flashcards shown in the table (search and tag filter applied) to a file."""
+        file_name, selected_filter = QFileDialog.getSaveFileName(self, "Export Flashcards", "", EXPORT_FILTERS)
+        if not file_name:
+            return
+        fmt, compress = detect_format(file_name)
+        if not file_name.lower().endswith((".json", ".ndjson", ".jsonl", ".csv", ".gz")):
+            fmt, compress = EXPORT_FILTER_FORMATS.get(selected_filter, (fmt, compress))
+        total = self.table.rowCount()
+        progress = QProgressDialog("Exporting flashcards...", None, 0, total, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+
+        def report(done, _total):
+            progress.setValue(done)
+            QApplication.processEvents()
+
+        try:
+            cards = (self.indexes.by_id[card_id] for card_id in self.visible_ids)
+            count = export_cards(cards, file_name, fmt, compress, progress=report, total=total)
+            progress.setValue(total)
+            QMessageBox.information(self, "Success", f"{count} flashcards exported successfully!")
+        except Exception as e:
+            progress.cancel()
+            QMessageBox.warning(self, "Error", f"Failed to export flashcards: {e}")
 
     def import_flashcards(self):
-        """Import flashcards from a JSON file."""
-        file_name, _ = QFileDialog.getOpenFileName(self, "Import Flashcards", "", "JSON Files (*.json)")
+        """Import flashcards from a JSON, NDJSON or CSV file, optionally gzip or zstd compressed."""
+        file_name, _ = QFileDialog.getOpenFileName(self, "Import Flashcards", "", IMPORT_FILTERS)
         if file_name:
             try:
-                with open(file_name, 'r', encoding='utf-8') as f:
-                    imported_cards = json.load(f)
-                if not isinstance(imported_cards, list):
-                    raise ValueError("Invalid JSON format: Expected a list of flashcards.")
-                for card in imported_cards:
-                    if not (isinstance(card, dict) and "question" in card and "answer" in card):
-                        raise ValueError("Invalid flashcard format.")
-                self.data["flashcards"].extend(imported_cards)
+                imported_cards = read_cards(file_name)
+                valid_cards, errors = self.run_with_progress(
+                    "Importing flashcards...", lambda _report: self.deck.import_cards(imported_cards))
+                if not valid_cards:
+                    raise ValueError("Invalid flashcard format.")
                 self.parent_app.save_data()
                 self.refresh_table()
-                QMessageBox.information(self, "Success", "Flashcards imported successfully!")
+                if errors:
+                    details = "\n".join(f"#{e['index'] + 1}: {e['error']}" for e in errors[:10])
+                    QMessageBox.information(self, "Imported with Warnings",
+                                          f"Imported {len(valid_cards)} flashcards, skipped {len(errors)} invalid:\n{details}")
+                else:
+                    QMessageBox.information(self, "Success", "Flashcards imported successfully!")
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Failed to import flashcards: {e}")
\ No newline at end of file
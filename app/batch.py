@@ -0,0 +1,102 @@
+"""Batch edits over many cards: find/replace, whitespace trimming, case and tags.
+
+A BatchEdit is first planned against the selected cards, which gives the
+preview and catches edits that would leave a question or answer empty.
+Deck.edit_cards then applies the planned changes in one pass as a single
+undoable step.
+"""
+import re
+
+from tags import normalize_tags
+
+TEXT_FIELDS = ("question", "answer")
+PLAN_PROGRESS_STEP = 1000  # cards between progress reports while planning
+CASE_MODES = {
+    "lower": str.lower,
+    "upper": str.upper,
+    "sentence": lambda text: text[:1].upper() + text[1:],
+}
+
+def trim_text(text):
+    """Strip surrounding whitespace and trailing spaces on each line; indentation is kept."""
+    return "\n".join(line.rstrip() for line in text.strip().split("\n"))
+
+class BatchEdit:
+    """Text and tag changes to apply to every selected card.
+
+    `find` is literal text unless `regex` is set, in which case `replace` may
+    refer to groups (\\1). Find/replace, `trim` and `case` (a CASE_MODES
+    key) apply to `fields` in that order; then `remove_tags` and `add_tags`.
+    Raises ValueError for an invalid pattern or case mode.
+    """
+    def __init__(self, find="", replace="", regex=False, match_case=True, fields=TEXT_FIELDS, trim=False,
+                 case=None, add_tags=(), remove_tags=()):
+        self.pattern = None
+        if find:
+            try:
+                self.pattern = re.compile(find if regex else re.escape(find), 0 if match_case else re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"Invalid pattern: {e}") from e
+        self.replacement = replace if regex else (lambda _match: replace)
+        if case and case not in CASE_MODES:
+            raise ValueError(f"case must be one of {', '.join(CASE_MODES)}")
+        self.fields = tuple(fields)
+        self.trim = trim
+        self.case = CASE_MODES.get(case)
+        self.add_tags = normalize_tags(add_tags)
+        self.remove_tags = set(normalize_tags(remove_tags))
+
+    def is_empty(self):
+        return not ((self.pattern or self.trim or self.case) and self.fields or self.add_tags or self.remove_tags)
+
+    def edit_text(self, text):
+        if self.pattern:
+            text = self.pattern.sub(self.replacement, text)
+        if self.trim:
+            text = trim_text(text)
+        if self.case:
+            text = self.case(text)
+        return text
+
+    def edit_tags(self, tags):
+        tags = [tag for tag in tags if tag not in self.remove_tags]
+        return tags + [tag for tag in self.add_tags if tag not in tags]
+
+    def apply(self, card):
+        """The card's fields after this edit, or None if it would not change."""
+        fields = {field: self.edit_text(card[field]) if field in self.fields else card[field]
+                  for field in TEXT_FIELDS}
+        tags = self.edit_tags(card.get("tags", ()))
+        if tags:
+            fields["tags"] = tags
+        if "media" in card:
+            fields["media"] = card["media"]
+        unchanged = all(fields[field] == card[field] for field in TEXT_FIELDS) and tags == card.get("tags", [])
+        return None if unchanged else fields
+
+    def plan(self, cards, limit=None, progress=None):
+        """Returns (changes, emptied).
+
+        `changes` lists (card, new fields) for the cards this edit changes.
+        `emptied` lists the ids of cards it would leave with an empty
+        question or answer; those are left out of `changes`. Planning stops
+        once `limit` changes are found, which is all a preview needs.
+        `progress(done, total)` is called every PLAN_PROGRESS_STEP cards.
+        """
+        changes, emptied = [], []
+        try:
+            for done, card in enumerate(cards):
+                if progress and done % PLAN_PROGRESS_STEP == 0:
+                    progress(done, len(cards))
+                fields = self.apply(card)
+                if fields is None:
+                    continue
+                if fields["question"].strip() and fields["answer"].strip():
+                    changes.append((card, fields))
+                    if limit is not None and len(changes) >= limit:
+                        break
+                else:
+                    emptied.append(card["id"])
+        except re.error as e:
+            raise ValueError(f"Invalid replacement: {e}") from e
+        return changes, emptied
@@ -0,0 +1,257 @@
+"""Bulk deck operations from the command line, without the desktop UI.
+
+Usage (from the app directory): python -m cli <command> [options]
+
+    import FILE         add the cards in a JSON, NDJSON or CSV file (optionally compressed)
+    export FILE         write the deck, or a tag/search-filtered part of it
+    validate            check every stored card without loading the deck
+    dedupe              list near-duplicate clusters; --apply merges them
+    stats               card, tag and score counts; --all lists every deck
+    serve               share the deck with a classroom over HTTP (see server.py)
+    simulate            benchmark the quiz engine with synthetic learners (see simulate.py)
+    media               card image store usage; --prune deletes images no card or backup uses
+
+--deck takes a deck slug from the catalogue or a path to a deck file and
+defaults to the active deck. Nothing here imports Qt.
+"""
+import argparse
+import json
+import os
+import sys
+from itertools import chain
+
+from data import read_cards, iter_stored_cards, validate_card, file_lock, backup_files
+from decks import load_catalogue, deck_file, record_deck
+from deck import Deck
+from exporter import detect_format, export_cards
+from media import MediaStore, media_dir
+from metrics import start_exporters
+
+ERROR_REPORT_LIMIT = 20
+
+def resolve_deck(value):
+    """(path, catalogue slug or None) for a --deck argument.
+
+    Raises FileNotFoundError for a path that is neither in the catalogue nor
+    an existing file, rather than letting the deck loader create it.
+    """
+    catalogue = load_catalogue()
+    if value is None:
+        return deck_file(catalogue, catalogue["active"]), catalogue["active"]
+    if value in catalogue["decks"]:
+        return deck_file(catalogue, value), value
+    for slug in catalogue["decks"]:
+        if os.path.abspath(deck_file(catalogue, slug)) == os.path.abspath(value):
+            return value, slug
+    if not os.path.isfile(value):
+        raise FileNotFoundError(f"No deck named {value!r} in the catalogue and no such deck file")
+    return value, None
+
+def print_errors(errors, out=sys.stderr):
+    for error in errors[:ERROR_REPORT_LIMIT]:
+        where = "?" if error["index"] is None else error["index"] + 1
+        print(f"  #{where}: {error['error']}", file=out)
+    if len(errors) > ERROR_REPORT_LIMIT:
+        print(f"  ... and {len(errors) - ERROR_REPORT_LIMIT} more", file=out)
+
+def save(deck):
+    deck.save()
+    if deck.slug:
+        record_deck(deck.slug, deck.data)
+
+def cmd_import(args):
+    cards = read_cards(args.file)
+    deck = Deck.open(*resolve_deck(args.deck), indexes=())
+    added, errors = deck.import_cards(cards)
+    if added and not args.dry_run:
+        save(deck)
+    print(f"{'Would import' if args.dry_run else 'Imported'} {len(added)} flashcards, "
+          f"skipped {len(errors)} invalid")
+    print_errors(errors)
+    return 1 if errors and not added else 0
+
+def cmd_export(args):
+    path, slug = resolve_deck(args.deck)
+    fmt, compress = detect_format(args.file)
+    if not (args.tags or args.search or args.sort):
+        # The whole deck: stream the stored cards instead of loading it.
+        with file_lock(path, exclusive=False):
+            count = export_cards(iter_stored_cards(path), args.file, args.format or fmt, compress)
+    else:
+        deck = Deck.open(path, slug, indexes=("tags",) if args.tags else ())
+        card_ids = deck.search(args.search or "", deck.tag_mask(args.tags or ""), args.sort or "question",
+                               reverse=args.reverse)
+        count = export_cards((deck.indexes.by_id[card_id] for card_id in card_ids), args.file,
+                             args.format or fmt, compress, total=len(card_ids))
+    print(f"Exported {count} flashcards to {args.file}")
+    return 0
+
+def cmd_validate(args):
+    path, _ = resolve_deck(args.deck)
+    errors, seen, count = [], set(), 0
+    for index, card in enumerate(iter_stored_cards(path)):
+        count += 1
+        card, error = validate_card(card, index)
+        if error is None and card["id"] in seen:
+            error = f"duplicate id {card['id']}"
+        if error:
+            errors.append({"index": index, "error": error})
+        else:
+            seen.add(card["id"])
+    print(f"{path}: {count} flashcards, {len(errors)} invalid")
+    print_errors(errors, sys.stdout)
+    return 1 if errors else 0
+
+def cmd_dedupe(args):
+    deck = Deck.open(*resolve_deck(args.deck), indexes=())
+    clusters = deck.find_duplicates(args.threshold)
+    for cluster in clusters:
+        keeper = cluster[0][0]
+        print(f"{keeper['id']}  {keeper['question']}  →  {keeper['answer']}")
+        for card, similarity in cluster[1:]:
+            print(f"  {similarity:4.0%}  {card['id']}  {card['question']}  →  {card['answer']}")
+    duplicates = sum(len(cluster) - 1 for cluster in clusters)
+    print(f"{len(clusters)} clusters, {duplicates} duplicate flashcards")
+    if args.apply and clusters:
+        merged = deck.merge_duplicates(clusters)
+        save(deck)
+        print(f"Merged {merged} duplicate flashcards")
+    return 0
+
+def cmd_stats(args):
+    if args.all:
+        catalogue = load_catalogue()
+        report = {slug: dict(entry, active=slug == catalogue["active"]) for slug, entry in catalogue["decks"].items()}
+        if args.json:
+            print(json.dumps(report, indent=2, ensure_ascii=False))
+            return 0
+        for slug, entry in report.items():
+            cards = "?" if entry.get("cards") is None else entry["cards"]
+            stats = entry.get("stats") or {}
+            marker = "*" if entry["active"] else " "
+            print(f"{marker} {slug:20} {cards:>8} cards  {stats.get('correct', 0)}/{stats.get('total', 0)} correct"
+                  f"  {entry['file']}")
+        return 0
+    deck = Deck.open(*resolve_deck(args.deck), indexes=None)
+    summary = deck.summary()
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+        return 0
+    total = summary["total"]
+    accuracy = f" ({summary['correct'] / total:.0%})" if total else ""
+    print(f"Deck: {deck.slug or deck.path}")
+    print(f"Flashcards: {summary['cards']} ({summary['tagged']} tagged, {summary['studied']} studied)")
+    print(f"Answers: {summary['correct']}/{total} correct{accuracy}")
+    print(f"Revision: {summary['revision']}")
+    for tag, count in list(summary["tags"].items())[:args.top]:
+        print(f"  {tag:30} {count}")
+    return 0
+
+def cmd_serve(args):
+    from server import serve, SERVER_INDEXES
+    serve(Deck.open(*resolve_deck(args.deck), indexes=SERVER_INDEXES), args.host, args.port, args.flush_interval)
+    return 0
+
+def cmd_simulate(args):
+    from simulate import run_simulation, format_report
+    config = {key: getattr(args, key) for key in ("learners", "sessions", "session_length", "engine", "curve",
+                                                  "latency", "seed")}
+    config["cards"] = args.cards
+    cards = None
+    if args.deck:
+        cards = [card for card in iter_stored_cards(resolve_deck(args.deck)[0]) if isinstance(card, dict)]
+    report = run_simulation(config, cards, args.workers)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+def cmd_media(args):
+    path, _ = resolve_deck(args.deck)
+    store = MediaStore(media_dir(path))
+    cards = [card for card in iter_stored_cards(path) if isinstance(card, dict)]
+    referenced = {digest for card in cards for digest in card.get("media", ())}
+    stored = set(store.digests())
+    size = sum(os.path.getsize(store.path(digest)) for digest in stored)
+    print(f"{store.root}: {len(stored)} images, {size / 1e6:.1f} MB; "
+          f"{sum(1 for card in cards if card.get('media'))} flashcards with images")
+    missing = referenced - stored
+    if missing:
+        print(f"{len(missing)} referenced images are missing from the store")
+    if args.prune:
+        # Backups are full copies of the deck, so restoring one needs every image it lists.
+        backups = backup_files(path)
+        kept = chain(cards, *(iter_stored_cards(backup) for backup in backups))
+        count, freed = store.prune((card for card in kept if isinstance(card, dict)), dry_run=args.dry_run)
+        print(f"{'Would remove' if args.dry_run else 'Removed'} {count} unused images ({freed / 1e6:.1f} MB); "
+              f"images listed in the {len(backups)} backups were kept")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Bulk operations on CodeCard decks.")
+    parser.add_argument("--deck", help="deck slug from the catalogue or path to a deck file (default: active deck)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("import", help="add flashcards from a JSON, NDJSON or CSV file")
+    p.add_argument("file")
+    p.add_argument("--dry-run", action="store_true", help="validate only, do not save")
+    p.set_defaults(run=cmd_import)
+
+    p = commands.add_parser("export", help="export flashcards (format from the file name)")
+    p.add_argument("file")
+    p.add_argument("--format", choices=("json", "ndjson", "csv"))
+    p.add_argument("--tags", help="tag filter, e.g. 'python AND recursion NOT beginner'")
+    p.add_argument("--search", help="only cards whose question or answer contains this text")
+    p.add_argument("--sort", choices=("question", "answer"))
+    p.add_argument("--reverse", action="store_true")
+    p.set_defaults(run=cmd_export)
+
+    p = commands.add_parser("validate", help="check every stored flashcard")
+    p.set_defaults(run=cmd_validate)
+
+    p = commands.add_parser("dedupe", help="find near-duplicate flashcards")
+    p.add_argument("--threshold", type=float, help="Jaccard similarity threshold (default 0.6)")
+    p.add_argument("--apply", action="store_true", help="merge every cluster into its first card and save")
+    p.set_defaults(run=cmd_dedupe)
+
+    p = commands.add_parser("stats", help="deck statistics")
+    p.add_argument("--all", action="store_true", help="list every deck in the catalogue")
+    p.add_argument("--json", action="store_true")
+    p.add_argument("--top", type=int, default=10, help="number of tags to list")
+    p.set_defaults(run=cmd_stats)
+
+    p = commands.add_parser("serve", help="serve the deck to many learners over HTTP/JSON")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--flush-interval", type=float, default=1.0, help="seconds between batched saves")
+    p.set_defaults(run=cmd_serve)
+
+    p = commands.add_parser("simulate", help="simulate learners to benchmark scheduling and the quiz engine",
+                            description="Uses a synthetic deck unless --deck is given.")
+    p.add_argument("--learners", type=int, default=200)
+    p.add_argument("--cards", type=int, default=2000, help="size of the synthetic deck")
+    p.add_argument("--sessions", type=int, default=10, help="sessions per learner, one day apart")
+    p.add_argument("--session-length", type=int, default=50)
+    p.add_argument("--engine", choices=("adaptive", "random"), default="adaptive")
+    p.add_argument("--curve", choices=("exponential", "power"), default="exponential")
+    p.add_argument("--latency", choices=("lognormal", "gamma", "exponential"), default="lognormal")
+    p.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(run=cmd_simulate)
+
+    p = commands.add_parser("media", help="card image store usage")
+    p.add_argument("--prune", action="store_true", help="delete stored images no flashcard or deck backup refers to")
+    p.add_argument("--dry-run", action="store_true", help="with --prune, only report what would be deleted")
+    p.set_defaults(run=cmd_media)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    start_exporters()
+    try:
+        return args.run(args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,275 @@
+import csv
 import json
 import os
+import copy
+import gzip
+import hashlib
+import io
+import secrets
 import shutil
+from contextlib import contextmanager
 from datetime import datetime
 import tempfile
+import time
 import logging
+from exporter import detect_format, export_cards, copy_stream, CSV_FIELDS
+from tags import normalize_tags
+from media import normalize_media
+from metrics import counter, gauge, histogram
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locking, last writer wins
+    fcntl = None
+
+try:
+    from compression import zstd  # Python 3.14+
+    ZSTD_STDLIB = True
+except ImportError:
+    ZSTD_STDLIB = False
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+SAVES = counter("codecard_saves_total", "Deck saves written")
+SAVE_FAILURES = counter("codecard_save_failures_total", "Deck saves that failed")
+SAVE_BYTES = counter("codecard_save_bytes_total", "Bytes written by deck saves")
+SAVE_SECONDS = histogram("codecard_save_seconds", "Deck save duration, including merge and backup")
+LOAD_SECONDS = histogram("codecard_load_seconds", "Deck load duration")
+BACKUPS = counter("codecard_backups_total", "Backups created")
+
 DATA_FILE = "flashcards.json"
 BACKUP_DIR = "backups"
 MAX_BACKUPS = 5
+LOCK_SUFFIX = ".lock"
+MERGE_SKIP_KEYS = ("flashcards", "stats", "card_stats", "revision", "last_modified")
+# Container used when saving: None (plain JSON), "gzip" or "zstd". The
+# "storage_compression" and "compression_level" settings override these.
+STORAGE_COMPRESSION = None
+COMPRESSION_LEVEL = 6
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Per-file state of the last revision this process loaded or saved, used as
+# the common ancestor when another process has written in the meantime.
+_sync_state = {}
+
+@contextmanager
+def file_lock(path, exclusive=True):
+    """Hold an advisory fcntl lock on a sidecar lock file for `path`."""
+    if fcntl is None:
+        yield
+        return
+    with open(path + LOCK_SUFFIX, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def detect_compression(path):
+    """Identify a data file's container from its magic bytes."""
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+    if magic.startswith(GZIP_MAGIC):
+        return "gzip"
+    if magic == ZSTD_MAGIC:
+        return "zstd"
+    return None
+
+def _open_zstd(path, mode, level=None):
+    if zstd is None:
+        raise RuntimeError("zstd support requires Python 3.14+ or the 'zstandard' package")
+    if ZSTD_STDLIB:
+        return zstd.open(path, mode, level=level)
+    if "w" in mode:
+        return zstd.open(path, mode, cctx=zstd.ZstdCompressor(level=level))
+    return zstd.open(path, mode)
+
+def open_data_file(path, binary=False):
+    """Open a plain, gzip or zstd data file for reading, detected by magic bytes."""
+    compression = detect_compression(path)
+    mode = 'rb' if binary else 'rt'
+    encoding = None if binary else 'utf-8'
+    if compression == "gzip":
+        return gzip.open(path, mode, encoding=encoding)
+    if compression == "zstd":
+        f = _open_zstd(path, 'rb')
+        return f if binary else io.TextIOWrapper(f, encoding='utf-8')
+    return open(path, mode, encoding=encoding)
+
+def write_data_file(path, data, compression=None, level=COMPRESSION_LEVEL):
+    """Write `data` as JSON, compact and compressed unless `compression` is None."""
+    if compression == "gzip":
+        with gzip.open(path, 'wt', encoding='utf-8', compresslevel=level) as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    elif compression == "zstd":
+        with io.TextIOWrapper(_open_zstd(path, 'wb', level), encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    elif compression is None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+    else:
+        raise ValueError(f"Unknown storage compression: {compression}")
+
+def new_card_id():
+    """Generate a random id for a newly created flashcard."""
+    return secrets.token_hex(8)
+
+def make_card(question, answer, **fields):
+    """Create a flashcard dict with a fresh id."""
+    return {"id": new_card_id(), "question": question, "answer": answer, **fields}
+
+def card_digest(card):
+    """A 16-byte hash of a card's full contents, for telling whether it changed."""
+    encoded = json.dumps(card, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).digest()
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def _remember_base(path, data):
+    """Record `data` as the last state of `path` seen by this process."""
+    _sync_state[os.path.abspath(path)] = {
+        "revision": data.get("revision", 0),
+        "signature": _file_signature(path),
+        "cards": {card["id"]: card_digest(card) for card in data.get("flashcards", [])},
+        "stats": dict(data.get("stats", {})),
+        "card_stats": {k: dict(v) for k, v in data.get("card_stats", {}).items()},
+        "other": {k: copy.deepcopy(v) for k, v in data.items()
+                  if k not in MERGE_SKIP_KEYS and k != "created"},
+    }
+
+def _read_disk_data(path):
+    """Read and validate the deck currently on disk, or None if unreadable."""
+    try:
+        with open_data_file(path) as f:
+            return validate_and_migrate_data(json.load(f))
+    except (OSError, ValueError) as e:
+        logging.warning(f"Could not read {path} for merge: {e}")
+        return None
+
+def merge_flashcards(base, ours, theirs):
+    """Three-way merge of card lists by id.
+
+    `base` maps card id to the `card_digest` of the common ancestor card;
+    `ours` and `theirs` are card lists. A side that left a card untouched takes the other side's
+    change (including deletion); when both changed the same card differently
+    ours wins and the id is reported as a conflict. Returns (merged, conflicts).
+    """
+    theirs_by_id = {card["id"]: card for card in theirs}
+    ours_ids = set()
+    merged, conflicts = [], []
+    for card in ours:
+        card_id = card["id"]
+        ours_ids.add(card_id)
+        base_digest = base.get(card_id)
+        their_card = theirs_by_id.get(card_id)
+        if base_digest is None:
+            merged.append(card)
+        elif their_card is None:
+            if card_digest(card) != base_digest:
+                conflicts.append(card_id)
+                merged.append(card)
+        elif card_digest(card) == base_digest:
+            # Keep our object when their copy is unchanged too, so it doesn't show up as updated.
+            merged.append(card if their_card == card else their_card)
+        else:
+            if their_card != card and card_digest(their_card) != base_digest:
+                conflicts.append(card_id)
+            merged.append(card)
+    for card in theirs:
+        card_id = card["id"]
+        if card_id in ours_ids:
+            continue
+        base_digest = base.get(card_id)
+        if base_digest is None:
+            merged.append(card)
+        elif card_digest(card) != base_digest:
+            conflicts.append(card_id)
+            merged.append(card)
+    return merged, conflicts
+
+def merge_from_disk(data, path=None):
+    """Merge changes another process saved to `path` into `data` in place.
+
+    Must be called with the file lock held. Returns a diff of what changed in
+    `data` ({"added": cards, "updated": cards, "removed": ids, "conflicts":
+    ids}), or None if the file could not be read.
+    """
+    path = path or DATA_FILE
+    theirs = _read_disk_data(path)
+    if theirs is None:
+        return None
+    state = _sync_state.get(os.path.abspath(path))
+    if state is None:
+        # No common ancestor: keep our stats and settings, union the cards.
+        state = {"cards": {}, "stats": theirs["stats"], "card_stats": {}, "other": theirs}
+
+    previous = {card["id"]: card for card in data["flashcards"]}
+    merged, conflicts = merge_flashcards(state["cards"], data["flashcards"], theirs["flashcards"])
+    data["flashcards"][:] = merged
+    for key in ("correct", "total"):
+        delta = data["stats"].get(key, 0) - state["stats"].get(key, 0)
+        data["stats"][key] = theirs["stats"].get(key, 0) + delta
+    card_stats = data.setdefault("card_stats", {})
+    for card_id, their_stats in theirs.get("card_stats", {}).items():
+        if card_stats.get(card_id) == state["card_stats"].get(card_id):
+            card_stats[card_id] = their_stats
+    for key, value in theirs.items():
+        if key in MERGE_SKIP_KEYS or key == "created":
+            continue
+        if key not in data or data[key] == state["other"].get(key):
+            data[key] = value
+    data["revision"] = theirs.get("revision", 0)
+    _remember_base(path, theirs)
+    if conflicts:
+        logging.warning(f"Merged concurrent changes with {len(conflicts)} conflicting cards (kept local edits)")
+    else:
+        logging.info(f"Merged concurrent changes from revision {data['revision']}")
+    return diff_flashcards(previous, merged, conflicts)
+
+def diff_flashcards(previous, cards, conflicts=()):
+    """Card-level diff between an id->card map and the current card list.
+
+    Cards are compared by identity, so only cards replaced by a merge count
+    as updated.
+    """
+    added, updated = [], []
+    for card in cards:
+        old = previous.get(card["id"])
+        if old is None:
+            added.append(card)
+        elif old is not card:
+            updated.append(card)
+    current_ids = {card["id"] for card in cards}
+    removed = [card_id for card_id in previous if card_id not in current_ids]
+    return {"added": added, "updated": updated, "removed": removed, "conflicts": list(conflicts)}
+
+def reload_external_changes(data, path=None):
+    """Pick up changes another process saved to the data file.
+
+    Cheap when nothing happened: only the file's size and mtime are checked.
+    Returns the card diff applied to `data`, or None if nothing changed.
+    """
+    path = path or DATA_FILE
+    state = _sync_state.get(os.path.abspath(path))
+    signature = _file_signature(path)
+    if signature is None or (state is not None and state["signature"] == signature):
+        return None
+    with file_lock(path, exclusive=False):
+        # Writers that leave "revision" alone (scripts, sync tools) still change the signature.
+        diff = merge_from_disk(data, path)
+    if diff and not any(diff.values()):
+        return None
+    return diff
 
 def ensure_backup_dir():
     """Ensure backup directory exists."""
@@ -18,27 +278,43 @@ def ensure_backup_dir():
     except Exception as e:
         logging.error(f"Failed to create backup directory: {e}")
 
-def create_backup():
+def backup_prefix(path=None):
+    """Backup file name prefix of a deck file, e.g. "flashcards_backup_"."""
+    name = os.path.basename(path or DATA_FILE)
+    return f"{name.split('.')[0]}_backup_"
+
+def backup_files(path=None):
+    """Paths of the backups kept for a deck file, newest first."""
+    if not os.path.isdir(BACKUP_DIR):
+        return []
+    prefix = backup_prefix(path)
+    files = [os.path.join(BACKUP_DIR, name) for name in os.listdir(BACKUP_DIR)
+             if name.startswith(prefix) and name.endswith(".json")]
+    return sorted(files, key=os.path.getmtime, reverse=True)
+
+def create_backup(path=None):
     """Create a backup of the current data file."""
-    if not os.path.exists(DATA_FILE):
+    path = path or DATA_FILE
+    if not os.path.exists(path):
         return
     
     try:
         ensure_backup_dir()
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = os.path.join(BACKUP_DIR, f"flashcards_backup_{timestamp}.json")
-        shutil.copy2(DATA_FILE, backup_file)
-        cleanup_old_backups()
+        backup_file = os.path.join(BACKUP_DIR, f"{backup_prefix(path)}{timestamp}.json")
+        shutil.copy2(path, backup_file)
+        BACKUPS.inc()
+        cleanup_old_backups(backup_prefix(path))
     except Exception as e:
         logging.warning(f"Could not create backup: {e}")
 
-def cleanup_old_backups():
+def cleanup_old_backups(prefix="flashcards_backup_"):
     """Remove old backup files, keeping only the most recent ones."""
     try:
         backup_files = [
             (os.path.join(BACKUP_DIR, f), os.path.getmtime(os.path.join(BACKUP_DIR, f)))
             for f in os.listdir(BACKUP_DIR)
-            if f.startswith("flashcards_backup_") and f.endswith(".json")
+            if f.startswith(prefix) and f.endswith(".json")
         ]
         backup_files.sort(key=lambda x: x[1], reverse=True)
         for file_path, _ in backup_files[MAX_BACKUPS:]:
@@ -46,56 +322,65 @@ def cleanup_old_backups():
                 os.remove(file_path)
             except Exception as e:
                 logging.warning(f"Could not remove old backup {file_path}: {e}")
+        kept = [file_path for file_path, _ in backup_files[:MAX_BACKUPS]]
+        deck = prefix[:-len("_backup_")]
+        gauge("codecard_backup_files", "Backup files kept per deck", deck=deck).set(len(kept))
+        gauge("codecard_backup_bytes", "Size of the backups kept per deck", deck=deck).set(
+            sum(os.path.getsize(file_path) for file_path in kept))
     except Exception as e:
         logging.warning(f"Could not cleanup old backups: {e}")
 
-def load_data():
-    """Load flashcards and stats from JSON file with error handling."""
+def load_data(path=None, default_cards=None):
+    """Load flashcards and stats from JSON file with error handling.
+
+    `path` selects a deck shard (the active deck by default); a missing file
+    is created with `default_cards`, or a few sample cards.
+    """
+    path = path or DATA_FILE
     default_data = {
         "flashcards": [
-            {"question": "What is the capital of France?", "answer": "Paris"},
-            {"question": "What is 2 + 2?", "answer": "4"},
-            {"question": "What programming language is this app written in?", "answer": "Python"}
-        ],
+            make_card("What is the capital of France?", "Paris"),
+            make_card("What is 2 + 2?", "4"),
+            make_card("What programming language is this app written in?", "Python")
+        ] if default_cards is None else list(default_cards),
         "stats": {"correct": 0, "total": 0},
         "settings": {"default_time_limit": 10, "auto_save": True, "sound_enabled": True},
         "version": "2.1",
+        "revision": 0,
         "created": datetime.now().isoformat(),
         "last_modified": datetime.now().isoformat()
     }
     
-    if not os.path.exists(DATA_FILE):
+    if not os.path.exists(path):
         try:
-            save_data(default_data)
+            save_data(default_data, path=path)
             return default_data
         except Exception as e:
             logging.error(f"Error creating default data file: {e}")
             return default_data
     
     try:
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return validate_and_migrate_data(data)
+        start = time.perf_counter()
+        with file_lock(path, exclusive=False):
+            with open_data_file(path) as f:
+                data = validate_and_migrate_data(json.load(f))
+            _remember_base(path, data)
+        LOAD_SECONDS.observe(time.perf_counter() - start)
+        return data
     except json.JSONDecodeError as e:
         logging.error(f"Corrupted data file: {e}")
-        return load_backup_or_default(default_data)
+        return load_backup_or_default(default_data, path)
     except Exception as e:
         logging.error(f"Error loading data: {e}")
-        return load_backup_or_default(default_data)
+        return load_backup_or_default(default_data, path)
 
-def load_backup_or_default(default_data):
+def load_backup_or_default(default_data, path=None):
     """Try to load from backup, or return default data."""
     try:
-        ensure_backup_dir()
-        backup_files = [
-            (os.path.join(BACKUP_DIR, f), os.path.getmtime(os.path.join(BACKUP_DIR, f)))
-            for f in os.listdir(BACKUP_DIR)
-            if f.startswith("flashcards_backup_") and f.endswith(".json")
-        ]
-        if backup_files:
-            backup_files.sort(key=lambda x: x[1], reverse=True)
-            latest_backup = backup_files[0][0]
-            with open(latest_backup, 'r', encoding='utf-8') as f:
+        backups = backup_files(path)
+        if backups:
+            latest_backup = backups[0]
+            with open_data_file(latest_backup) as f:
                 data = json.load(f)
                 logging.info(f"Loaded data from backup: {latest_backup}")
                 return validate_and_migrate_data(data)
@@ -103,8 +388,69 @@ def load_backup_or_default(default_data):
         logging.error(f"Error loading backup: {e}")
     return default_data
 
-def validate_and_migrate_data(data):
-    """Validate data structure and migrate from older versions if needed."""
+def validate_card(card, index=None):
+    """Normalize a single flashcard, returning (card, error message or None).
+
+    Cards without an id get one derived from their position and content, so
+    every process migrating the same legacy file assigns the same ids.
+    """
+    if not isinstance(card, dict):
+        return None, f"expected an object, got {type(card).__name__}"
+    if "question" not in card or "answer" not in card:
+        return None, "missing question or answer"
+    card["question"] = str(card["question"]).strip()
+    card["answer"] = str(card["answer"]).strip()
+    if not card["question"] or not card["answer"]:
+        return None, "empty question or answer"
+    # Legacy single "category" values become the card's first tag.
+    if "category" in card:
+        category = card.pop("category")
+        card.setdefault("tags", [category] if category else [])
+    if "tags" in card:
+        card["tags"] = normalize_tags(card["tags"])
+        if not card["tags"]:
+            del card["tags"]
+    if "media" in card:
+        card["media"] = normalize_media(card["media"])
+        if not card["media"]:
+            del card["media"]
+    if not isinstance(card.get("id"), str) or not card["id"]:
+        seed = f"{index}\0{card['question']}\0{card['answer']}".encode("utf-8")
+        card["id"] = hashlib.blake2b(seed, digest_size=8).hexdigest()
+    return card, None
+
+def validate_flashcards(cards):
+    """Validate and normalize flashcards in place, in one pass.
+
+    Returns (valid cards, error reports), where each error report records
+    the card's original index and the reason it was rejected.
+    """
+    if not isinstance(cards, list):
+        return [], [{"index": None, "error": "flashcards is not a list"}]
+    valid_flashcards, errors = [], []
+    for index, card in enumerate(cards):
+        card, error = validate_card(card, index)
+        if error:
+            errors.append({"index": index, "error": error})
+        else:
+            valid_flashcards.append(card)
+    ensure_unique_ids(valid_flashcards)
+    return valid_flashcards, errors
+
+def ensure_unique_ids(cards, existing_ids=()):
+    """Give a fresh id to any card whose id is already taken."""
+    seen = set(existing_ids)
+    for card in cards:
+        if card["id"] in seen:
+            card["id"] = new_card_id()
+        seen.add(card["id"])
+
+def validate_and_migrate_data(data, errors=None):
+    """Validate data structure and migrate from older versions if needed.
+
+    Invalid flashcards are dropped; pass a list as `errors` to collect a
+    report for each of them.
+    """
     if "flashcards" not in data:
         data["flashcards"] = []
     if "stats" not in data:
@@ -115,18 +461,24 @@ def validate_and_migrate_data(data):
         data["version"] = "2.1"
     if "created" not in data:
         data["created"] = datetime.now().isoformat()
+    if not isinstance(data.get("revision"), int):
+        data["revision"] = 0
     
     data["last_modified"] = datetime.now().isoformat()
     
-    valid_flashcards = []
-    for card in data["flashcards"]:
-        if isinstance(card, dict) and "question" in card and "answer" in card:
-            card["question"] = str(card["question"]).strip()
-            card["answer"] = str(card["answer"]).strip()
-            if card["question"] and card["answer"]:
-                valid_flashcards.append(card)
+    valid_flashcards, card_errors = validate_flashcards(data["flashcards"])
+    if card_errors:
+        logging.warning(f"Dropped {len(card_errors)} invalid flashcards during validation")
+        if errors is not None:
+            errors.extend(card_errors)
     data["flashcards"] = valid_flashcards
     
+    if not isinstance(data.get("card_stats"), dict):
+        data["card_stats"] = {}
+    elif data["card_stats"]:
+        card_ids = {card["id"] for card in data["flashcards"]}
+        data["card_stats"] = {k: v for k, v in data["card_stats"].items() if k in card_ids}
+    
     if not isinstance(data["stats"], dict):
         data["stats"] = {"correct": 0, "total": 0}
     if "correct" not in data["stats"] or not isinstance(data["stats"]["correct"], int):
@@ -136,18 +488,51 @@ def validate_and_migrate_data(data):
     
     return data
 
-def save_data(data):
-    """Save flashcards and stats to JSON file with backup and error handling."""
+def save_data(data, overwrite=False, path=None):
+    """Save flashcards and stats to JSON file with backup and error handling.
+
+    The write happens under an exclusive file lock. If anything else changed
+    the file since this one last loaded or saved, its changes are
+    three-way merged into `data` first instead of being overwritten, and the
+    resulting card diff is returned (None otherwise). Pass `overwrite=True`
+    to replace the file contents deliberately (imports). `path` selects the
+    deck shard; only that file is written.
+    """
+    path = path or DATA_FILE
+    temp_file = path + ".tmp"
+    diff = None
+    start = time.perf_counter()
     try:
-        create_backup()
-        data["last_modified"] = datetime.now().isoformat()
-        temp_file = DATA_FILE + ".tmp"
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-        with open(temp_file, 'r', encoding='utf-8') as f:
-            json.load(f)
-        shutil.move(temp_file, DATA_FILE)
+        with file_lock(path):
+            state = _sync_state.get(os.path.abspath(path))
+            signature = _file_signature(path)
+            if signature is not None and (state is None or state["signature"] != signature):
+                if overwrite:
+                    disk_data = _read_disk_data(path)
+                    if disk_data is not None:
+                        data["revision"] = max(data.get("revision", 0), disk_data["revision"])
+                else:
+                    # Any change since our last load or save is merged, whether or not the writer
+                    # bumped the revision (scripts and sync tools usually don't).
+                    diff = merge_from_disk(data, path)
+            create_backup(path)
+            data["revision"] = data.get("revision", 0) + 1
+            data["last_modified"] = datetime.now().isoformat()
+            settings = data.get("settings", {})
+            write_data_file(temp_file, data,
+                            settings.get("storage_compression", STORAGE_COMPRESSION),
+                            settings.get("compression_level", COMPRESSION_LEVEL))
+            with open_data_file(temp_file) as f:
+                json.load(f)
+            size = os.path.getsize(temp_file)
+            shutil.move(temp_file, path)
+            _remember_base(path, data)
+        SAVES.inc()
+        SAVE_BYTES.inc(size)
+        SAVE_SECONDS.observe(time.perf_counter() - start)
+        return diff
     except Exception as e:
+        SAVE_FAILURES.inc()
         if os.path.exists(temp_file):
             try:
                 os.remove(temp_file)
@@ -184,12 +569,138 @@ Data File Information:
     except Exception as e:
         return f"Error getting data info: {e}"
 
-def export_data(export_path):
-    """Export flashcards data to a specified file."""
+class _JsonStreamReader:
+    """Incremental reader that decodes one JSON value at a time from a file."""
+    def __init__(self, f, read_size):
+        self.f = f
+        self.read_size = read_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        if self.pos > len(self.buf) // 2:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        block = self.f.read(self.read_size)
+        if not block:
+            self.eof = True
+        self.buf += block
+        # Grow reads while a value spans several blocks to avoid re-parsing.
+        self.read_size *= 2
+
+    def next_char(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                char = self.buf[self.pos]
+                self.pos += 1
+                return char
+            if self.eof:
+                raise ValueError("Unexpected end of JSON data")
+            self.fill()
+
+    def peek_char(self):
+        char = self.next_char()
+        self.pos -= 1
+        return char
+
+    def decode(self):
+        self.peek_char()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A number at the very end of the buffer may be truncated.
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    self.read_size = max(self.read_size // 2, 1 << 16)
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+def iter_stored_cards(path=None, read_size=1 << 16):
+    """Yield the flashcards stored in `path` one by one without loading the deck.
+
+    The file is decoded incrementally, so memory use stays bounded by the
+    largest card rather than the whole deck, and nothing is re-validated.
+    """
+    path = path or DATA_FILE
+    with open_data_file(path) as f:
+        reader = _JsonStreamReader(f, read_size)
+        if reader.next_char() != "{":
+            raise ValueError("Data file is not a JSON object")
+        if reader.peek_char() == "}":
+            return
+        while True:
+            key = reader.decode()
+            if reader.next_char() != ":":
+                raise ValueError("Malformed data file")
+            if key == "flashcards":
+                if reader.next_char() != "[":
+                    raise ValueError("flashcards is not a list")
+                if reader.peek_char() == "]":
+                    reader.next_char()
+                else:
+                    while True:
+                        yield reader.decode()
+                        char = reader.next_char()
+                        if char == "]":
+                            break
+                        if char != ",":
+                            raise ValueError("Malformed flashcards list")
+            else:
+                reader.decode()
+            char = reader.next_char()
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError("Malformed data file")
+
+def csv_card(row):
+    """A card from a CSV row; the tags column holds comma-separated tags."""
+    card = {field: row[field] for field in CSV_FIELDS if row.get(field)}
+    if "tags" in card:
+        card["tags"] = normalize_tags(card["tags"])
+    return card
+
+def read_cards(path):
+    """Cards from a JSON list (or deck file), NDJSON or CSV file, optionally compressed."""
+    fmt, _ = detect_format(path)
+    with open_data_file(path) as f:
+        if fmt == "csv":
+            return [csv_card(row) for row in csv.DictReader(f)]
+        if fmt == "ndjson":
+            return [json.loads(line) for line in f if line.strip()]
+        cards = json.load(f)
+    if isinstance(cards, dict):
+        cards = cards.get("flashcards")
+    if not isinstance(cards, list):
+        raise ValueError("expected a list of flashcards")
+    return cards
+
+def export_data(export_path, fmt=None, progress=None):
+    """Export flashcards data to a specified file.
+
+    JSON exports are a chunked copy of the stored deck (stats and settings
+    included); NDJSON and CSV exports stream the stored cards. Neither
+    reloads or re-validates the deck. A '.gz' suffix gzip-compresses the
+    output.
+    """
+    if not os.path.exists(DATA_FILE):
+        return "Error exporting data: no data file exists yet."
     try:
-        data = load_data()
-        with open(export_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        detected_fmt, compress = detect_format(export_path)
+        fmt = fmt or detected_fmt
+        with file_lock(DATA_FILE, exclusive=False):
+            if fmt == "json":
+                with open_data_file(DATA_FILE, binary=True) as src:
+                    copy_stream(src, export_path, compress, progress)
+            else:
+                export_cards(iter_stored_cards(DATA_FILE), export_path, fmt, compress, progress)
         return f"Data exported successfully to {export_path}"
     except Exception as e:
         return f"Error exporting data: {e}"
@@ -197,10 +708,13 @@ def export_data(export_path):
 def import_data(import_path):
     """Import flashcards data from a specified file."""
     try:
-        with open(import_path, 'r', encoding='utf-8') as f:
+        with open_data_file(import_path) as f:
             imported_data = json.load(f)
-        validated_data = validate_and_migrate_data(imported_data)
-        save_data(validated_data)
+        errors = []
+        validated_data = validate_and_migrate_data(imported_data, errors)
+        save_data(validated_data, overwrite=True)
+        if errors:
+            return f"Data imported from {import_path} ({len(errors)} invalid flashcards skipped)"
         return f"Data imported successfully from {import_path}"
     except Exception as e:
         return f"Error importing data: {e}"
\ No newline at end of file
@@ -0,0 +1,291 @@
+import copy
+import time
+from itertools import islice
+
+from data import (
+    DATA_FILE, load_data, save_data, reload_external_changes, make_card, validate_flashcards, ensure_unique_ids
+)
+from indexes import build_card_indexes
+from tags import TagIndex, normalize_tags
+from distractors import DistractorIndex
+from sampling import merge_card_stats
+from media import MediaStore, media_dir, normalize_media
+from rollups import Rollups, rollups_path
+from metrics import histogram
+from history import CommandLog, InsertCards, DeleteCards, EditCards, CardStatsChange, CompositeCommand, card_fields
+
+EXTRA_INDEXES = ("related", "distractors", "tags")
+
+EDIT_PROGRESS_STEP = 1000  # cards between progress reports during a bulk edit
+
+SEARCH_SECONDS = histogram("codecard_search_seconds", "Card search and filter duration")
+
+class Deck:
+    """One loaded deck shard: its data dict, file path and card indexes.
+
+    Every card mutation goes through here so the indexes stay in sync. The
+    desktop UI and the command line both sit on top of this class, and
+    nothing it imports depends on Qt.
+
+    `indexes` names the indexes to build on top of the id lookup and sort
+    orders (the app wants all of them; a bulk command only what it queries),
+    or is None to build none at all.
+
+    Edits made through these methods are recorded in `history` and can be
+    undone and redone; see history.py. While `progress` is set, bulk edits
+    (and their undo and redo) report to it as progress(done, total), so a UI
+    can keep a progress dialog moving. Answer-history rollups for the stats
+    view are loaded on first use and saved with the deck; see rollups.py.
+    """
+    def __init__(self, data, path=None, slug=None, indexes=EXTRA_INDEXES):
+        self.data = data
+        self.path = path or DATA_FILE
+        self.slug = slug
+        self.index_names = indexes
+        self.indexes = None
+        self.history = CommandLog()
+        self.progress = None
+        self._rollups = None
+        if indexes is not None:
+            self.build_indexes()
+
+    @classmethod
+    def open(cls, path=None, slug=None, indexes=EXTRA_INDEXES):
+        return cls(load_data(path), path, slug, indexes)
+
+    @property
+    def cards(self):
+        return self.data["flashcards"]
+
+    def build_indexes(self):
+        self.indexes = build_card_indexes(self.cards)
+        if "related" in self.index_names:
+            # numpy-backed; imported on first use so commands that never need it start fast.
+            from related import RelatedIndex, related_index_path
+            self.indexes.register("related", RelatedIndex(related_index_path(self.path)), self.cards)
+        if "distractors" in self.index_names:
+            self.indexes.register("distractors", DistractorIndex(), self.cards)
+        if "tags" in self.index_names:
+            self.indexes.register("tags", TagIndex(), self.cards)
+
+    def replace(self, other):
+        """Take over another deck's contents, keeping this deck's data dict alive for its holders."""
+        self.data.clear()
+        self.data.update(other.data)
+        self.path, self.slug = other.path, other.slug
+        self.history.clear()
+        self._rollups = None
+        if self.index_names is not None:
+            self.build_indexes()
+
+    @property
+    def media(self):
+        """The blob store holding this deck's images (see media.py)."""
+        return MediaStore(media_dir(self.path))
+
+    @property
+    def rollups(self):
+        """The daily, weekly and per-card answer aggregates of this deck (see rollups.py)."""
+        if self._rollups is None:
+            self._rollups = Rollups(rollups_path(self.path))
+        return self._rollups
+
+    def card(self, card_id):
+        return self.indexes.by_id.get(card_id)
+
+    def add_card(self, question, answer, tags=(), media=()):
+        tags = normalize_tags(tags)
+        media = normalize_media(media)
+        card = make_card(question, answer, **({"tags": tags} if tags else {}), **({"media": media} if media else {}))
+        self.history.record(InsertCards(self.insert_entries([(len(self.cards), card)]), "add"))
+        return card
+
+    def update_card(self, card, question, answer, tags=(), media=None):
+        """Edit a card's text and tags; `media` replaces its image hashes unless None."""
+        fields = {"question": question, "answer": answer}
+        tags = normalize_tags(tags)
+        media = normalize_media(card.get("media", ()) if media is None else media)
+        if tags:
+            fields["tags"] = tags
+        if media:
+            fields["media"] = media
+        self.edit_cards([(card, fields)], "edit")
+        return card
+
+    def edit_cards(self, changes, label="batch edit"):
+        """Apply (card, new fields) pairs in one pass as a single undoable step; returns the cards."""
+        before = [card_fields(card) for card, _ in changes]
+        cards = self.set_fields(changes)
+        self.history.record(EditCards([(card["id"], old, new)
+                                       for card, old, (_, new) in zip(cards, before, changes)], label))
+        return cards
+
+    def remove_cards(self, card_ids, label="delete"):
+        """Remove cards from the deck and the indexes in one pass."""
+        self.history.record(DeleteCards(self.delete_entries(card_ids), label))
+
+    def import_cards(self, cards):
+        """Validate and append cards; returns (imported cards, errors)."""
+        valid_cards, errors = validate_flashcards(cards)
+        ensure_unique_ids(valid_cards, self.indexes.by_id)
+        if valid_cards:
+            start = len(self.cards)
+            entries = self.insert_entries([(start + i, card) for i, card in enumerate(valid_cards)])
+            self.history.record(InsertCards(entries, "import"))
+        return valid_cards, errors
+
+    # Primitive edits, shared by the methods above and by undo/redo.
+
+    def set_fields(self, edits):
+        """Give cards new question/answer/tags/media values from (card, fields) pairs; returns the cards.
+
+        Tags and media absent from `fields` are removed. The indexes follow
+        in one batch and only redo what the edits changed for them. Progress
+        is reported over both halves: the cards, then the indexes.
+        """
+        progress = self.progress
+        total = 2 * len(edits)
+        cards = []
+        for done, (card, fields) in enumerate(edits):
+            if progress and done % EDIT_PROGRESS_STEP == 0:
+                progress(done, total)
+            card["question"] = fields["question"]
+            card["answer"] = fields["answer"]
+            for field in ("tags", "media"):
+                if fields.get(field):
+                    card[field] = list(fields[field])
+                else:
+                    card.pop(field, None)
+            cards.append(card)
+        self.indexes.cards_updated(cards, self.cards, progress and (
+            lambda done, count: progress(len(edits) + len(edits) * done // count, total)))
+        return cards
+
+    def insert_entries(self, entries):
+        """Put (position, card) entries back into the deck in one pass; returns those inserted.
+
+        Positions are where the cards sat before they were removed, so
+        re-inserting a removed set restores the original order. Cards whose
+        id is already present are skipped.
+        """
+        entries = sorted((entry for entry in entries if entry[1]["id"] not in self.indexes.by_id),
+                         key=lambda entry: entry[0])
+        if not entries:
+            return []
+        if entries[0][0] >= len(self.cards):
+            self.cards.extend(card for _, card in entries)
+        else:
+            merged, remaining = [], iter(self.cards)
+            for position, card in entries:
+                merged.extend(islice(remaining, max(0, position - len(merged))))
+                merged.append(card)
+            merged.extend(remaining)
+            self.cards[:] = merged
+        for _, card in entries:
+            self.indexes.card_added(card)
+        return entries
+
+    def delete_entries(self, card_ids):
+        """Remove cards in one pass; returns their (position, card) entries."""
+        card_ids = set(card_ids)
+        entries, kept = [], []
+        for position, card in enumerate(self.cards):
+            if card["id"] in card_ids:
+                entries.append((position, card))
+            else:
+                kept.append(card)
+        if entries:
+            self.cards[:] = kept
+        for _, card in entries:
+            self.indexes.card_removed(card["id"])
+        return entries
+
+    def undo(self):
+        """Revert the last edit; returns (label, card diff) or None if there is nothing to undo."""
+        return self.history.undo(self)
+
+    def redo(self):
+        """Reapply the last undone edit; returns (label, card diff) or None."""
+        return self.history.redo(self)
+
+    @staticmethod
+    def matches_text(card, text):
+        text = text.lower()
+        return text in card["question"].lower() or text in card["answer"].lower()
+
+    def tag_mask(self, tag_filter):
+        """Bitmap of the cards matching a tag expression, or None for an empty filter.
+
+        Raises ValueError for a malformed expression.
+        """
+        return self.indexes["tags"].query(tag_filter) if tag_filter.strip() else None
+
+    def search(self, text="", tag_mask=None, sort="question", reverse=False):
+        """Ids of the cards matching a text search and a tag bitmap, in `sort` order."""
+        start = time.perf_counter()
+        subset = None if tag_mask is None else set(self.indexes["tags"].ids_in(tag_mask))
+        if text:
+            cards = self.cards if subset is None else (self.indexes.by_id[i] for i in subset)
+            subset = {card["id"] for card in cards if self.matches_text(card, text)}
+        card_ids = self.indexes[sort].ordered_ids(subset, reverse=reverse)
+        SEARCH_SECONDS.observe(time.perf_counter() - start)
+        return card_ids
+
+    def find_duplicates(self, threshold=None, progress=None):
+        from dedupe import SIMILARITY_THRESHOLD, find_duplicate_clusters
+        return find_duplicate_clusters(self.cards, threshold or SIMILARITY_THRESHOLD, progress=progress)
+
+    def merge_duplicates(self, clusters):
+        """Keep the first card of each cluster, folding the others' answer stats into it.
+
+        Returns the number of cards removed.
+        """
+        card_stats = self.data.setdefault("card_stats", {})
+        touched = [card["id"] for cluster in clusters for card, _ in cluster]
+        before = {card_id: copy.deepcopy(card_stats.get(card_id)) for card_id in touched}
+        duplicate_ids = []
+        for cluster in clusters:
+            ids = [card["id"] for card, _ in cluster[1:]]
+            merge_card_stats(card_stats, cluster[0][0]["id"], ids)
+            duplicate_ids.extend(ids)
+        if duplicate_ids:
+            after = {card_id: copy.deepcopy(card_stats.get(card_id)) for card_id in touched}
+            self.history.record(CompositeCommand([CardStatsChange(before, after),
+                                                  DeleteCards(self.delete_entries(duplicate_ids))],
+                                                 "merge duplicates"))
+        return len(duplicate_ids)
+
+    def save(self, overwrite=False):
+        """Write the deck's shard, returning the diff merged in from other writers (or None)."""
+        diff = save_data(self.data, overwrite, self.path)
+        self.apply_diff(diff)
+        if self._rollups is not None:
+            self._rollups.save_if_changed()
+        return diff
+
+    def reload(self):
+        """Merge changes other processes saved to the shard; returns the diff or None."""
+        diff = reload_external_changes(self.data, self.path)
+        self.apply_diff(diff)
+        return diff
+
+    def apply_diff(self, diff):
+        if diff and self.indexes is not None:
+            self.indexes.apply_diff(diff)
+
+    def summary(self):
+        """Card, tag and score counts for reports."""
+        stats = self.data.get("stats", {})
+        tags = {}
+        for card in self.cards:
+            for tag in card.get("tags", ()):
+                tags[tag] = tags.get(tag, 0) + 1
+        return {
+            "cards": len(self.cards),
+            "tagged": sum(1 for card in self.cards if card.get("tags")),
+            "tags": dict(sorted(tags.items(), key=lambda item: (-item[1], item[0]))),
+            "studied": len(self.data.get("card_stats", {})),
+            "correct": stats.get("correct", 0),
+            "total": stats.get("total", 0),
+            "revision": self.data.get("revision", 0),
+        }
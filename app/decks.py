@@ -0,0 +1,118 @@
+import json
+import os
+import re
+import logging
+from datetime import datetime
+
+from data import DATA_FILE, file_lock, load_data, save_data
+
+CATALOGUE_FILE = "decks.json"
+DECKS_DIR = "decks"
+DEFAULT_DECK = "default"
+RESERVED_SLUGS = (os.path.splitext(DATA_FILE)[0],)  # would share the default deck's backup names
+
+_NON_SLUG = re.compile(r"[^a-z0-9]+")
+
+def deck_slug(name):
+    return _NON_SLUG.sub("-", name.casefold()).strip("-") or "deck"
+
+def _default_catalogue():
+    """A catalogue for the original single-file deck (left in place) plus any shards on disk."""
+    decks = {DEFAULT_DECK: {"name": "My Flashcards", "file": DATA_FILE, "cards": None,
+                            "stats": {"correct": 0, "total": 0}, "last_modified": None}}
+    if os.path.isdir(DECKS_DIR):
+        for name in sorted(os.listdir(DECKS_DIR)):
+            slug, ext = os.path.splitext(name)
+            if ext == ".json" and slug not in decks:
+                decks[slug] = {"name": slug, "file": os.path.join(DECKS_DIR, name), "cards": None,
+                               "stats": {"correct": 0, "total": 0}, "last_modified": None}
+    return {"version": 1, "active": DEFAULT_DECK, "decks": decks}
+
+def _read_catalogue(path):
+    if not os.path.exists(path):
+        return _default_catalogue()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            catalogue = json.load(f)
+        if not catalogue.get("decks"):
+            raise ValueError("catalogue lists no decks")
+    except (OSError, ValueError) as e:
+        logging.error(f"Error loading deck catalogue, rebuilding it: {e}")
+        return _default_catalogue()
+    if catalogue.get("active") not in catalogue["decks"]:
+        catalogue["active"] = next(iter(catalogue["decks"]))
+    return catalogue
+
+def load_catalogue(path=None):
+    """Read the deck catalogue, or describe the existing deck file if there is none yet.
+
+    The catalogue is small: one entry per deck with its shard file, card
+    count and stats, so listing decks never opens a shard.
+    """
+    path = path or CATALOGUE_FILE
+    if not os.path.exists(path):
+        return _default_catalogue()
+    with file_lock(path, exclusive=False):
+        return _read_catalogue(path)
+
+def _write_catalogue(catalogue, path):
+    temp_file = path + ".tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(catalogue, f, indent=4, ensure_ascii=False)
+    os.replace(temp_file, path)
+
+def update_catalogue(update, path=None):
+    """Apply `update(catalogue)` under the catalogue lock and write it back.
+
+    The file is re-read first so entries written by other processes survive.
+    Returns the updated catalogue.
+    """
+    path = path or CATALOGUE_FILE
+    with file_lock(path):
+        catalogue = _read_catalogue(path)
+        update(catalogue)
+        _write_catalogue(catalogue, path)
+    return catalogue
+
+def deck_file(catalogue, slug):
+    return catalogue["decks"][slug]["file"]
+
+def record_deck(slug, data, path=None):
+    """Refresh a deck's catalogue entry (card count, stats) after it was loaded or saved."""
+    def update(catalogue):
+        entry = catalogue["decks"].get(slug)
+        if entry is None:
+            return
+        entry["cards"] = len(data["flashcards"])
+        entry["stats"] = dict(data["stats"])
+        entry["last_modified"] = data.get("last_modified") or datetime.now().isoformat()
+    return update_catalogue(update, path)
+
+def set_active_deck(slug, path=None):
+    def update(catalogue):
+        if slug in catalogue["decks"]:
+            catalogue["active"] = slug
+    return update_catalogue(update, path)
+
+def create_deck(name, settings=None, path=None):
+    """Add an empty deck with its own shard file; returns its slug."""
+    created = {}
+
+    def update(catalogue):
+        base = deck_slug(name)
+        slug, n = base, 2
+        while slug in catalogue["decks"] or slug in RESERVED_SLUGS or \
+                os.path.exists(os.path.join(DECKS_DIR, f"{slug}.json")):
+            slug, n = f"{base}-{n}", n + 1
+        os.makedirs(DECKS_DIR, exist_ok=True)
+        shard = os.path.join(DECKS_DIR, f"{slug}.json")
+        data = load_data(shard, default_cards=[])
+        if settings:
+            data["settings"] = dict(settings)
+            save_data(data, path=shard)
+        catalogue["decks"][slug] = {"name": name.strip() or slug, "file": shard, "cards": 0,
+                                    "stats": dict(data["stats"]), "last_modified": data["last_modified"]}
+        created["slug"] = slug
+
+    update_catalogue(update, path)
+    return created["slug"]
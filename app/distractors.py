@@ -0,0 +1,213 @@
+import bisect
+import random
+import re
+from itertools import chain, zip_longest
+
+from indexes import BULK_REBUILD_FRACTION, CardIndex
+
+CHOICE_COUNT = 4
+POOL_SIZE = 8
+BOOLEAN_ANSWERS = frozenset({"true", "false", "yes", "no"})
+
+_NUMBER = re.compile(r"[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?%?")
+_CODE = re.compile(r"[()\[\]{}<>=;:.`_#$]|\w[A-Z]")
+
+def answer_kind(answer):
+    """Coarse token type of an answer: number, boolean, code or text."""
+    if _NUMBER.fullmatch(answer):
+        return "number"
+    if answer.casefold() in BOOLEAN_ANSWERS:
+        return "boolean"
+    if _CODE.search(answer):
+        return "code"
+    return "text"
+
+def answer_class(answer):
+    """(token type, length class) of an answer; length classes double in word count."""
+    answer = answer.strip()
+    return answer_kind(answer), min(len(answer.split()).bit_length(), 5)
+
+class DistractorIndex(CardIndex):
+    """Answers grouped by class and sorted by text, for multiple-choice options.
+
+    Cards whose answers share a token type and length class are plausible
+    wrong options for each other; within a class, neighbours in sorted
+    order share a prefix. Every card's pool of distractor candidates is
+    computed when the index is built and refreshed for the cards near an
+    added or removed answer, so building a question never scans the deck.
+    Cards with the same answer share one pool, computed once.
+    """
+    def __init__(self, cards=()):
+        self.rebuild(cards)
+
+    def clear(self):
+        self.buckets = {}
+        self.keys = {}
+        self.answers = {}
+        self.pools = {}
+        self.widened = set()  # answer keys whose pool reaches into other length classes
+
+    def rebuild(self, cards):
+        self.clear()
+        for card in cards:
+            key = (answer_class(card["answer"]), card["answer"].casefold())
+            self.keys[card["id"]] = key
+            self.answers[card["id"]] = card["answer"]
+            self.buckets.setdefault(key[0], []).append((key[1], card["id"]))
+        for bucket in self.buckets.values():
+            bucket.sort()
+            self._fill_pools(bucket)
+        for key in {self.keys[card_id] for card_id, pool in self.pools.items() if len(pool) < CHOICE_COUNT - 1}:
+            self._update_pools(key)
+
+    def add(self, card):
+        self._refresh_near([self._insert(card)])
+
+    def remove(self, card_id):
+        key = self._delete(card_id)
+        if key is not None:
+            self._refresh_near([key])
+
+    def update_many(self, cards, all_cards):
+        """Move the cards whose answer changed, then refresh each pool they affect once."""
+        changed = [card for card in cards if self.answers.get(card["id"]) != card["answer"]]
+        if len(changed) > len(all_cards) * BULK_REBUILD_FRACTION:
+            self.rebuild(all_cards)
+            return
+        keys = []
+        for card in changed:
+            keys.append(self._delete(card["id"]))
+            keys.append(self._insert(card))
+        affected = self._affected([key for key in keys if key is not None])
+        if len(affected) > len(self.keys) * BULK_REBUILD_FRACTION:
+            self.rebuild(all_cards)
+            return
+        for key in affected:
+            self._update_pools(key)
+
+    def _insert(self, card):
+        key = (answer_class(card["answer"]), card["answer"].casefold())
+        self.keys[card["id"]] = key
+        self.answers[card["id"]] = card["answer"]
+        bisect.insort(self.buckets.setdefault(key[0], []), (key[1], card["id"]))
+        return key
+
+    def _delete(self, card_id):
+        key = self.keys.pop(card_id, None)
+        if key is None:
+            return None
+        del self.answers[card_id]
+        self.pools.pop(card_id, None)
+        bucket = self.buckets[key[0]]
+        position = bisect.bisect_left(bucket, (key[1], card_id))
+        if position < len(bucket) and bucket[position] == (key[1], card_id):
+            del bucket[position]
+        start, end = self._group(bucket, key[1])
+        if start == end:
+            self.widened.discard(key)
+        return key
+
+    @staticmethod
+    def _group(bucket, text):
+        """The slice of a sorted bucket holding the cards whose answer is `text`."""
+        return bisect.bisect_left(bucket, (text,)), bisect.bisect_left(bucket, (text + "\0",))
+
+    def _refresh_near(self, keys):
+        for key in self._affected(keys):
+            self._update_pools(key)
+
+    def _affected(self, keys):
+        """The answer keys whose pools answers with these keys can be in: class neighbours and widened pools."""
+        kinds = {kind for (kind, _), _ in keys}
+        affected = {other for other in self.widened if other[0][0] in kinds}
+        for (kind, length), text in keys:
+            affected.update(((kind, length), other) for other in self._texts_near(self.buckets[(kind, length)], text))
+        return affected
+
+    def _texts_near(self, bucket, text):
+        """`text` if present plus the POOL_SIZE + 1 distinct answers either side of it in a bucket."""
+        texts = set()
+        for step in (1, -1):
+            i = bisect.bisect_left(bucket, (text,)) - (step < 0)
+            for _ in range(POOL_SIZE + 1):
+                if not 0 <= i < len(bucket):
+                    break
+                texts.add(bucket[i][0])
+                start, end = self._group(bucket, bucket[i][0])
+                i = end if step > 0 else start - 1
+        return texts
+
+    @staticmethod
+    def _interleave(above, below, limit):
+        return [card_id for card_id in chain.from_iterable(zip_longest(above, below)) if card_id][:limit]
+
+    def _fill_pools(self, bucket):
+        """Compute the in-class pools of a whole sorted bucket in one pass (what _neighbours gives each card)."""
+        texts, first_ids, last_ids, groups = [], [], [], []
+        for text, card_id in bucket:
+            if not texts or texts[-1] != text:
+                texts.append(text)
+                first_ids.append(card_id)
+                last_ids.append(card_id)
+                groups.append([])
+            last_ids[-1] = card_id
+            groups[-1].append(card_id)
+        for j, group in enumerate(groups):
+            pool = self._interleave(first_ids[j + 1:j + 1 + POOL_SIZE], last_ids[max(0, j - POOL_SIZE):j][::-1],
+                                    POOL_SIZE)
+            for card_id in group:
+                self.pools[card_id] = pool
+
+    def _neighbours(self, bucket, text, limit, seen):
+        """Up to `limit` distinct answers closest to `text`, taken alternately above and below it."""
+        position = bisect.bisect_left(bucket, (text, ""))
+
+        def walk(i, step):
+            # Yields the first card of each answer above and the last one below, skipping whole groups.
+            while 0 <= i < len(bucket):
+                if bucket[i][0] not in seen:
+                    seen.add(bucket[i][0])
+                    yield bucket[i][1]
+                start, end = self._group(bucket, bucket[i][0])
+                i = end if step > 0 else start - 1
+
+        above, below = walk(position, 1), walk(position - 1, -1)
+        return self._interleave((next(above, None) for _ in range(limit)),
+                                (next(below, None) for _ in range(limit)), limit)
+
+    def _update_pools(self, key):
+        """Recompute the pool shared by every card whose answer has this key."""
+        (kind, length), text = key
+        bucket = self.buckets[(kind, length)]
+        start, end = self._group(bucket, text)
+        if start == end:
+            return
+        seen = {text}
+        pool = self._neighbours(bucket, text, POOL_SIZE, seen)
+        self.widened.discard(key)
+        if len(pool) < CHOICE_COUNT - 1:
+            # Too few in the class: widen to the nearest length classes of the same type, shorter
+            # first on a tie, so the order the buckets were created in never matters.
+            self.widened.add(key)
+            for other in sorted((k for k in self.buckets if k[0] == kind and k[1] != length),
+                                key=lambda k: (abs(k[1] - length), k[1])):
+                if len(pool) >= CHOICE_COUNT - 1:
+                    break
+                pool = pool + self._neighbours(self.buckets[other], text, CHOICE_COUNT - 1 - len(pool), seen)
+        for _, card_id in bucket[start:end]:
+            self.pools[card_id] = pool
+
+    def pool(self, card_id):
+        """Precomputed distractor candidates for a card, nearest first."""
+        return self.pools[card_id]
+
+    def choices(self, card, count=CHOICE_COUNT, rng=random):
+        """The card's answer plus up to `count - 1` distractors, shuffled."""
+        if card["id"] not in self.keys:
+            self.add(card)
+        correct = card["answer"].casefold()
+        candidates = [self.answers[card_id] for card_id in self.pool(card["id"])
+                      if card_id in self.answers and self.answers[card_id].casefold() != correct]
+        options = rng.sample(candidates, min(count - 1, len(candidates))) + [card["answer"]]
+        rng.shuffle(options)
+        return options
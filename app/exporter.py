@@ -0,0 +1,92 @@
+import csv
+import gzip
+import json
+
+EXPORT_FORMATS = ("json", "ndjson", "csv")
+EXPORT_CHUNK_SIZE = 1000
+COPY_CHUNK_BYTES = 1 << 20
+CSV_FIELDS = ("id", "question", "answer", "tags")
+CSV_TAG_SEPARATOR = ","  # normalized tags never contain commas or spaces
+
+def detect_format(path):
+    """Guess (format, gzip) from a file name such as 'deck.ndjson.gz'."""
+    name = path.lower()
+    compress = name.endswith(".gz")
+    if compress:
+        name = name[:-3]
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson", compress
+    if name.endswith(".csv"):
+        return "csv", compress
+    return "json", compress
+
+def open_export_file(path, compress):
+    """Open an export target for text writing, gzip-compressed if requested."""
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+def _chunks(cards, chunk_size):
+    chunk = []
+    for card in cards:
+        chunk.append(card)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _csv_row(card):
+    return [card.get("id", ""), card.get("question", ""), card.get("answer", ""),
+            CSV_TAG_SEPARATOR.join(card.get("tags", ()))]
+
+def export_cards(cards, path, fmt=None, compress=None, progress=None, total=None,
+                 chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream flashcards to a JSON, NDJSON or CSV file, optionally gzipped.
+
+    `cards` can be any iterable, e.g. a generator over a filtered view of the
+    deck, so nothing is copied. Cards are serialized and written one chunk at
+    a time; `progress(done, total)` is called after each chunk. Returns the
+    number of cards written.
+    """
+    detected_fmt, detected_compress = detect_format(path)
+    fmt = fmt or detected_fmt
+    compress = detected_compress if compress is None else compress
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    written = 0
+    with open_export_file(path, compress) as f:
+        writer = csv.writer(f) if fmt == "csv" else None
+        if fmt == "json":
+            f.write("[")
+        elif fmt == "csv":
+            writer.writerow(CSV_FIELDS)
+        for chunk in _chunks(cards, chunk_size):
+            if fmt == "json":
+                f.write(("," if written else "") + ",".join(
+                    "\n  " + json.dumps(card, ensure_ascii=False) for card in chunk))
+            elif fmt == "ndjson":
+                f.write("".join(json.dumps(card, ensure_ascii=False) + "\n" for card in chunk))
+            else:
+                writer.writerows(_csv_row(card) for card in chunk)
+            written += len(chunk)
+            if progress:
+                progress(written, total)
+        if fmt == "json":
+            f.write("\n]\n")
+    return written
+
+def copy_stream(src, path, compress=False, progress=None, total=None):
+    """Copy a binary stream to `path` in fixed-size chunks, optionally gzipped."""
+    with (gzip.open(path, 'wb') if compress else open(path, 'wb')) as dst:
+        copied = 0
+        while True:
+            block = src.read(COPY_CHUNK_BYTES)
+            if not block:
+                break
+            dst.write(block)
+            copied += len(block)
+            if progress:
+                progress(copied, total)
+    return copied
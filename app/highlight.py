@@ -0,0 +1,165 @@
+"""Syntax-highlighted HTML for cards that contain code.
+
+Card text is plain apart from Markdown-style fences (```python ... ```)
+and inline `code`. highlight_html turns such text into the rich-text
+subset that QLabel and QTextDocument understand, coloring code with
+Pygments when it is installed and using plain monospace otherwise.
+
+Pygments is pure Python and takes milliseconds per block, so rendered HTML
+is kept in a bounded LRU keyed by a hash of the text, and the dialogs
+prefetch the cards they will show next on a worker thread. Qt-free.
+"""
+import hashlib
+import html
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import counter, histogram
+
+try:
+    from pygments import highlight as pygments_highlight
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import get_lexer_by_name, guess_lexer
+    from pygments.util import ClassNotFound
+except ImportError:  # code blocks are shown in plain monospace
+    pygments_highlight = None
+
+CACHE_SIZE = 4096
+CODE_STYLE = "default"
+PRE_STYLE = ("background: #f1f5f9; color: #1e293b; font-family: 'JetBrains Mono', Consolas, monospace; "
+             "font-size: 13px; font-weight: normal;")
+INLINE_STYLE = "background: #f1f5f9; font-family: 'JetBrains Mono', Consolas, monospace;"
+
+_FENCE = re.compile(r"\n?```[ \t]*([\w+#.-]*)[^\n]*\n(.*?)\n?[ \t]*(?:```\n?|\Z)", re.DOTALL)
+_INLINE = re.compile(r"`([^`\n]+)`")
+
+CACHE_HITS = counter("codecard_highlight_cache_total", "Highlighted-card cache lookups", result="hit")
+CACHE_MISSES = counter("codecard_highlight_cache_total", "Highlighted-card cache lookups", result="miss")
+RENDER_SECONDS = histogram("codecard_highlight_render_seconds", "Time to syntax-highlight one card text")
+
+_FORMATTER = HtmlFormatter(style=CODE_STYLE, noclasses=True, nowrap=True) if pygments_highlight else None
+_LEXERS = {}
+
+def has_code(text):
+    """Whether a card text needs highlighting (a quick check before any parsing)."""
+    return "`" in text
+
+def _lexer(language, code):
+    if not language:
+        try:
+            return guess_lexer(code)
+        except ClassNotFound:
+            return None
+    if language not in _LEXERS:
+        try:
+            _LEXERS[language] = get_lexer_by_name(language)
+        except ClassNotFound:
+            _LEXERS[language] = None
+    return _LEXERS[language]
+
+def _code_html(code, language):
+    lexer = _lexer(language, code) if pygments_highlight else None
+    body = pygments_highlight(code, lexer, _FORMATTER).rstrip("\n") if lexer else html.escape(code)
+    return f'<pre style="{PRE_STYLE}">{body}</pre>'
+
+def _text_html(text):
+    parts, position = [], 0
+    for match in _INLINE.finditer(text):
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f'<code style="{INLINE_STYLE}">{html.escape(match.group(1))}</code>')
+        position = match.end()
+    parts.append(html.escape(text[position:]))
+    return "".join(parts).replace("\n", "<br>")
+
+def highlight_html(text):
+    """Card text as rich-text HTML, with fenced blocks highlighted and inline code in monospace."""
+    start = time.perf_counter()
+    parts, position = [], 0
+    for match in _FENCE.finditer(text):
+        parts.append(_text_html(text[position:match.start()]))
+        parts.append(_code_html(match.group(2), match.group(1).lower()))
+        position = match.end()
+    parts.append(_text_html(text[position:]))
+    RENDER_SECONDS.observe(time.perf_counter() - start)
+    return "".join(parts)
+
+class HighlightCache:
+    """Rendered HTML by content hash; the least recently used entries go past `size`.
+
+    Safe to use from the UI thread while the worker fills it. `prefetch`
+    renders texts in the background and calls `callback(text)` from the
+    worker thread when each one is ready, also when another prefetch had
+    already queued it.
+    """
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.pending = {}  # key -> callbacks waiting for it
+        self.lock = threading.Lock()
+        self.executor = None
+
+    @staticmethod
+    def key(text):
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, text):
+        """Cached HTML for a text, or None if it has not been rendered yet."""
+        key = self.key(text)
+        with self.lock:
+            rendered = self.entries.get(key)
+            if rendered is not None:
+                self.entries.move_to_end(key)
+        (CACHE_HITS if rendered is not None else CACHE_MISSES).inc()
+        return rendered
+
+    def render(self, text):
+        """HTML for a text, rendering it now on a cache miss."""
+        rendered = self.get(text)
+        if rendered is None:
+            rendered = self._store(self.key(text), highlight_html(text))
+        return rendered
+
+    def _store(self, key, rendered):
+        with self.lock:
+            self.entries[key] = rendered
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return rendered
+
+    def prefetch(self, texts, callback=None):
+        """Render the texts that contain code and are not cached yet, on the worker thread."""
+        for text in texts:
+            if not has_code(text):
+                continue
+            key = self.key(text)
+            with self.lock:
+                cached = key in self.entries
+                queued = not cached and key in self.pending
+                if not cached:
+                    self.pending.setdefault(key, []).extend([callback] if callback else [])
+                if not (cached or queued) and self.executor is None:
+                    self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="highlight")
+            if cached:
+                if callback:
+                    callback(text)
+            elif not queued:
+                self.executor.submit(self._prefetch_one, key, text)
+
+    def _prefetch_one(self, key, text):
+        try:
+            self._store(key, highlight_html(text))
+        finally:
+            with self.lock:
+                callbacks = self.pending.pop(key, [])
+        for callback in callbacks:
+            callback(text)
+
+HIGHLIGHTER = HighlightCache()
+
+def card_html(text):
+    """Highlighted HTML for a card text, or None when it has no code and can stay plain text."""
+    return HIGHLIGHTER.render(text) if has_code(text) else None
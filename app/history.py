@@ -0,0 +1,200 @@
+"""Undo/redo for deck edits as a log of invertible commands.
+
+Each command records only the cards it touched (and, for merges, the
+answer stats it folded together), so undoing or redoing costs the size of
+the change rather than a reload from a backup. The log keeps commands until
+their estimated size passes a memory budget, then forgets the oldest.
+"""
+import copy
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+
+HISTORY_BUDGET_BYTES = 64 << 20
+CARD_OVERHEAD_BYTES = 400  # dict, id and list slot, roughly
+EDIT_OVERHEAD_BYTES = 200  # the fields dict and change tuple; the strings are shared with the card
+
+def card_size(card):
+    return CARD_OVERHEAD_BYTES + len(card["question"]) + len(card["answer"]) + \
+        sum(len(tag) + 50 for tag in card.get("tags", ()))
+
+def card_fields(card):
+    """The user-editable fields of a card, copied (absent tags and media stay absent)."""
+    fields = {"question": card["question"], "answer": card["answer"]}
+    for field in ("tags", "media"):
+        if field in card:
+            fields[field] = list(card[field])
+    return fields
+
+def empty_diff():
+    return {"added": [], "updated": [], "removed": [], "conflicts": []}
+
+class Command(ABC):
+    """An applied deck change that knows how to revert and reapply itself.
+
+    `undo` and `redo` return a card diff in the shape storage merges use,
+    so views can update just the affected rows.
+    """
+    label = "change"
+    size = 0
+
+    @abstractmethod
+    def undo(self, deck):
+        """Revert the change in `deck`."""
+
+    @abstractmethod
+    def redo(self, deck):
+        """Apply the change to `deck` again."""
+
+class InsertCards(Command):
+    """Cards added at the given deck positions (an add or an import)."""
+    def __init__(self, entries, label="add"):
+        self.entries = entries
+        self.label = label
+        self.size = sum(card_size(card) for _, card in entries)
+
+    def undo(self, deck):
+        diff = empty_diff()
+        diff["removed"] = [entry[1]["id"] for entry in deck.delete_entries([card["id"] for _, card in self.entries])]
+        return diff
+
+    def redo(self, deck):
+        diff = empty_diff()
+        diff["added"] = [card for _, card in deck.insert_entries(self.entries)]
+        return diff
+
+class DeleteCards(InsertCards):
+    """Cards removed from the given deck positions."""
+    def __init__(self, entries, label="delete"):
+        super().__init__(entries, label)
+
+    undo, redo = InsertCards.redo, InsertCards.undo
+
+class EditCards(Command):
+    """Question, answer and tags of one or more cards before and after an edit."""
+    def __init__(self, changes, label="edit"):
+        self.changes = changes  # [(card id, fields before, fields after)]
+        self.label = label
+        self.size = sum(EDIT_OVERHEAD_BYTES + len(before["question"]) + len(before["answer"])
+                        for _, before, _ in changes)
+
+    def _set(self, deck, side):
+        by_id = deck.indexes.by_id
+        diff = empty_diff()
+        diff["updated"] = deck.set_fields([(by_id[change[0]], change[side]) for change in self.changes
+                                           if change[0] in by_id])
+        return diff
+
+    def undo(self, deck):
+        return self._set(deck, 1)
+
+    def redo(self, deck):
+        return self._set(deck, 2)
+
+class CardStatsChange(Command):
+    """Answer stats entries before and after a change (None where an entry was absent)."""
+    def __init__(self, before, after, label="stats"):
+        self.before = before
+        self.after = after
+        self.label = label
+        self.size = 200 * (len(before) + len(after))
+
+    @staticmethod
+    def _set(deck, entries):
+        card_stats = deck.data.setdefault("card_stats", {})
+        for card_id, stats in entries.items():
+            if stats is None:
+                card_stats.pop(card_id, None)
+            else:
+                card_stats[card_id] = copy.deepcopy(stats)
+        return empty_diff()
+
+    def undo(self, deck):
+        return self._set(deck, self.before)
+
+    def redo(self, deck):
+        return self._set(deck, self.after)
+
+class CompositeCommand(Command):
+    """Several commands applied as one step; undone in reverse order."""
+    def __init__(self, commands, label):
+        self.commands = commands
+        self.label = label
+        self.size = sum(command.size for command in commands)
+
+    @staticmethod
+    def _combine(diffs):
+        diff = empty_diff()
+        for part in diffs:
+            for key in diff:
+                diff[key].extend(part[key])
+        return diff
+
+    def undo(self, deck):
+        return self._combine([command.undo(deck) for command in reversed(self.commands)])
+
+    def redo(self, deck):
+        return self._combine([command.redo(deck) for command in self.commands])
+
+class CommandLog:
+    """Undo and redo stacks of commands within a memory budget.
+
+    `size` is kept as a running total of both stacks, so recording a
+    command costs the size of that change, not of the whole history.
+    """
+    def __init__(self, budget=HISTORY_BUDGET_BYTES):
+        self.budget = budget
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.size = 0
+
+    def record(self, command):
+        """Remember an applied command; clears the redo stack.
+
+        Returns False if the command alone is larger than the budget, in
+        which case the history is cleared rather than left inconsistent.
+        """
+        while self.redo_stack:
+            self.size -= self.redo_stack.pop().size
+        if command.size > self.budget:
+            logging.info(f"Change too large to undo ({command.size} bytes); history cleared")
+            self.clear()
+            return False
+        self.size += command.size
+        self.undo_stack.append(command)
+        while self.size > self.budget:
+            self.size -= self.undo_stack.popleft().size
+        return True
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.size = 0
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def undo_label(self):
+        return self.undo_stack[-1].label if self.undo_stack else None
+
+    def redo_label(self):
+        return self.redo_stack[-1].label if self.redo_stack else None
+
+    def undo(self, deck):
+        """Revert the latest command; returns (label, card diff) or None."""
+        if not self.undo_stack:
+            return None
+        command = self.undo_stack.pop()
+        self.redo_stack.append(command)
+        return command.label, command.undo(deck)
+
+    def redo(self, deck):
+        """Reapply the latest undone command; returns (label, card diff) or None."""
+        if not self.redo_stack:
+            return None
+        command = self.redo_stack.pop()
+        self.undo_stack.append(command)
+        return command.label, command.redo(deck)
@@ -0,0 +1,181 @@
+import bisect
+import re
+import unicodedata
+from abc import ABC, abstractmethod
+
+_DIGITS = re.compile(r"(\d+)")
+BULK_REBUILD_FRACTION = 0.05  # past this share of the deck, one rebuild beats per-card updates
+
+def collation_key(text):
+    """Case-insensitive natural-order sort key ("Card 9" sorts before "card 10")."""
+    text = unicodedata.normalize("NFKD", text).casefold()
+    return tuple((0, int(part), "") if part.isdigit() else (1, 0, part)
+                 for part in _DIGITS.split(text) if part)
+
+class CardIndex(ABC):
+    """Base class for an index kept in sync with the deck one card at a time."""
+    def rebuild(self, cards):
+        self.clear()
+        for card in cards:
+            self.add(card)
+
+    @abstractmethod
+    def clear(self):
+        """Forget every card."""
+
+    @abstractmethod
+    def add(self, card):
+        """Index a card that was added to the deck."""
+
+    @abstractmethod
+    def remove(self, card_id):
+        """Drop a card that was removed from the deck; unknown ids are ignored."""
+
+    def update(self, card):
+        self.remove(card["id"])
+        self.add(card)
+
+    def update_many(self, cards, all_cards):
+        """Follow edits to many cards; past BULK_REBUILD_FRACTION of `all_cards` one rebuild is cheaper.
+
+        Indexes that can tell which edits matter to them override this to
+        skip the rest.
+        """
+        if len(cards) > len(all_cards) * BULK_REBUILD_FRACTION:
+            self.rebuild(all_cards)
+        else:
+            for card in cards:
+                self.update(card)
+
+class SortedCardIndex(CardIndex):
+    """Cards presorted by the collation key of one field.
+
+    Keys are computed once per card and kept in a sorted list, so add, edit
+    and delete cost a binary search plus a list insert/delete instead of a
+    full re-sort.
+    """
+    def __init__(self, field, cards=()):
+        self.field = field
+        self.rebuild(cards)
+
+    def clear(self):
+        self.entries = []
+        self.keys = {}
+        self.texts = {}  # the text each key was computed from, so unchanged fields are spotted cheaply
+
+    def rebuild(self, cards):
+        self.texts = {card["id"]: card[self.field] for card in cards}
+        self.keys = {card_id: collation_key(text) for card_id, text in self.texts.items()}
+        self.entries = sorted((key, card_id) for card_id, key in self.keys.items())
+
+    def add(self, card):
+        key = collation_key(card[self.field])
+        self.keys[card["id"]] = key
+        self.texts[card["id"]] = card[self.field]
+        bisect.insort(self.entries, (key, card["id"]))
+
+    def remove(self, card_id):
+        key = self.keys.pop(card_id, None)
+        if key is None:
+            return
+        del self.texts[card_id]
+        position = bisect.bisect_left(self.entries, (key, card_id))
+        if position < len(self.entries) and self.entries[position] == (key, card_id):
+            del self.entries[position]
+
+    def update_many(self, cards, all_cards):
+        """Move only the cards whose sort key changed; many of them are re-sorted in one go."""
+        changed = [card for card in cards if self.texts.get(card["id"]) != card[self.field]]
+        if len(changed) > len(self.keys) * BULK_REBUILD_FRACTION:
+            for card in changed:
+                self.keys[card["id"]] = collation_key(card[self.field])
+                self.texts[card["id"]] = card[self.field]
+            self.entries = sorted((key, card_id) for card_id, key in self.keys.items())
+            return
+        for card in changed:
+            self.remove(card["id"])
+            self.add(card)
+
+    def sort_key(self, card_id):
+        return (self.keys[card_id], card_id)
+
+    def ordered_ids(self, subset=None, reverse=False):
+        """Card ids in sorted order, optionally restricted to `subset`.
+
+        Small subsets are sorted by their precomputed keys; large ones are
+        merged by walking the presorted order once.
+        """
+        if subset is None:
+            ids = [card_id for _, card_id in self.entries]
+        elif len(subset) * max(len(subset).bit_length(), 1) < len(self.entries):
+            ids = sorted((card_id for card_id in subset if card_id in self.keys), key=self.sort_key)
+        else:
+            subset = subset if isinstance(subset, (set, frozenset, dict)) else set(subset)
+            ids = [card_id for _, card_id in self.entries if card_id in subset]
+        if reverse:
+            ids.reverse()
+        return ids
+
+class CardIndexes:
+    """The deck's id lookup plus every index that must follow card changes."""
+    def __init__(self, cards, indexes=None):
+        self.indexes = dict(indexes or {})
+        self.rebuild(cards)
+
+    def __getitem__(self, name):
+        return self.indexes[name]
+
+    def get(self, name):
+        return self.indexes.get(name)
+
+    def register(self, name, index, cards):
+        index.rebuild(cards)
+        self.indexes[name] = index
+
+    def rebuild(self, cards):
+        self.by_id = {card["id"]: card for card in cards}
+        for index in self.indexes.values():
+            index.rebuild(cards)
+
+    def card_added(self, card):
+        self.by_id[card["id"]] = card
+        for index in self.indexes.values():
+            index.add(card)
+
+    def card_updated(self, card):
+        self.by_id[card["id"]] = card
+        for index in self.indexes.values():
+            index.update(card)
+
+    def cards_updated(self, cards, all_cards, progress=None):
+        """Follow edits to many cards at once; each index updates only what the edits changed for it.
+
+        `progress(done, total)` is called as each index finishes.
+        """
+        for card in cards:
+            self.by_id[card["id"]] = card
+        for done, index in enumerate(self.indexes.values(), 1):
+            index.update_many(cards, all_cards)
+            if progress:
+                progress(done, len(self.indexes))
+
+    def card_removed(self, card_id):
+        self.by_id.pop(card_id, None)
+        for index in self.indexes.values():
+            index.remove(card_id)
+
+    def apply_diff(self, diff):
+        """Apply a card-level diff as produced by data.diff_flashcards."""
+        for card_id in diff["removed"]:
+            self.card_removed(card_id)
+        for card in diff["updated"]:
+            self.card_updated(card)
+        for card in diff["added"]:
+            self.card_added(card)
+
+def build_card_indexes(cards):
+    """The standard set of indexes the desktop app maintains."""
+    return CardIndexes(cards, {
+        "question": SortedCardIndex("question"),
+        "answer": SortedCardIndex("answer"),
+    })
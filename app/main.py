@@ -1,9 +1,14 @@
+import os
 import sys
-from PyQt5.QtWidgets import QApplication, QMainWindow, QStackedWidget, QSplashScreen, QDesktopWidget
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QApplication, QMainWindow, QStackedWidget, QSplashScreen, QDesktopWidget, QMessageBox
+from PyQt5.QtCore import Qt, QTimer, QFileSystemWatcher
 from PyQt5.QtGui import QFont, QPixmap
 from ui import LandingPage, MainContent
-from data import load_data, save_data
+from deck import Deck
+from decks import load_catalogue, deck_file, record_deck, set_active_deck
+from utils import PaintProfiler, set_animations_enabled
+from sound import init_sound, set_sound_enabled
+from metrics import start_exporters
 
 # Constants
 WINDOW_TITLE = "🎓 CodeCard Flashcard App"
@@ -15,16 +20,62 @@ APP_CONFIG = {
     "scale": 0.8,
     "splash_ms": 1000,
     "autosave_ms": 30000,
+    "reload_debounce_ms": 300,
     "font": ("Inter", 11)
 }
 
 class FlashcardApp(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.data = load_data() or {}
+        # Only the active deck's shard is loaded; the catalogue lists the others.
+        catalogue = load_catalogue()
+        self.deck = Deck.open(deck_file(catalogue, catalogue["active"]), catalogue["active"])
+        self.data = self.deck.data
+        self._record_deck()
+        set_animations_enabled(self.data.get("settings", {}).get("animations_enabled", True))
+        init_sound(self.data.get("settings", {}).get("sound_enabled", True))
+        self.admin_panel = None
         self.setWindowTitle(WINDOW_TITLE)
         self._setup_ui()
         self._setup_auto_save()
+        self._setup_file_watcher()
+        QTimer.singleShot(APP_CONFIG["splash_ms"], self.main_content.offer_resume)
+
+    @property
+    def indexes(self):
+        return self.deck.indexes
+
+    @property
+    def deck_path(self):
+        return self.deck.path
+
+    def _record_deck(self):
+        try:
+            record_deck(self.deck.slug, self.data)
+        except Exception as e:
+            print(f"Catalogue error: {e}")
+
+    def switch_deck(self, slug):
+        """Save the current deck and load another one in its place.
+
+        Returns False, leaving the current deck loaded, if it could not be saved.
+        """
+        if slug == self.deck.slug:
+            return True
+        if not self.save_data():
+            QMessageBox.warning(self, "Save Failed",
+                                "The current deck could not be saved, so it stays open to keep your changes.")
+            return False
+        self.indexes["related"].save_if_changed()
+        catalogue = set_active_deck(slug)
+        old_path = self.deck_path
+        # Views hold on to self.data, so the deck takes over the new contents in place.
+        self.deck.replace(Deck.open(deck_file(catalogue, slug), slug, indexes=None))
+        set_sound_enabled(self.data.get("settings", {}).get("sound_enabled", True))
+        self._record_deck()
+        self._watch_data_file(old_path)
+        self.main_content.refresh_deck()
+        return True
 
     def _setup_ui(self):
         """Set up UI components."""
@@ -76,6 +127,50 @@ class FlashcardApp(QMainWindow):
         self.auto_save_timer.timeout.connect(self.save_data)
         self.auto_save_timer.start(APP_CONFIG["autosave_ms"])
 
+    def _setup_file_watcher(self):
+        """Watch the data file so changes saved by other processes show up live."""
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(APP_CONFIG["reload_debounce_ms"])
+        self.reload_timer.timeout.connect(self.reload_external_changes)
+        self.file_watcher = QFileSystemWatcher(self)
+        self._watch_data_file()
+        self.file_watcher.fileChanged.connect(self._on_data_file_changed)
+        self.file_watcher.directoryChanged.connect(self._on_data_file_changed)
+
+    def _watch_data_file(self, old_path=None):
+        """Watch the active deck's shard; saves replace it by rename, so watch its directory too."""
+        if old_path and os.path.abspath(old_path) != os.path.abspath(self.deck_path):
+            stale = [p for p in (os.path.abspath(old_path), os.path.dirname(os.path.abspath(old_path)))
+                     if p in self.file_watcher.files() + self.file_watcher.directories()]
+            if stale:
+                self.file_watcher.removePaths(stale)
+        path = os.path.abspath(self.deck_path)
+        if os.path.dirname(path) not in self.file_watcher.directories():
+            self.file_watcher.addPath(os.path.dirname(path))
+        if os.path.exists(path) and path not in self.file_watcher.files():
+            self.file_watcher.addPath(path)
+
+    def _on_data_file_changed(self, _path):
+        """Debounce bursts of change events into a single reload."""
+        self._watch_data_file()
+        self.reload_timer.start()
+
+    def reload_external_changes(self):
+        """Merge external edits into the deck and update only the changed rows."""
+        try:
+            self.apply_card_diff(self.deck.reload())
+        except Exception as e:
+            print(f"Reload error: {e}")
+
+    def apply_card_diff(self, diff):
+        """Propagate a card-level diff (already applied to the deck's indexes) to every open view."""
+        if not diff or not (diff["added"] or diff["updated"] or diff["removed"]):
+            return
+        self.main_content.apply_card_diff(diff)
+        if self.admin_panel is not None:
+            self.admin_panel.apply_card_diff(diff)
+
     def show_main(self):
         """Show main content."""
         self.stacked_widget.setCurrentWidget(self.main_content)
@@ -83,18 +178,23 @@ class FlashcardApp(QMainWindow):
 
     def show_landing(self):
         """Show landing page."""
+        self.landing_page.refresh_decks()
         self.stacked_widget.setCurrentWidget(self.landing_page)
 
     def save_data(self):
-        """Save data."""
+        """Save the deck; returns whether it was written."""
         try:
-            save_data(self.data)
+            self.apply_card_diff(self.deck.save())
         except Exception as e:
             print(f"Save error: {e}")
+            return False
+        self._record_deck()
+        return True
 
     def closeEvent(self, event):
         """Handle close event."""
         self.save_data()
+        self.indexes["related"].save_if_changed()
         if hasattr(self, 'auto_save_timer'):
             self.auto_save_timer.stop()
         event.accept()
@@ -117,9 +217,20 @@ class FlashcardApp(QMainWindow):
                 return
         super().keyPressEvent(event)
 
+class ProfilingApplication(QApplication):
+    """QApplication that times every paint event (CODECARD_PROFILE_PAINT=1)."""
+    def __init__(self, argv):
+        super().__init__(argv)
+        self.profiler = PaintProfiler()
+        self.aboutToQuit.connect(lambda: print(self.profiler.report()))
+
+    def notify(self, receiver, event):
+        return self.profiler.notify(super().notify, receiver, event)
+
 def setup_app():
     """Set up QApplication."""
-    app = QApplication(sys.argv)
+    app_class = ProfilingApplication if os.getenv("CODECARD_PROFILE_PAINT") else QApplication
+    app = app_class(sys.argv)
     app.setApplicationName(APP_CONFIG["name"])
     app.setApplicationVersion(APP_CONFIG["version"])
     app.setOrganizationName(APP_CONFIG["org"])
@@ -131,6 +242,7 @@ def setup_app():
 def main():
     """Run application."""
     try:
+        start_exporters()
         app = setup_app()
         window = FlashcardApp()
         window.show()
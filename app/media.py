@@ -0,0 +1,102 @@
+"""Content-addressed storage for images attached to cards.
+
+Each file is stored once in the deck's media directory under the SHA-256
+of its bytes, and cards list only those hashes in their "media" field. The
+deck file, its backups and exports therefore stay small, and an image
+attached to many cards is stored once. Qt-free.
+"""
+import hashlib
+import io
+import os
+import re
+import tempfile
+
+MEDIA_SUFFIX = ".media"
+COPY_CHUNK_BYTES = 1 << 20
+IMAGE_FILTER = "Images (*.png *.jpg *.jpeg *.gif *.bmp *.webp *.svg)"
+
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+
+def media_dir(deck_path):
+    """Where the media of a deck are stored: next to the deck file."""
+    return os.path.splitext(deck_path)[0] + MEDIA_SUFFIX
+
+def normalize_media(media):
+    """The valid, de-duplicated blob hashes of a card's "media" value."""
+    if isinstance(media, str):
+        media = [media]
+    result = []
+    for digest in media if isinstance(media, (list, tuple)) else ():
+        digest = str(digest).strip().lower()
+        if _DIGEST.fullmatch(digest) and digest not in result:
+            result.append(digest)
+    return result
+
+class MediaStore:
+    """Blobs named by their SHA-256, fanned out into subdirectories by the first two hex digits."""
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def exists(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def add_file(self, source):
+        """Copy a file into the store (unless an identical one is there); returns its hash."""
+        with open(source, 'rb') as f:
+            return self._add_stream(f)
+
+    def add_bytes(self, data):
+        return self._add_stream(io.BytesIO(data))
+
+    def _add_stream(self, stream):
+        os.makedirs(self.root, exist_ok=True)
+        sha = hashlib.sha256()
+        fd, temp_file = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in iter(lambda: stream.read(COPY_CHUNK_BYTES), b""):
+                    sha.update(chunk)
+                    out.write(chunk)
+            digest = sha.hexdigest()
+            if self.exists(digest):
+                os.remove(temp_file)
+            else:
+                os.makedirs(os.path.dirname(self.path(digest)), exist_ok=True)
+                os.replace(temp_file, self.path(digest))
+            return digest
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+
+    def digests(self):
+        """Every blob hash in the store."""
+        if not os.path.isdir(self.root):
+            return
+        for entry in os.scandir(self.root):
+            if entry.is_dir() and len(entry.name) == 2:
+                for blob in os.scandir(entry.path):
+                    if _DIGEST.fullmatch(blob.name):
+                        yield blob.name
+
+    def prune(self, cards, dry_run=False):
+        """Remove blobs no card refers to; returns (count, bytes) removed (or that would be).
+
+        `cards` may be any iterable; it is read in full before anything is
+        removed. Pass the cards of the deck's backups too, since restoring
+        one needs the blobs it lists.
+        """
+        referenced = {digest for card in cards for digest in card.get("media", ())}
+        count = size = 0
+        for digest in list(self.digests()):
+            if digest in referenced:
+                continue
+            path = self.path(digest)
+            count += 1
+            size += os.path.getsize(path)
+            if not dry_run:
+                os.remove(path)
+        return count, size
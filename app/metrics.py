@@ -0,0 +1,224 @@
+"""Process-wide counters, gauges and histograms in Prometheus text format.
+
+Metrics are created once at import time by the modules they observe, so
+the hot path is a bare attribute update (`SAVES.inc()`,
+`LATENCY.observe(t)`) with no lookups or locks. Updates rely on the GIL.
+Under a free-threaded build a racing increment may be lost, which is
+acceptable for monitoring.
+
+Set CODECARD_METRICS_PORT to serve /metrics over HTTP, or
+CODECARD_METRICS_FILE to write the same text to a file every
+CODECARD_METRICS_INTERVAL seconds and at exit. The classroom server also
+answers GET /metrics itself.
+"""
+import atexit
+import bisect
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LATENCY_BUCKETS = (0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0)
+DUMP_INTERVAL = 15.0
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, labels=()):
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def samples(self, name):
+        yield name + _label_text(self.labels), self.value
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def __init__(self, labels=()):
+        super().__init__(labels)
+        self.function = None
+
+    def set(self, value):
+        self.value = value
+
+    def set_function(self, function):
+        """Compute the value when the metrics are read instead of storing it."""
+        self.function = function
+
+    def samples(self, name):
+        yield name + _label_text(self.labels), self.function() if self.function else self.value
+
+class Histogram:
+    """Counts of observations per upper bound, plus their sum and count."""
+    kind = "histogram"
+
+    def __init__(self, labels=(), buckets=DEFAULT_BUCKETS):
+        self.labels = labels
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name):
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += count
+            yield f"{name}_bucket" + _label_text(self.labels + (("le", _number(bound)),)), cumulative
+        yield f"{name}_sum" + _label_text(self.labels), self.sum
+        yield f"{name}_count" + _label_text(self.labels), self.count
+
+class MetricsRegistry:
+    """Metric families by name, each holding one metric per label set."""
+    def __init__(self):
+        self.families = {}
+        self.lock = threading.Lock()
+
+    def _metric(self, cls, name, help_text, labels, **options):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            family = self.families.setdefault(name, {"kind": cls.kind, "help": help_text, "metrics": {}})
+            if family["kind"] != cls.kind:
+                raise ValueError(f"metric {name} is already a {family['kind']}")
+            metric = family["metrics"].get(key)
+            if metric is None:
+                metric = family["metrics"][key] = cls(key, **options)
+            return metric
+
+    def counter(self, name, help_text="", **labels):
+        return self._metric(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text="", **labels):
+        return self._metric(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS, **labels):
+        return self._metric(Histogram, name, help_text, labels, buckets=buckets)
+
+    def rate(self, name, help_text, counters, **labels):
+        """A gauge reading the per-second increase of `counters` since it was last read."""
+        gauge = self.gauge(name, help_text, **labels)
+        last = [sum(c.value for c in counters), time.monotonic()]
+
+        def per_second():
+            total, now = sum(c.value for c in counters), time.monotonic()
+            value = (total - last[0]) / (now - last[1]) if now > last[1] else 0.0
+            last[:] = [total, now]
+            return round(value, 3)
+
+        gauge.set_function(per_second)
+        return gauge
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            families = [(name, dict(family, metrics=list(family["metrics"].values())))
+                        for name, family in sorted(self.families.items())]
+        for name, family in families:
+            if family["help"]:
+                lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['kind']}")
+            for metric in family["metrics"]:
+                lines.extend(f"{sample} {_number(value)}" for sample, value in metric.samples(name))
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        temp_file = path + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(temp_file, path)
+
+REGISTRY = MetricsRegistry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_metrics(port, host="127.0.0.1", registry=REGISTRY):
+    """Serve /metrics from a daemon thread; returns the HTTP server."""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+class MetricsDumper(threading.Thread):
+    """Writes the registry to a file every `interval` seconds and once more on stop()."""
+    def __init__(self, path, interval=DUMP_INTERVAL, registry=REGISTRY):
+        super().__init__(name="metrics-dump", daemon=True)
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.write()
+
+    def write(self):
+        try:
+            self.registry.dump(self.path)
+        except OSError as e:
+            logging.warning(f"Could not write metrics to {self.path}: {e}")
+
+    def stop(self):
+        self.stopped.set()
+        self.write()
+
+def start_exporters(port=None, path=None, interval=None):
+    """Start the exporters configured by arguments or CODECARD_METRICS_* variables.
+
+    Returns (HTTP server or None, dumper or None).
+    """
+    port = port or os.getenv("CODECARD_METRICS_PORT")
+    path = path or os.getenv("CODECARD_METRICS_FILE")
+    interval = interval or float(os.getenv("CODECARD_METRICS_INTERVAL") or DUMP_INTERVAL)
+    server = dumper = None
+    if port:
+        try:
+            server = serve_metrics(int(port))
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not serve metrics on port {port}: {e}")
+    if path:
+        dumper = MetricsDumper(path, interval)
+        dumper.start()
+        atexit.register(dumper.stop)
+    return server, dumper
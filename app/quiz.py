@@ -0,0 +1,88 @@
+from sampling import record_answer
+from metrics import REGISTRY, counter, histogram, LATENCY_BUCKETS
+
+CORRECT_ANSWERS = counter("codecard_quiz_answers_total", "Quiz answers recorded", result="correct")
+WRONG_ANSWERS = counter("codecard_quiz_answers_total", "Quiz answers recorded", result="wrong")
+ANSWER_LATENCY = histogram("codecard_answer_latency_seconds", "Time taken to answer a quiz card",
+                           LATENCY_BUCKETS)
+REGISTRY.rate("codecard_quiz_answers_per_second", "Quiz answers per second since the previous read",
+              (CORRECT_ANSWERS, WRONG_ANSWERS))
+
+def is_correct(given, expected):
+    """Typed answers match case-insensitively, ignoring surrounding whitespace."""
+    return given.strip().lower() == expected.lower()
+
+class QuizEngine:
+    """One quiz session's card order, scoring and answer recording, without any UI.
+
+    Cards come from a fixed list or, with a sampler, are drawn one at a time
+    up to `length`. Every answer goes to the sampler (or the deck's
+    card_stats), to the stats rollups if given and to the crash-recovery
+    checkpoint. `start_index` and `start_correct` resume a session whose
+    first answers were already given.
+    """
+    def __init__(self, cards, length=None, sampler=None, card_stats=None, checkpoint=None,
+                 start_index=0, start_correct=0, distractors=None, rollups=None):
+        self.sampler = sampler
+        self.cards = list(cards or []) if sampler else cards
+        self.total = length if sampler else len(cards)
+        self.card_stats = card_stats
+        self.checkpoint = checkpoint
+        self.distractors = distractors
+        self.rollups = rollups
+        self.index = start_index
+        self.correct = start_correct
+
+    @property
+    def finished(self):
+        return self.index >= self.total
+
+    def current(self):
+        """The card being asked, drawn from the sampler on first use; None once finished."""
+        if self.finished:
+            return None
+        if self.sampler and self.index == len(self.cards):
+            self.cards.append(self.sampler.draw())
+            if self.checkpoint:
+                self.checkpoint.record_draw(self.cards[-1]["id"])
+        return self.cards[self.index] if self.index < len(self.cards) else None
+
+    def upcoming(self, count):
+        """The current card and those after it that are already known."""
+        return [card for card in self.cards[self.index:self.index + count] if card]
+
+    def choices(self, card):
+        """Shuffled multiple-choice options for a card, or [] for typed answers."""
+        return self.distractors.choices(card) if self.distractors else []
+
+    def answer(self, given, latency=None, now=None):
+        """Score a typed answer to the current card and move on; returns whether it was right."""
+        card = self.current()
+        if card is None:
+            return None
+        correct = is_correct(given, card["answer"])
+        self.record(correct, latency, now)
+        return correct
+
+    def record(self, correct, latency=None, now=None):
+        """Record a result for the current card (typed or self-graded) and move on.
+
+        `now` overrides the wall clock for the answer's timestamp (simulations).
+        """
+        card = self.current()
+        if self.sampler:
+            self.sampler.record(card, correct, latency, now)
+        elif self.card_stats is not None:
+            record_answer(self.card_stats, card["id"], correct, latency, now)
+        if self.rollups is not None:
+            self.rollups.record(card["id"], correct, latency, now)
+        if self.checkpoint:
+            self.checkpoint.record(correct)
+        if correct:
+            self.correct += 1
+            CORRECT_ANSWERS.inc()
+        else:
+            WRONG_ANSWERS.inc()
+        if latency is not None:
+            ANSWER_LATENCY.observe(latency)
+        self.index += 1
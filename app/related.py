@@ -0,0 +1,307 @@
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+import zlib
+
+import numpy as np
+
+from indexes import CardIndex
+from metrics import histogram
+
+RELATED_SUFFIX = ".related.npz"
+RELATED_COUNT = 5
+QUERY_BATCH = 64
+MAX_DF_RATIO = 0.2  # terms in more of the deck than this carry little signal and dominate query cost
+MIN_COMMON_DF = 1000  # but small decks use every term
+MIN_SCORE = 0.1
+PERSIST_THRESHOLD = 1000  # save right after vectorizing at least this many cards
+
+COMPILE_SECONDS = histogram("codecard_related_compile_seconds", "Time to rebuild the related-cards matrix")
+
+_TOKEN = re.compile(r"[^\W_]{2,}")
+STOP_WORDS = frozenset("""
+    a an and are as at be by can do does for from how in is it of on or the
+    this to what when where which who why with you your
+""".split())
+
+def related_index_path(deck_path):
+    """Where the related-cards index of a deck is stored: next to the deck file."""
+    return os.path.splitext(deck_path)[0] + RELATED_SUFFIX
+
+def tokenize(text):
+    tokens = _TOKEN.findall(unicodedata.normalize("NFKD", text).casefold())
+    return [token for token in tokens if token not in STOP_WORDS]
+
+def card_checksum(card):
+    return zlib.crc32(f"{card['question']}\x1f{card['answer']}".encode("utf-8"))
+
+def _ranges(starts, lengths):
+    """Concatenation of arange(start, start + length) for each pair."""
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+
+class RelatedMatrix:
+    """The weighted, L2-normalized TF-IDF matrix of a set of card vectors and its term postings.
+
+    Built in one go and never modified, so queries can use it while the
+    next one is being built.
+    """
+    def __init__(self, vectors, vocabulary_size):
+        self.ids = list(vectors)
+        self.row_of = {card_id: row for row, card_id in enumerate(self.ids)}
+        vectors = list(vectors.values())
+        lengths = np.fromiter((len(v[1]) for v in vectors), np.int64, len(vectors))
+        self.indptr = np.concatenate(([0], np.cumsum(lengths)))
+        self.terms = np.concatenate([v[1] for v in vectors] or [np.empty(0, np.int32)])
+        counts = np.concatenate([v[2] for v in vectors] or [np.empty(0, np.float32)])
+        rows = np.repeat(np.arange(len(vectors)), lengths)
+
+        df = np.bincount(self.terms, minlength=vocabulary_size)
+        idf = np.log((1 + len(vectors)) / (1 + df)) + 1
+        self.weights = ((1 + np.log(counts)) * idf[self.terms]).astype(np.float32)
+        norms = np.sqrt(np.bincount(rows, self.weights.astype(np.float64) ** 2, minlength=len(vectors)))
+        self.weights /= norms[rows].astype(np.float32)
+
+        order = np.argsort(self.terms, kind="stable")
+        self.posting_start = np.concatenate(([0], np.cumsum(df)))
+        self.posting_rows = rows[order]
+        self.posting_weights = self.weights[order]
+        self.common = df > max(MAX_DF_RATIO * len(vectors), MIN_COMMON_DF)
+
+    def query(self, batch, k):
+        size = len(self.ids)
+        query_rows = np.array([self.row_of[card_id] for card_id in batch])
+        starts = self.indptr[query_rows]
+        index = _ranges(starts, self.indptr[query_rows + 1] - starts)
+        owner = np.repeat(np.arange(len(batch)), self.indptr[query_rows + 1] - starts)
+        keep = ~self.common[self.terms[index]]
+        index, owner = index[keep], owner[keep]
+
+        terms = self.terms[index]
+        posting_starts = self.posting_start[terms]
+        posting_lengths = self.posting_start[terms + 1] - posting_starts
+        postings = _ranges(posting_starts, posting_lengths)
+        keys = np.repeat(owner, posting_lengths).astype(np.int64) * size + self.posting_rows[postings]
+        products = np.repeat(self.weights[index], posting_lengths) * self.posting_weights[postings]
+        keys, inverse = np.unique(keys, return_inverse=True)
+        scores = np.bincount(inverse, products)
+        owners, rows = keys // size, keys % size
+        scores[rows == query_rows[owners]] = 0
+
+        result = {}
+        bounds = np.searchsorted(owners, np.arange(len(batch) + 1))
+        for i, card_id in enumerate(batch):
+            candidate_scores = scores[bounds[i]:bounds[i + 1]]
+            candidate_rows = rows[bounds[i]:bounds[i + 1]]
+            top = np.argsort(-candidate_scores)[:k] if len(candidate_scores) <= k else \
+                np.argpartition(-candidate_scores, k)[:k]
+            top = top[np.argsort(-candidate_scores[top], kind="stable")]
+            result[card_id] = [(self.ids[candidate_rows[j]], round(float(candidate_scores[j]), 3))
+                               for j in top if candidate_scores[j] >= MIN_SCORE]
+        return result
+
+class RelatedIndex(CardIndex):
+    """TF-IDF vectors of every card for "related cards" lookups.
+
+    Each card's term counts are cached with a checksum of its text, so only
+    new or edited cards are re-tokenized, and the cache is persisted next to
+    the deck. Document frequencies shift with every card, so after any
+    change a background thread tokenizes the queued cards and builds a new
+    RelatedMatrix. Queries read the latest finished matrix and never wait
+    for a build: for a moment after an edit they may not know the newest
+    cards, and before the first build they return nothing.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.vocabulary = {}
+        self.vectors = {}  # card id -> (checksum, term ids, term counts)
+        self.pending = {}  # card id -> card, waiting for the worker
+        self.in_flight = {}  # the cards the worker is tokenizing
+        self.cancelled = set()  # ids removed while the worker was tokenizing them
+        self.matrix = None
+        self.changed = False  # vectors differ from the saved file
+        self.lock = threading.Lock()  # guards vectors, pending, cancelled and the worker handle
+        self.vocabulary_lock = threading.Lock()  # guards the vocabulary while it grows, and the saved file
+        self.worker = None
+        self.dirty = False
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def clear(self):
+        with self.lock:
+            self.cancelled.update(self.vectors)
+            self.vectors = {}
+            self.pending = {}
+            self.changed = True
+        self._schedule()
+
+    def rebuild(self, cards):
+        """Keep the cached vectors of unchanged cards; queue the rest."""
+        ids = set()
+        pending = {}
+        with self.lock:
+            for card in cards:
+                ids.add(card["id"])
+                cached = self.vectors.get(card["id"])
+                if cached is None or cached[0] != card_checksum(card):
+                    pending[card["id"]] = card
+            stale = self.vectors.keys() - ids
+            for card_id in stale:
+                del self.vectors[card_id]
+            self.cancelled.update(stale)
+            self.pending = pending
+            self.changed |= bool(stale)
+        self._schedule()
+
+    def add(self, card):
+        with self.lock:
+            self.pending[card["id"]] = card
+        self._schedule()
+
+    def remove(self, card_id):
+        with self.lock:
+            if self.vectors.pop(card_id, None) is not None:
+                self.changed = True
+            self.pending.pop(card_id, None)
+            self.cancelled.add(card_id)
+        self._schedule()
+
+    def update_many(self, cards, all_cards):
+        """Queue the cards whose text changed; tag-only edits leave the vectors alone."""
+        queued = False
+        with self.lock:
+            for card in cards:
+                cached = self.vectors.get(card["id"])
+                if cached is None or cached[0] != card_checksum(card):
+                    self.pending[card["id"]] = card
+                    queued = True
+        if queued:
+            self._schedule()
+
+    def _vectorize(self, card):
+        counts = {}
+        with self.vocabulary_lock:
+            for token in tokenize(card["question"]) + tokenize(card["answer"]):
+                term = self.vocabulary.setdefault(token, len(self.vocabulary))
+                counts[term] = counts.get(term, 0) + 1
+        return (card_checksum(card), np.fromiter(counts.keys(), np.int32, len(counts)),
+                np.fromiter(counts.values(), np.float32, len(counts)))
+
+    def _schedule(self):
+        """Start the worker unless it is running; it loops until no change is left."""
+        with self.lock:
+            self.dirty = True
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._compile_loop, name="related-index", daemon=True)
+                self.worker.start()
+
+    def _compile_loop(self):
+        try:
+            while True:
+                with self.lock:
+                    if not self.dirty:
+                        self.worker = None
+                        return
+                    self.dirty = False
+                    self.in_flight, self.pending = self.pending, {}
+                    self.cancelled = set()
+                self._compile(self.in_flight)
+        except Exception as e:
+            logging.error(f"Could not build the related-cards index: {e}")
+            with self.lock:
+                self.worker = None
+
+    def _compile(self, queued):
+        start = time.perf_counter()
+        vectorized = {card_id: self._vectorize(card) for card_id, card in queued.items()}
+        with self.lock:
+            for card_id, vector in vectorized.items():
+                if card_id not in self.cancelled:
+                    self.vectors[card_id] = vector
+            self.in_flight = {}
+            self.changed |= bool(vectorized)
+            vectors = dict(self.vectors)
+        self.matrix = RelatedMatrix(vectors, len(self.vocabulary))
+        COMPILE_SECONDS.observe(time.perf_counter() - start)
+        if self.path and len(vectorized) >= PERSIST_THRESHOLD:
+            self.save_if_changed()
+
+    @property
+    def ready(self):
+        """Whether a matrix has been built, so queries return results."""
+        return self.matrix is not None
+
+    def wait(self, timeout=None):
+        """Block until the worker has caught up with every change (scripts and tests)."""
+        worker = self.worker
+        if worker is not None:
+            worker.join(timeout)
+
+    def related(self, card_ids, k=RELATED_COUNT):
+        """Map each card id known to the latest matrix to up to `k` (card id, score) pairs, best first.
+
+        Cards removed since that matrix was built are left out of the results.
+        """
+        matrix = self.matrix
+        if matrix is None:
+            return {}
+        card_ids = [card_id for card_id in card_ids if card_id in matrix.row_of]
+        result = {}
+        for start in range(0, len(card_ids), QUERY_BATCH):
+            result.update(matrix.query(card_ids[start:start + QUERY_BATCH], k))
+        return {card_id: [(other, score) for other, score in matches if self._live(other)]
+                for card_id, matches in result.items()}
+
+    def _live(self, card_id):
+        return (card_id in self.vectors or card_id in self.pending
+                or (card_id in self.in_flight and card_id not in self.cancelled))
+
+    def save(self, path=None):
+        """Write the cached term counts atomically (cards still queued are written next time)."""
+        path = path or self.path
+        with self.vocabulary_lock:
+            with self.lock:
+                vectors = dict(self.vectors)
+                self.changed = False
+            try:
+                self._write(path, vectors)
+            except BaseException:
+                self.changed = True
+                raise
+
+    def _write(self, path, vectors):
+        ids, vectors = list(vectors), list(vectors.values())
+        lengths = np.fromiter((len(v[1]) for v in vectors), np.int64, len(vectors))
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            np.savez(f,
+                     ids=np.array(ids, dtype=str),
+                     checksums=np.fromiter((v[0] for v in vectors), np.uint32, len(vectors)),
+                     indptr=np.concatenate(([0], np.cumsum(lengths))),
+                     terms=np.concatenate([v[1] for v in vectors] or [np.empty(0, np.int32)]),
+                     counts=np.concatenate([v[2] for v in vectors] or [np.empty(0, np.float32)]),
+                     vocabulary=np.frombuffer("\n".join(self.vocabulary).encode("utf-8"), np.uint8))
+        os.replace(temp_path, path)
+
+    def save_if_changed(self):
+        if self.path and self.changed:
+            try:
+                self.save()
+            except OSError as e:
+                logging.warning(f"Could not save related-cards index: {e}")
+
+    def load(self, path):
+        try:
+            with np.load(path, allow_pickle=False) as f:
+                vocabulary = f["vocabulary"].tobytes().decode("utf-8")
+                ids, checksums, indptr = f["ids"], f["checksums"], f["indptr"]
+                terms, counts = f["terms"], f["counts"]
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable related-cards index: {e}")
+            return
+        self.vocabulary = {term: i for i, term in enumerate(vocabulary.split("\n"))} if vocabulary else {}
+        self.vectors = {str(card_id): (int(checksum), terms[start:end], counts[start:end])
+                        for card_id, checksum, start, end in zip(ids, checksums, indptr[:-1], indptr[1:])}
@@ -0,0 +1,225 @@
+"""Answer-history rollups for the stats view, kept next to the deck.
+
+The deck itself only holds lifetime totals and per-card counters, and there
+is no raw answer log to replay. Instead every answer is added to a few
+fixed-size aggregates as it happens:
+
+- a ring of daily buckets covering a little over a year,
+- a ring of weekly buckets covering ten years,
+- one bucket per calendar year, for everything older,
+- a handful of recent weekly buckets per card that was studied lately.
+
+Each bucket holds [answers, correct, latency seconds summed, timed answers].
+Recording an answer is O(1) and reading a series is O(periods shown), so
+the stats view costs the same after years of use as on the first day. The
+file stays bounded too: per-card buckets older than CARD_WEEKS are dropped
+on save. Qt-free.
+"""
+import json
+import logging
+import os
+import time
+from datetime import date
+
+from data import file_lock
+from metrics import counter
+
+ROLLUPS_SUFFIX = ".rollups.json"
+DAILY_SLOTS = 400
+WEEKLY_SLOTS = 520
+CARD_WEEKS = 12
+RESOLUTIONS = ("daily", "weekly", "yearly")
+
+ROLLUP_ANSWERS = counter("codecard_rollup_answers_total", "Answers added to the stats rollups")
+
+def rollups_path(deck_path):
+    """Where the rollups of a deck are stored: next to the deck file."""
+    return os.path.splitext(deck_path)[0] + ROLLUPS_SUFFIX
+
+def day_number(now=None):
+    """The local calendar day of a timestamp as a date ordinal."""
+    return date.fromtimestamp(time.time() if now is None else now).toordinal()
+
+def week_number(day):
+    """Monday-based week of a day ordinal (ordinal 1 is a Monday)."""
+    return (day - 1) // 7
+
+def period_start(resolution, period):
+    """The first date of a daily, weekly or yearly period."""
+    if resolution == "daily":
+        return date.fromordinal(period)
+    if resolution == "weekly":
+        return date.fromordinal(period * 7 + 1)
+    return date(period, 1, 1)
+
+def _add(bucket, correct, latency):
+    bucket[0] += 1
+    bucket[1] += bool(correct)
+    if latency is not None:
+        bucket[2] = round(bucket[2] + latency, 3)
+        bucket[3] += 1
+
+class Ring:
+    """`size` period buckets; period p lives in slot p % size and is reset when a newer period claims it."""
+    def __init__(self, size, periods=None, buckets=None):
+        self.size = size
+        self.periods = periods if periods and len(periods) == size else [-1] * size
+        self.buckets = buckets if buckets and len(buckets) == size else [[0, 0, 0.0, 0] for _ in range(size)]
+
+    def add(self, period, correct, latency):
+        slot = period % self.size
+        if self.periods[slot] != period:
+            if self.periods[slot] > period:
+                return  # older than the ring reaches
+            self.periods[slot] = period
+            self.buckets[slot] = [0, 0, 0.0, 0]
+        _add(self.buckets[slot], correct, latency)
+
+    def get(self, period):
+        slot = period % self.size
+        return self.buckets[slot] if self.periods[slot] == period else None
+
+    def to_json(self):
+        return {"periods": self.periods, "buckets": self.buckets}
+
+    @classmethod
+    def from_json(cls, size, value):
+        value = value if isinstance(value, dict) else {}
+        return cls(size, value.get("periods"), value.get("buckets"))
+
+class Rollups:
+    """The daily, weekly, yearly and per-card aggregates of one deck's answers.
+
+    Answers recorded since the last save are also kept in `pending`, so a
+    save that finds the file changed by another process (the server, say)
+    reloads it and adds just those answers instead of overwriting it.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.pending = []
+        self.signature = None
+        self._reset()
+        if path:
+            self.load()
+
+    def _reset(self):
+        self.daily = Ring(DAILY_SLOTS)
+        self.weekly = Ring(WEEKLY_SLOTS)
+        self.yearly = {}
+        self.cards = {}
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        """Read the rollups file; a missing or unreadable one starts empty."""
+        self._reset()
+        self.signature = self._signature()
+        if self.signature is None:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read stats rollups, starting empty: {e}")
+            return
+        self.daily = Ring.from_json(DAILY_SLOTS, saved.get("daily"))
+        self.weekly = Ring.from_json(WEEKLY_SLOTS, saved.get("weekly"))
+        self.yearly = {int(year): bucket for year, bucket in saved.get("yearly", {}).items()}
+        self.cards = {card_id: {int(week): bucket for week, bucket in weeks.items()}
+                      for card_id, weeks in saved.get("cards", {}).items()}
+
+    def record(self, card_id, correct, latency=None, now=None):
+        """Add one answer to every aggregate."""
+        now = time.time() if now is None else now
+        self._apply(card_id, correct, latency, now)
+        self.pending.append((card_id, bool(correct), latency, now))
+        ROLLUP_ANSWERS.inc()
+
+    def _apply(self, card_id, correct, latency, now):
+        day = day_number(now)
+        week = week_number(day)
+        self.daily.add(day, correct, latency)
+        self.weekly.add(week, correct, latency)
+        _add(self.yearly.setdefault(date.fromordinal(day).year, [0, 0, 0.0, 0]), correct, latency)
+        weeks = self.cards.setdefault(card_id, {})
+        _add(weeks.setdefault(week, [0, 0, 0.0, 0]), correct, latency)
+        if len(weeks) > CARD_WEEKS:
+            del weeks[min(weeks)]
+
+    def refresh(self):
+        """Pick up answers another process saved, keeping the ones recorded here."""
+        if self.path and self._signature() != self.signature:
+            self.load()
+            for answer in self.pending:
+                self._apply(*answer)
+
+    def save(self, now=None):
+        """Write the rollups atomically if answers were recorded since the last save."""
+        if not self.path or not self.pending:
+            return
+        with file_lock(self.path):
+            self.refresh()
+            oldest = week_number(day_number(now)) - CARD_WEEKS
+            self.cards = {card_id: weeks for card_id, weeks in self.cards.items() if max(weeks) > oldest}
+            temp_file = self.path + ".tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({"daily": self.daily.to_json(), "weekly": self.weekly.to_json(),
+                                    "yearly": self.yearly, "cards": self.cards}, separators=(",", ":")))
+            os.replace(temp_file, self.path)
+            self.signature = self._signature()
+        self.pending = []
+
+    def save_if_changed(self):
+        try:
+            self.save()
+        except OSError as e:
+            logging.warning(f"Could not save stats rollups: {e}")
+
+    def series(self, resolution="daily", count=30, now=None):
+        """The last `count` periods up to now as (start date, answers, correct, mean latency or None).
+
+        Periods without answers are included with zero counts. Yearly
+        series start at the first year with answers.
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        day = day_number(now)
+        if resolution == "yearly":
+            current = date.fromordinal(day).year
+            first = max(current - count + 1, min(self.yearly, default=current))
+            periods = range(first, current + 1)
+            lookup = self.yearly.get
+        else:
+            current = day if resolution == "daily" else week_number(day)
+            ring = self.daily if resolution == "daily" else self.weekly
+            periods = range(current - min(count, ring.size) + 1, current + 1)
+            lookup = ring.get
+        points = []
+        for period in periods:
+            answers, correct, latency, timed = lookup(period) or (0, 0, 0.0, 0)
+            points.append((period_start(resolution, period), answers, correct, latency / timed if timed else None))
+        return points
+
+    def totals(self, resolution="daily", now=None):
+        """(answers, correct) for the current day, week or year."""
+        _, answers, correct, _ = self.series(resolution, 1, now)[-1]
+        return answers, correct
+
+    def card_totals(self, weeks=CARD_WEEKS, now=None):
+        """{card id: (answers, correct)} over the last `weeks` weeks, for the cards studied in them."""
+        oldest = week_number(day_number(now)) - weeks
+        result = {}
+        for card_id, buckets in self.cards.items():
+            answers = correct = 0
+            for week, bucket in buckets.items():
+                if week > oldest:
+                    answers += bucket[0]
+                    correct += bucket[1]
+            if answers:
+                result[card_id] = (answers, correct)
+        return result
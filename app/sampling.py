@@ -0,0 +1,130 @@
+import random
+import time
+
+ERROR_WEIGHT = 4.0
+STALENESS_WEIGHT = 1.0
+LATENCY_WEIGHT = 0.5
+STALENESS_HORIZON = 7 * 24 * 3600  # seconds until an unseen card counts as fully stale
+LATENCY_REFERENCE = 5.0  # seconds; answers this slow double the latency term
+LATENCY_SMOOTHING = 0.3
+MIN_WEIGHT = 0.05
+
+def record_answer(card_stats, card_id, correct, latency=None, now=None):
+    """Update the per-card answer statistics after a quiz answer."""
+    stats = card_stats.setdefault(card_id, {"attempts": 0, "errors": 0, "last_seen": 0, "latency": None})
+    stats["attempts"] += 1
+    if not correct:
+        stats["errors"] += 1
+    stats["last_seen"] = int(now if now is not None else time.time())
+    if latency is not None:
+        previous = stats.get("latency")
+        stats["latency"] = round(latency if previous is None else
+                                 previous + LATENCY_SMOOTHING * (latency - previous), 3)
+    return stats
+
+def card_weight(stats, now=None):
+    """Sampling weight from a card's error rate, staleness and answer latency."""
+    if not stats:
+        return ERROR_WEIGHT * 0.5 + STALENESS_WEIGHT
+    now = now if now is not None else time.time()
+    error_rate = (stats["errors"] + 1) / (stats["attempts"] + 2)
+    staleness = min(max(now - stats.get("last_seen", 0), 0) / STALENESS_HORIZON, 1.0)
+    latency = min((stats.get("latency") or 0) / LATENCY_REFERENCE, 3.0)
+    return max(ERROR_WEIGHT * error_rate + STALENESS_WEIGHT * staleness + LATENCY_WEIGHT * latency,
+               MIN_WEIGHT)
+
+class FenwickTree:
+    """Binary indexed tree over non-negative weights.
+
+    Point updates, prefix sums and finding the slot a cumulative weight falls
+    into all take O(log n).
+    """
+    def __init__(self, weights):
+        self.size = len(weights)
+        self.tree = [0.0] + list(weights)
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+        self.step = 1 << self.size.bit_length() - 1 if self.size else 0
+
+    def add(self, index, delta):
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index):
+        """Sum of weights[0:index]."""
+        total, i = 0.0, index
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def total(self):
+        return self.prefix_sum(self.size)
+
+    def find(self, target):
+        """Smallest index whose cumulative weight exceeds `target`."""
+        position, step = 0, self.step
+        while step:
+            next_position = position + step
+            if next_position <= self.size and self.tree[next_position] <= target:
+                position = next_position
+                target -= self.tree[next_position]
+            step >>= 1
+        return min(position, self.size - 1)
+
+class AdaptiveSampler:
+    """Draw cards with probability proportional to their weight.
+
+    Weights live in a Fenwick tree, so each draw and each weight update after
+    an answer is O(log n) regardless of deck size.
+    """
+    def __init__(self, cards, card_stats, rng=None, now=None):
+        now = now if now is not None else time.time()
+        self.cards = cards
+        self.card_stats = card_stats
+        self.rng = rng or random.Random()
+        self.position = {card["id"]: i for i, card in enumerate(cards)}
+        self.weights = [card_weight(card_stats.get(card["id"]), now) for card in cards]
+        self.tree = FenwickTree(self.weights)
+        self.last_index = None
+
+    def draw(self):
+        """Pick a card by weight, avoiding an immediate repeat when possible."""
+        index = None
+        for _ in range(4):
+            index = self.tree.find(self.rng.random() * self.tree.total())
+            if index != self.last_index or len(self.cards) == 1:
+                break
+        self.last_index = index
+        return self.cards[index]
+
+    def set_weight(self, index, weight):
+        self.tree.add(index, weight - self.weights[index])
+        self.weights[index] = weight
+
+    def record(self, card, correct, latency=None, now=None):
+        """Record an answer and re-weight just that card."""
+        now = now if now is not None else time.time()
+        stats = record_answer(self.card_stats, card["id"], correct, latency, now)
+        index = self.position.get(card["id"])
+        if index is not None:
+            self.set_weight(index, card_weight(stats, now))
+        return stats
+
+def merge_card_stats(card_stats, keeper_id, duplicate_ids):
+    """Fold the answer history of merged duplicate cards into the kept card."""
+    merged = [card_stats.pop(card_id) for card_id in duplicate_ids if card_id in card_stats]
+    if not merged:
+        return card_stats.get(keeper_id)
+    stats = card_stats.setdefault(keeper_id, {"attempts": 0, "errors": 0, "last_seen": 0, "latency": None})
+    for other in merged:
+        stats["attempts"] += other["attempts"]
+        stats["errors"] += other["errors"]
+        stats["last_seen"] = max(stats["last_seen"], other.get("last_seen", 0))
+        if stats.get("latency") is None:
+            stats["latency"] = other.get("latency")
+    return stats
@@ -0,0 +1,450 @@
+"""Classroom mode: one shared deck studied by many learners over HTTP/JSON.
+
+The deck and its indexes are loaded once and shared by every request.
+Each learner gets quiz sessions and answer statistics of their own, kept in
+a users file next to the deck. Answers are scored on the spot; persisting
+them is left to a single writer task that folds each batch into the deck's
+class-wide stats and saves once per batch, so the deck file sees a save per
+interval rather than per answer.
+
+Start it with `python -m cli serve`; everything runs on localhost by default.
+"""
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import re
+import secrets
+import time
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from data import save_data
+from quiz import QuizEngine
+from sampling import AdaptiveSampler, record_answer
+from decks import record_deck
+from metrics import REGISTRY, CONTENT_TYPE, counter, histogram
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+FLUSH_INTERVAL = 1.0
+SESSION_IDLE_S = 3600
+DEFAULT_QUIZ_LENGTH = 20
+MAX_BODY_BYTES = 1 << 20
+MAX_PAGE_SIZE = 500
+MAX_LATENCY_S = 600.0  # client-reported latencies are capped here so one stalled answer can't skew the stats
+USERS_SUFFIX = ".users.json"
+SESSION_MODES = ("quiz", "adaptive", "choice")
+SERVER_INDEXES = ("distractors", "tags")
+
+ANSWER_BATCH = histogram("codecard_server_answer_batch", "Answers saved per writer batch",
+                         (1, 10, 100, 1000, 10000, 100000))
+_USER_NAME = re.compile(r"[\w.@ -]{1,64}")
+STATUS_TEXT = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def users_file(deck_path):
+    return os.path.splitext(deck_path)[0] + USERS_SUFFIX
+
+def load_users(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logging.error(f"Error loading users file, starting empty: {e}")
+        return {}
+
+def _write_users(path, text):
+    temp_file = path + ".tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_file, path)
+
+class Session:
+    """One learner's quiz in progress."""
+    def __init__(self, session_id, user, mode, engine):
+        self.id = session_id
+        self.user = user
+        self.mode = mode
+        self.engine = engine
+        self.choices = None
+        self.choices_for = None
+        self.shown_at = time.monotonic()
+        self.touched = time.monotonic()
+
+    def state(self):
+        card = self.engine.current()
+        state = {"id": self.id, "user": self.user, "mode": self.mode, "index": self.engine.index,
+                 "total": self.engine.total, "correct": self.engine.correct, "finished": card is None}
+        if card is not None:
+            if self.mode == "choice" and self.choices_for != self.engine.index:
+                self.choices, self.choices_for = self.engine.choices(card), self.engine.index
+            state["card"] = {"id": card["id"], "question": card["question"]}
+            if self.mode == "choice":
+                state["choices"] = self.choices
+        return state
+
+class ClassroomServer:
+    """HTTP/JSON front end over one shared Deck.
+
+    Request handlers run on the event loop and only read the deck; the
+    writer task is the only code that changes it, so no locking is needed.
+    """
+    def __init__(self, deck, users_path=None, flush_interval=FLUSH_INTERVAL):
+        self.deck = deck
+        self.users_path = users_path or users_file(deck.path)
+        self.users = load_users(self.users_path)
+        self.flush_interval = flush_interval
+        self.sessions = {}
+        self.pending = None
+        self.writer = None
+        self.server = None
+        self.request_metrics = {}
+        self.routes = [
+            ("GET", re.compile(r"/"), self.index_page),
+            ("GET", re.compile(r"/metrics"), self.get_metrics),
+            ("GET", re.compile(r"/api/deck"), self.get_deck),
+            ("GET", re.compile(r"/api/cards"), self.get_cards),
+            ("POST", re.compile(r"/api/sessions"), self.create_session),
+            ("GET", re.compile(r"/api/sessions/(\w+)"), self.get_session),
+            ("POST", re.compile(r"/api/sessions/(\w+)/answer"), self.answer),
+            ("GET", re.compile(r"/api/users/([^/]+)"), self.get_user),
+        ]
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.pending = asyncio.Queue()
+        self.writer = asyncio.create_task(self.write_answers())
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def stop(self):
+        """Stop accepting requests and persist every answer received so far."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.writer is not None:
+            self.pending.put_nowait(None)
+            await self.writer
+
+    # Writer
+
+    def drain_pending(self):
+        batch = []
+        while not self.pending.empty():
+            batch.append(self.pending.get_nowait())
+        return batch
+
+    async def write_answers(self):
+        """The single writer: wait for an answer, let the batch fill for an interval, then save it.
+
+        A None in the queue (from stop()) saves what is left and ends the task.
+        """
+        while True:
+            batch = [await self.pending.get()]
+            if batch[0] is not None:
+                await asyncio.sleep(self.flush_interval)
+            batch += self.drain_pending()
+            stopping = None in batch
+            try:
+                await self.flush([answer for answer in batch if answer is not None])
+            except Exception as e:
+                logging.error(f"Error saving answers: {e}")
+            if stopping:
+                return
+            self.expire_sessions()
+
+    async def flush(self, batch):
+        """Fold a batch of (card id, correct, latency, time) answers into the deck and save it."""
+        if not batch:
+            return
+        ANSWER_BATCH.observe(len(batch))
+        stats = self.deck.data["stats"]
+        card_stats = self.deck.data.setdefault("card_stats", {})
+        rollups = self.deck.rollups
+        for card_id, correct, latency, now in batch:
+            record_answer(card_stats, card_id, correct, latency, now)
+            rollups.record(card_id, correct, latency, now)
+            stats["total"] += 1
+            stats["correct"] += correct
+        # Handlers only read the deck and this task is its only writer, so serializing it can leave the
+        # loop; a merge from another writer swaps whole cards in, and the indexes catch up back on the loop.
+        diff = await asyncio.to_thread(save_data, self.deck.data, False, self.deck.path)
+        self.deck.apply_diff(diff)
+        await asyncio.to_thread(rollups.save_if_changed)
+        if self.deck.slug:
+            await asyncio.to_thread(record_deck, self.deck.slug, self.deck.data)
+        text = json.dumps(self.users, ensure_ascii=False)
+        await asyncio.to_thread(_write_users, self.users_path, text)
+        logging.info(f"Saved {len(batch)} answers")
+
+    def expire_sessions(self):
+        cutoff = time.monotonic() - SESSION_IDLE_S
+        for session_id in [sid for sid, session in self.sessions.items() if session.touched < cutoff]:
+            del self.sessions[session_id]
+
+    # HTTP
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection, keeping it open between them."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise ValueError("negative Content-Length")
+                except ValueError:
+                    writer.write(self.response(400, {"error": "malformed request"}, keep_alive=False))
+                    break
+                if length > MAX_BODY_BYTES:
+                    writer.write(self.response(413, {"error": "request body too large"}, keep_alive=False))
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                status, payload, *content_type = self.dispatch(method, target, body)
+                writer.write(self.response(status, payload, keep_alive, *content_type))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def response(status, payload, keep_alive=True, content_type="text/html; charset=utf-8"):
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+        else:
+            body, content_type = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json"
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode("latin-1") + body
+
+    def dispatch(self, method, target, body):
+        """Route a request to its handler, counting and timing it per route.
+
+        Returns (status, payload) or (status, text, content type).
+        """
+        start = time.perf_counter()
+        route, result = self.route(method, target, body)
+        metrics = self.request_metrics.get((route, result[0]))
+        if metrics is None:
+            metrics = self.request_metrics[(route, result[0])] = (
+                counter("codecard_http_requests_total", "Classroom server requests", route=route,
+                        status=str(result[0])),
+                histogram("codecard_http_request_seconds", "Classroom server request handling time", route=route))
+        metrics[0].inc()
+        metrics[1].observe(time.perf_counter() - start)
+        return result
+
+    def route(self, method, target, body):
+        """(route name, handler result) for a request."""
+        url = urlsplit(target)
+        route = "unknown"
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            allowed = False
+            for route_method, pattern, handler in self.routes:
+                match = pattern.fullmatch(url.path)
+                if match is None:
+                    continue
+                if route_method != method:
+                    allowed = True
+                    continue
+                route = handler.__name__
+                payload = json.loads(body) if body else {}
+                if not isinstance(payload, dict):
+                    raise HTTPError(400, "expected a JSON object")
+                return route, handler(*match.groups(), query=query, payload=payload)
+            raise HTTPError(405, "method not allowed") if allowed else HTTPError(404, "not found")
+        except HTTPError as e:
+            return route, (e.status, {"error": str(e)})
+        except ValueError as e:
+            return route, (400, {"error": str(e)})
+        except Exception as e:
+            logging.error(f"Error handling {method} {target}: {e}")
+            return route, (500, {"error": "internal error"})
+
+    # Handlers
+
+    def user_record(self, user):
+        if not isinstance(user, str) or not _USER_NAME.fullmatch(user.strip()):
+            raise HTTPError(400, "user must be 1-64 letters, digits, spaces or . @ - _")
+        return self.users.setdefault(user.strip(), {"stats": {"correct": 0, "total": 0}, "card_stats": {}})
+
+    def session(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise HTTPError(404, "no such session")
+        session.touched = time.monotonic()
+        return session
+
+    def index_page(self, query, payload):
+        return 200, INDEX_PAGE
+
+    def get_metrics(self, query, payload):
+        return 200, REGISTRY.render(), CONTENT_TYPE
+
+    def get_deck(self, query, payload):
+        summary = self.deck.summary()
+        summary["sessions"] = len(self.sessions)
+        summary["users"] = len(self.users)
+        return 200, summary
+
+    def get_cards(self, query, payload):
+        """A page of cards matching optional search, tags, sort and reverse parameters."""
+        sort = query.get("sort", "question")
+        if sort not in ("question", "answer"):
+            raise HTTPError(400, "sort must be question or answer")
+        card_ids = self.deck.search(query.get("search", ""), self.deck.tag_mask(query.get("tags", "")), sort,
+                                    reverse=query.get("reverse") in ("1", "true"))
+        offset = max(int(query.get("offset", 0)), 0)
+        limit = min(max(int(query.get("limit", 50)), 0), MAX_PAGE_SIZE)
+        cards = [self.deck.indexes.by_id[card_id] for card_id in card_ids[offset:offset + limit]]
+        return 200, {"total": len(card_ids), "offset": offset, "cards": cards}
+
+    def create_session(self, query, payload):
+        """Start a quiz for a user: {"user", "mode": quiz|adaptive|choice, "length", "tags"}."""
+        record = self.user_record(payload.get("user"))
+        mode = payload.get("mode", "quiz")
+        if mode not in SESSION_MODES:
+            raise HTTPError(400, f"mode must be one of {', '.join(SESSION_MODES)}")
+        length = int(payload.get("length") or DEFAULT_QUIZ_LENGTH)
+        card_ids = self.deck.search("", self.deck.tag_mask(payload.get("tags") or ""))
+        if not card_ids or length < 1:
+            raise HTTPError(400, "no flashcards to quiz")
+        cards = [self.deck.indexes.by_id[card_id] for card_id in card_ids]
+        if mode == "adaptive":
+            engine = QuizEngine([], length, AdaptiveSampler(cards, record["card_stats"]))
+        else:
+            cards = random.sample(cards, min(length, len(cards)))
+            engine = QuizEngine(cards, card_stats=record["card_stats"],
+                                distractors=self.deck.indexes["distractors"] if mode == "choice" else None)
+        session = Session(secrets.token_hex(8), payload["user"].strip(), mode, engine)
+        self.sessions[session.id] = session
+        return 201, session.state()
+
+    def get_session(self, session_id, query, payload):
+        return 200, self.session(session_id).state()
+
+    def answer(self, session_id, query, payload):
+        """Score {"answer"} for the session's current card; latency is measured server-side if not given."""
+        session = self.session(session_id)
+        card = session.engine.current()
+        if card is None:
+            raise HTTPError(400, "session is finished")
+        if "answer" not in payload:
+            raise HTTPError(400, "missing answer")
+        now = time.monotonic()
+        latency = payload.get("latency")
+        if latency is None:
+            latency = now - session.shown_at
+        else:
+            try:
+                latency = float(latency)
+            except (TypeError, ValueError):
+                latency = math.nan
+            if not math.isfinite(latency) or latency < 0:
+                raise HTTPError(400, "latency must be a finite, non-negative number of seconds")
+        latency = min(latency, MAX_LATENCY_S)
+        correct = session.engine.answer(str(payload["answer"]), latency)
+        stats = self.users[session.user]["stats"]
+        stats["total"] += 1
+        stats["correct"] += correct
+        self.pending.put_nowait((card["id"], correct, latency, time.time()))
+        session.shown_at = now
+        return 200, {"correct": correct, "expected": card["answer"], "session": session.state()}
+
+    def get_user(self, user, query, payload):
+        user = unquote(user)
+        record = self.users.get(user)
+        if record is None:
+            raise HTTPError(404, "no such user")
+        sessions = [session.id for session in self.sessions.values() if session.user == user]
+        return 200, {"user": user, "stats": record["stats"], "studied": len(record["card_stats"]),
+                     "sessions": sessions}
+
+async def serve_forever(server, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    listener = await server.start(host, port)
+    addresses = ", ".join(f"http://{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in listener.sockets)
+    print(f"Serving {server.deck.slug or server.deck.path} on {addresses}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+def serve(deck, host=DEFAULT_HOST, port=DEFAULT_PORT, flush_interval=FLUSH_INTERVAL):
+    """Run the classroom server until interrupted."""
+    try:
+        asyncio.run(serve_forever(ClassroomServer(deck, flush_interval=flush_interval), host, port))
+    except KeyboardInterrupt:
+        pass
+
+INDEX_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>CodeCard Classroom</title>
+<style>
+body { font-family: Inter, sans-serif; background: #f0f4f8; max-width: 640px; margin: 40px auto; color: #1e293b; }
+#question { background: white; border: 2px solid #d1d9e6; border-radius: 8px; padding: 20px; font-size: 18px; }
+input, button { font-size: 14px; padding: 10px; border-radius: 6px; border: 2px solid #d1d9e6; margin: 6px 0; }
+button { background: #2563eb; color: white; border: none; cursor: pointer; }
+</style></head>
+<body>
+<h1>🎓 CodeCard Classroom</h1>
+<div id="start"><input id="user" placeholder="Your name"> <input id="tags" placeholder="Tag filter (optional)">
+<button onclick="start()">Start quiz</button></div>
+<p id="progress"></p><div id="question" hidden></div>
+<div id="answer" hidden><input id="reply" placeholder="Type your answer..."> <button onclick="send()">Submit</button></div>
+<p id="feedback"></p>
+<script>
+let session = null;
+async function call(method, path, body) {
+  const r = await fetch(path, {method, headers: {"Content-Type": "application/json"},
+                               body: body ? JSON.stringify(body) : undefined});
+  const data = await r.json();
+  if (!r.ok) throw new Error(data.error);
+  return data;
+}
+function show(state) {
+  session = state;
+  document.getElementById("progress").textContent =
+    `Question ${Math.min(state.index + 1, state.total)}/${state.total} | Score: ${state.correct}/${state.index}`;
+  const done = state.finished;
+  document.getElementById("question").hidden = document.getElementById("answer").hidden = done;
+  if (!done) document.getElementById("question").textContent = "❓ " + state.card.question;
+  document.getElementById("reply").value = "";
+}
+async function start() {
+  try {
+    show(await call("POST", "/api/sessions", {user: document.getElementById("user").value,
+                                              tags: document.getElementById("tags").value}));
+    document.getElementById("feedback").textContent = "";
+  } catch (e) { document.getElementById("feedback").textContent = e.message; }
+}
+async function send() {
+  const result = await call("POST", `/api/sessions/${session.id}/answer`,
+                            {answer: document.getElementById("reply").value});
+  document.getElementById("feedback").textContent = result.correct ? "✅ Correct!" : `❌ Wrong! Answer: ${result.expected}`;
+  show(result.session);
+}
+document.getElementById("reply").addEventListener("keydown", e => { if (e.key === "Enter") send(); });
+</script></body></html>
+"""
@@ -0,0 +1,77 @@
+import json
+import os
+import logging
+
+SESSION_FILE = "quiz_session.ckpt"
+
+class QuizCheckpoint:
+    """Append-only checkpoint of an in-progress quiz session.
+
+    The first line is a JSON header with the mode, the card ids in quiz order
+    and the session options. Each answer then appends "1" or "0" on its own
+    line, and cards drawn during the session (adaptive mode) append "+<id>",
+    so a checkpoint costs a few bytes per answer instead of a full save.
+    """
+    def __init__(self, path, f):
+        self.path = path
+        self.f = f
+
+    @classmethod
+    def start(cls, mode, card_ids, options=None, answers=(), path=None):
+        """Begin a new checkpoint, replacing any previous one."""
+        path = path or SESSION_FILE
+        f = open(path, 'w', encoding='utf-8')
+        header = {"mode": mode, "cards": list(card_ids), "options": options or {}}
+        f.write(json.dumps(header, separators=(",", ":")) + "\n")
+        f.writelines("1\n" if correct else "0\n" for correct in answers)
+        f.flush()
+        return cls(path, f)
+
+    @staticmethod
+    def load(path=None):
+        """Read a checkpoint left behind by an interrupted session, if any.
+
+        Returns {"mode", "cards", "options", "answers"} or None. A partially
+        written last line is ignored.
+        """
+        path = path or SESSION_FILE
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+                cards, answers = list(header["cards"]), []
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    line = line.rstrip("\n")
+                    if line.startswith("+"):
+                        cards.append(line[1:])
+                    elif line in ("0", "1"):
+                        answers.append(line == "1")
+            return {"mode": header["mode"], "cards": cards,
+                    "options": header.get("options", {}), "answers": answers}
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable quiz checkpoint: {e}")
+            return None
+
+    @staticmethod
+    def discard(path=None):
+        path = path or SESSION_FILE
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def record_draw(self, card_id):
+        self.f.write(f"+{card_id}\n")
+        self.f.flush()
+
+    def record(self, correct):
+        self.f.write("1\n" if correct else "0\n")
+        self.f.flush()
+
+    def finish(self):
+        """Close and delete the checkpoint once the session's results are saved."""
+        self.f.close()
+        self.discard(self.path)
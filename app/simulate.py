@@ -0,0 +1,243 @@
+"""Synthetic learners for benchmarking the quiz engine and card scheduling.
+
+Each simulated learner studies a deck in sessions through QuizEngine, the
+same code the quiz dialogs and the classroom server run. Whether they
+recall a card comes from a forgetting curve over the card's memory
+stability, and how long they take to answer comes from a latency
+distribution. Learners are split across a process pool. The report covers
+learning outcome (accuracy and retention) and engine speed (answers per
+second and per-operation latency), so a scheduling change can be judged on
+both.
+"""
+import math
+import os
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from quiz import QuizEngine
+from sampling import AdaptiveSampler
+
+SECONDS_PER_DAY = 24 * 3600
+INITIAL_STABILITY = SECONDS_PER_DAY  # seconds until a freshly learned card drops to ~37% recall (exponential)
+STABILITY_GROWTH = 2.0
+LAPSE_FACTOR = 0.3
+FEEDBACK_DELAY = 1.5
+DIFFICULTY_RANGE = (0.5, 2.0)
+ABILITY_RANGE = (0.6, 1.4)
+RETENTION_HORIZON = SECONDS_PER_DAY
+MAX_TIMINGS = 200000  # per operation; later timings are sampled so memory stays bounded
+
+FORGETTING_CURVES = {
+    # Probability of recall `elapsed` seconds after a review, for memory stability `stability`.
+    "exponential": lambda elapsed, stability: math.exp(-elapsed / stability),
+    "power": lambda elapsed, stability: (1 + elapsed / (9 * stability)) ** -1,
+}
+
+LATENCY_MODELS = {
+    # Seconds to answer; wrong answers take longer.
+    "lognormal": lambda rng, recalled: rng.lognormvariate(math.log(3.0 if recalled else 6.0), 0.5),
+    "gamma": lambda rng, recalled: rng.gammavariate(2.0, 1.5 if recalled else 3.0),
+    "exponential": lambda rng, recalled: 0.5 + rng.expovariate(1 / (2.5 if recalled else 5.0)),
+}
+
+ENGINES = ("adaptive", "random")
+
+DEFAULT_CONFIG = {
+    "learners": 1000,
+    "cards": 2000,
+    "sessions": 10,
+    "session_length": 50,
+    "session_gap": SECONDS_PER_DAY,
+    "engine": "adaptive",
+    "curve": "exponential",
+    "latency": "lognormal",
+    "seed": 0,
+}
+
+def synthetic_cards(count):
+    return [{"id": f"{i:016x}", "question": f"Question {i}?", "answer": f"answer {i}"} for i in range(count)]
+
+class Learner:
+    """Memory state of one simulated learner: per-card stability and last review time."""
+    def __init__(self, rng, curve, difficulty):
+        self.rng = rng
+        self.curve = curve
+        self.difficulty = difficulty
+        self.ability = rng.uniform(*ABILITY_RANGE)
+        self.stability = {}
+        self.reviewed = {}
+
+    def recall_probability(self, card_id, now):
+        if card_id not in self.stability:
+            return 0.0
+        return self.curve(now - self.reviewed[card_id], self.stability[card_id])
+
+    def initial_stability(self, card_id):
+        """Stability right after first learning a card; harder cards and weaker learners start lower."""
+        return INITIAL_STABILITY * self.ability / self.difficulty[card_id]
+
+    def review(self, card_id, now):
+        """Try to recall a card, then learn from the feedback; returns whether it was recalled."""
+        probability = self.recall_probability(card_id, now)
+        recalled = self.rng.random() < probability
+        if card_id not in self.stability:
+            self.stability[card_id] = self.initial_stability(card_id)
+        elif recalled:
+            # Recalling a half-forgotten card strengthens it most (the spacing effect).
+            growth = STABILITY_GROWTH * self.ability / self.difficulty[card_id] * (1.1 - probability)
+            self.stability[card_id] *= 1 + growth
+        else:
+            # A lapse never drops below, nor lifts a hard card above, where it started.
+            self.stability[card_id] = max(self.stability[card_id] * LAPSE_FACTOR, self.initial_stability(card_id))
+        self.reviewed[card_id] = now
+        return recalled
+
+def _record_timing(timings, count, value, rng):
+    """Keep up to MAX_TIMINGS timings, then replace random ones (reservoir sampling)."""
+    if len(timings) < MAX_TIMINGS:
+        timings.append(value)
+    else:
+        slot = rng.randrange(count)
+        if slot < MAX_TIMINGS:
+            timings[slot] = value
+
+def _simulate_learners(job):
+    """Run the learners first..last-1 of a simulation; runs inside a pool worker."""
+    config, first, last, cards = job
+    cards = cards or synthetic_cards(config["cards"])
+    card_rng = random.Random(config["seed"])
+    difficulty = {card["id"]: card_rng.uniform(*DIFFICULTY_RANGE) for card in cards}
+    curve = FORGETTING_CURVES[config["curve"]]
+    latency_model = LATENCY_MODELS[config["latency"]]
+    result = {"learners": 0, "answers": 0, "correct": 0, "retention": 0.0, "studied_retention": 0.0,
+              "studied": 0, "engine_seconds": 0.0, "timings": {"setup": array("d"), "draw": array("d"),
+                                                              "answer": array("d")}}
+    counts = dict.fromkeys(result["timings"], 0)
+    timing_rng = random.Random(config["seed"] + first)
+
+    def timed(operation, start):
+        elapsed = time.perf_counter() - start
+        counts[operation] += 1
+        _record_timing(result["timings"][operation], counts[operation], elapsed, timing_rng)
+        result["engine_seconds"] += elapsed
+
+    for n in range(first, last):
+        rng = random.Random(config["seed"] * 1000003 + n)
+        learner = Learner(rng, curve, difficulty)
+        card_stats = {}
+        now = 0.0
+        for _ in range(config["sessions"]):
+            start = time.perf_counter()
+            if config["engine"] == "adaptive":
+                engine = QuizEngine([], config["session_length"], AdaptiveSampler(cards, card_stats, rng, now))
+            else:
+                engine = QuizEngine(rng.sample(cards, min(config["session_length"], len(cards))),
+                                    card_stats=card_stats)
+            timed("setup", start)
+            while True:
+                start = time.perf_counter()
+                card = engine.current()
+                timed("draw", start)
+                if card is None:
+                    break
+                recalled = learner.review(card["id"], now)
+                latency = latency_model(rng, recalled)
+                start = time.perf_counter()
+                engine.answer(card["answer"] if recalled else "", latency, now)
+                timed("answer", start)
+                now += latency + FEEDBACK_DELAY
+            result["answers"] += engine.index
+            result["correct"] += engine.correct
+            now += config["session_gap"]
+        # Retention: recall probability a horizon after the last session, over the deck and the cards seen.
+        later = now - config["session_gap"] + RETENTION_HORIZON
+        recall = [learner.recall_probability(card_id, later) for card_id in learner.stability]
+        result["retention"] += sum(recall) / len(cards)
+        result["studied_retention"] += sum(recall) / len(recall) if recall else 0.0
+        result["studied"] += len(recall)
+        result["learners"] += 1
+    return result
+
+def _percentile(ordered, fraction):
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+def run_simulation(config=None, cards=None, workers=None, progress=None):
+    """Simulate `config["learners"]` learners in a process pool and return a report dict.
+
+    `cards` replaces the synthetic deck (e.g. a real deck's flashcards).
+    `progress(done, total)` is called as learner chunks finish.
+    """
+    config = dict(DEFAULT_CONFIG, **(config or {}))
+    if config["engine"] not in ENGINES:
+        raise ValueError(f"engine must be one of {', '.join(ENGINES)}")
+    if config["curve"] not in FORGETTING_CURVES:
+        raise ValueError(f"curve must be one of {', '.join(FORGETTING_CURVES)}")
+    if config["latency"] not in LATENCY_MODELS:
+        raise ValueError(f"latency must be one of {', '.join(LATENCY_MODELS)}")
+    if cards is not None and not cards:
+        raise ValueError("the deck has no flashcards")
+    learners = config["learners"]
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, math.ceil(learners / (workers * 4)))
+    jobs = [(config, first, min(first + chunk, learners), cards) for first in range(0, learners, chunk)]
+
+    start = time.perf_counter()
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = []
+            for result in executor.map(_simulate_learners, jobs):
+                results.append(result)
+                if progress:
+                    progress(sum(r["learners"] for r in results), learners)
+    else:
+        results = []
+        for job in jobs:
+            results.append(_simulate_learners(job))
+            if progress:
+                progress(sum(r["learners"] for r in results), learners)
+    wall_seconds = time.perf_counter() - start
+
+    answers = sum(r["answers"] for r in results)
+    correct = sum(r["correct"] for r in results)
+    engine_seconds = sum(r["engine_seconds"] for r in results)
+    operations = {}
+    for operation in ("setup", "draw", "answer"):
+        ordered = sorted(t for r in results for t in r["timings"][operation])
+        operations[operation] = {
+            "mean_us": round(sum(ordered) / len(ordered) * 1e6, 2) if ordered else 0.0,
+            "p50_us": round(_percentile(ordered, 0.5) * 1e6, 2),
+            "p99_us": round(_percentile(ordered, 0.99) * 1e6, 2),
+        }
+    return {
+        "config": config,
+        "workers": workers,
+        "learners": learners,
+        "answers": answers,
+        "accuracy": round(correct / answers, 4) if answers else 0.0,
+        "retention": round(sum(r["retention"] for r in results) / learners, 4) if learners else 0.0,
+        "studied_retention": round(sum(r["studied_retention"] for r in results) / learners, 4) if learners else 0.0,
+        "cards_studied": round(sum(r["studied"] for r in results) / learners, 1) if learners else 0.0,
+        "wall_seconds": round(wall_seconds, 3),
+        "answers_per_second": round(answers / wall_seconds) if wall_seconds else 0,
+        "engine_answers_per_second": round(answers / engine_seconds) if engine_seconds else 0,
+        "operations": operations,
+    }
+
+def format_report(report):
+    config = report["config"]
+    lines = [
+        f"{report['learners']} learners x {config['sessions']} sessions x {config['session_length']} cards "
+        f"({config['engine']} engine, {config['curve']} forgetting, {config['latency']} latency, "
+        f"{report['workers']} workers)",
+        f"Answers: {report['answers']} in {report['wall_seconds']}s = {report['answers_per_second']} cards/s "
+        f"(engine alone: {report['engine_answers_per_second']} cards/s)",
+        f"Accuracy: {report['accuracy']:.1%}",
+        f"Retention after {RETENTION_HORIZON // 3600}h: {report['retention']:.1%} of the deck, "
+        f"{report['studied_retention']:.1%} of the {report['cards_studied']} cards studied per learner",
+    ]
+    for operation, timing in report["operations"].items():
+        lines.append(f"  {operation:8} mean {timing['mean_us']:>9.2f} us  p50 {timing['p50_us']:>9.2f} us  "
+                     f"p99 {timing['p99_us']:>9.2f} us")
+    return "\n".join(lines)
@@ -0,0 +1,135 @@
+"""Short audio cues for quiz feedback, honoring the sound_enabled setting.
+
+The cues are synthesized in memory as WAV data (no sound files ship with
+the app), written to a private temporary directory and loaded into a small
+pool of QSoundEffect players per cue when the app starts. Playing a cue only
+restarts an already-decoded player, so the answer path never touches the
+disk, decodes or allocates audio buffers.
+
+Without Qt Multimedia, or with CODECARD_SOUND=null (headless runs and
+tests), a NullSoundBackend counts the cues instead of playing them.
+"""
+import io
+import logging
+import math
+import os
+import sys
+import tempfile
+import wave
+from array import array
+
+from metrics import counter
+
+try:
+    from PyQt5.QtCore import QUrl
+    from PyQt5.QtMultimedia import QSoundEffect
+except ImportError:  # no multimedia module or audio libraries
+    QSoundEffect = None
+
+SAMPLE_RATE = 22050
+POOL_SIZE = 2  # players per cue, so a cue can overlap itself
+VOLUME = 0.5
+FADE_SECONDS = 0.005
+SOUND_DIR_PREFIX = "codecard-sounds-"
+
+CUES = {
+    # Notes as (frequency in Hz, seconds).
+    "correct": ((660, 0.07), (880, 0.12)),
+    "wrong": ((233, 0.09), (196, 0.16)),
+    "time_up": ((523, 0.08), (392, 0.08), (262, 0.18)),
+}
+
+CUES_PLAYED = {cue: counter("codecard_sound_cues_total", "Sound cues played", cue=cue) for cue in CUES}
+
+def synthesize(notes, rate=SAMPLE_RATE):
+    """16-bit mono WAV bytes for a sequence of sine notes, faded in and out to avoid clicks."""
+    samples = array("h")
+    fade = max(1, int(rate * FADE_SECONDS))
+    for frequency, seconds in notes:
+        count = int(rate * seconds)
+        step = 2 * math.pi * frequency / rate
+        samples.extend(int(26000 * min(1.0, i / fade, (count - i) / fade) * math.sin(step * i))
+                       for i in range(count))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+class NullSoundBackend:
+    """Counts cues instead of playing them."""
+    def __init__(self):
+        self.played = dict.fromkeys(CUES, 0)
+
+    def play(self, cue):
+        self.played[cue] += 1
+
+class QtSoundBackend:
+    """A preloaded, round-robin pool of QSoundEffect players per cue. Create after the QApplication.
+
+    The WAV files go to a fresh directory only this user can open (removed
+    with the backend), so nothing in a shared temp dir can be swapped in or
+    written through.
+    """
+    def __init__(self):
+        self.directory = tempfile.TemporaryDirectory(prefix=SOUND_DIR_PREFIX)
+        self.pools = {}
+        self.next = dict.fromkeys(CUES, 0)
+        for cue, notes in CUES.items():
+            path = os.path.join(self.directory.name, f"{cue}.wav")
+            with open(path, 'xb') as f:
+                f.write(synthesize(notes))
+            players = []
+            for _ in range(POOL_SIZE):
+                effect = QSoundEffect()
+                effect.setSource(QUrl.fromLocalFile(path))
+                effect.setVolume(VOLUME)
+                players.append(effect)
+            self.pools[cue] = players
+
+    def play(self, cue):
+        players = self.pools[cue]
+        i = self.next[cue]
+        self.next[cue] = (i + 1) % len(players)
+        players[i].play()
+
+class SoundEngine:
+    def __init__(self, backend, enabled=True):
+        self.backend = backend
+        self.enabled = enabled
+
+    def play(self, cue):
+        if self.enabled:
+            self.backend.play(cue)
+            CUES_PLAYED[cue].inc()
+
+def create_backend():
+    """The Qt backend when audio is available, else the null backend."""
+    if QSoundEffect is None or os.getenv("CODECARD_SOUND") == "null":
+        return NullSoundBackend()
+    try:
+        return QtSoundBackend()
+    except OSError as e:
+        logging.warning(f"Sound disabled: {e}")
+        return NullSoundBackend()
+
+# Process-wide engine, like the animations switch in utils.py; init_sound() swaps in the real backend.
+_ENGINE = SoundEngine(NullSoundBackend(), enabled=False)
+
+def init_sound(enabled):
+    """Preload the cues (call once the QApplication exists) and apply the setting."""
+    _ENGINE.backend = create_backend()
+    _ENGINE.enabled = bool(enabled)
+
+def set_sound_enabled(enabled):
+    _ENGINE.enabled = bool(enabled)
+
+def sound_engine():
+    return _ENGINE
+
+def play_sound(cue):
+    _ENGINE.play(cue)
@@ -0,0 +1,195 @@
+import re
+
+from indexes import CardIndex
+
+_SPACES = re.compile(r"\s+")
+_QUERY_TOKEN = re.compile(r"\(|\)|[^\s()]+")
+OPERATORS = ("AND", "OR", "NOT")
+
+def normalize_tag(tag):
+    return _SPACES.sub("-", str(tag).strip()).casefold()
+
+def normalize_tags(tags):
+    """Tags as a de-duplicated list of lowercase, dash-joined strings.
+
+    Accepts a list or a comma-separated string.
+    """
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    elif not isinstance(tags, (list, tuple)):
+        tags = [tags]
+    result = []
+    for tag in tags or ():
+        tag = normalize_tag(tag)
+        if tag and tag not in result:
+            result.append(tag)
+    return result
+
+def _bitmap(slots):
+    """An int with the given bit positions set, built in one pass."""
+    if not slots:
+        return 0
+    bits = bytearray(max(slots) // 8 + 1)
+    for slot in slots:
+        bits[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(bits, "little")
+
+class TagIndex(CardIndex):
+    """One bitmap per tag over card slots, for fast tag queries.
+
+    Every card owns a bit position (slots of removed cards are reused), and
+    each tag's members are a Python int with those bits set, so AND, OR and
+    NOT across tags are single big-integer operations rather than scans of
+    the deck.
+    """
+    def __init__(self, cards=()):
+        self.rebuild(cards)
+
+    def clear(self):
+        self.slots = {}
+        self.ids = []
+        self.free = []
+        self.card_tags = {}
+        self.bitmaps = {}
+        self.all = 0
+
+    def rebuild(self, cards):
+        self.clear()
+        members = {}
+        for slot, card in enumerate(cards):
+            self.slots[card["id"]] = slot
+            self.ids.append(card["id"])
+            tags = tuple(card.get("tags", ()))
+            self.card_tags[card["id"]] = tags
+            for tag in tags:
+                members.setdefault(tag, []).append(slot)
+        self.bitmaps = {tag: _bitmap(slots) for tag, slots in members.items()}
+        self.all = (1 << len(self.ids)) - 1
+
+    def add(self, card):
+        if self.free:
+            slot = self.free.pop()
+            self.ids[slot] = card["id"]
+        else:
+            slot = len(self.ids)
+            self.ids.append(card["id"])
+        self.slots[card["id"]] = slot
+        bit = 1 << slot
+        self.all |= bit
+        tags = tuple(card.get("tags", ()))
+        self.card_tags[card["id"]] = tags
+        for tag in tags:
+            self.bitmaps[tag] = self.bitmaps.get(tag, 0) | bit
+
+    def remove(self, card_id):
+        slot = self.slots.pop(card_id, None)
+        if slot is None:
+            return
+        mask = ~(1 << slot)
+        self.all &= mask
+        for tag in self.card_tags.pop(card_id):
+            self.bitmaps[tag] &= mask
+            if not self.bitmaps[tag]:
+                del self.bitmaps[tag]
+        self.ids[slot] = None
+        self.free.append(slot)
+
+    def update_many(self, cards, all_cards):
+        """Retag cards in place, keeping their slots; each tag's bitmap changes once."""
+        added, removed = {}, {}
+        for card in cards:
+            tags = tuple(card.get("tags", ()))
+            old = self.card_tags.get(card["id"])
+            if old is None:
+                self.add(card)
+                continue
+            if old == tags:
+                continue
+            slot = self.slots[card["id"]]
+            self.card_tags[card["id"]] = tags
+            for tag in set(old).difference(tags):
+                removed.setdefault(tag, []).append(slot)
+            for tag in set(tags).difference(old):
+                added.setdefault(tag, []).append(slot)
+        for tag, slots in removed.items():
+            self.bitmaps[tag] &= ~_bitmap(slots)
+            if not self.bitmaps[tag]:
+                del self.bitmaps[tag]
+        for tag, slots in added.items():
+            self.bitmaps[tag] = self.bitmaps.get(tag, 0) | _bitmap(slots)
+
+    def contains(self, bitmap, card_id):
+        slot = self.slots.get(card_id)
+        return slot is not None and bitmap >> slot & 1 == 1
+
+    def tag_counts(self):
+        return {tag: bin(bitmap).count("1") for tag, bitmap in sorted(self.bitmaps.items())}
+
+    def ids_in(self, bitmap):
+        """Card ids for the set bits of `bitmap`, in slot order."""
+        ids = []
+        for i, byte in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")):
+            while byte:
+                low = byte & -byte
+                ids.append(self.ids[(i << 3) + low.bit_length() - 1])
+                byte ^= low
+        return ids
+
+    def query(self, expression):
+        """Bitmap of the cards matching a tag expression.
+
+        Tags combine with AND, OR and NOT (case-insensitive) and parentheses;
+        adjacent tags mean AND, and "a NOT b" means "a AND NOT b". Raises
+        ValueError on a malformed expression.
+        """
+        tokens = _QUERY_TOKEN.findall(expression)
+        position = 0
+
+        def peek():
+            return tokens[position].upper() if position < len(tokens) else None
+
+        def take():
+            nonlocal position
+            position += 1
+            return tokens[position - 1]
+
+        def parse_or():
+            result = parse_and()
+            while peek() == "OR":
+                take()
+                result |= parse_and()
+            return result
+
+        def parse_and():
+            result = parse_not()
+            while peek() not in (None, "OR", ")"):
+                if peek() == "AND":
+                    take()
+                result &= parse_not()
+            return result
+
+        def parse_not():
+            if peek() == "NOT":
+                take()
+                return self.all & ~parse_not()
+            if peek() == "(":
+                take()
+                result = parse_or()
+                if peek() != ")":
+                    raise ValueError("missing closing parenthesis")
+                take()
+                return result
+            if peek() in (None, ")") or peek() in OPERATORS:
+                raise ValueError(f"expected a tag at {take() if peek() else 'end of filter'!r}")
+            return self.bitmaps.get(normalize_tag(take()), 0)
+
+        if not tokens:
+            return self.all
+        result = parse_or()
+        if position < len(tokens):
+            raise ValueError(f"unexpected {tokens[position]!r}")
+        return result & self.all
+
+    def select(self, expression):
+        """Card ids matching a tag expression."""
+        return self.ids_in(self.query(expression))
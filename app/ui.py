@@ -1,31 +1,84 @@
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
     QTableWidget, QTableWidgetItem, QDialog, QLineEdit, QTextEdit, QMessageBox,
-    QInputDialog, QFrame, QSpacerItem, QSizePolicy, QCheckBox
+    QInputDialog, QFrame, QSpacerItem, QSizePolicy, QCheckBox, QComboBox, QStackedWidget,
+    QListWidget, QListWidgetItem, QHeaderView
 )
 from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QRect, pyqtProperty
-from PyQt5.QtGui import QFont, QPainter, QColor
+from PyQt5.QtGui import QFont, QPainter, QColor, QPen
 from PyQt5.QtWidgets import QGraphicsOpacityEffect
 import random
 import time
 import os
 from admin_panel import AdminPanel
-from utils import AnimatedButton, FlashcardDialog
+from utils import (
+    AnimatedButton, FlashcardDialog, CodeDelegate, animations_enabled, set_animations_enabled, set_card_text,
+    show_card_media
+)
+from highlight import HIGHLIGHTER
+from data import zstd
+from sampling import AdaptiveSampler
+from quiz import QuizEngine, is_correct
+from rollups import CARD_WEEKS
+from sound import play_sound, set_sound_enabled
+from session import QuizCheckpoint
+from related import QUERY_BATCH
+from distractors import CHOICE_COUNT, DistractorIndex
+from decks import load_catalogue, create_deck, deck_file, record_deck
+from deck import Deck
+
+FEEDBACK_DELAY_MS = 1500
+RAPID_FEEDBACK_DELAY_MS = 0
+ADAPTIVE_QUIZ_LENGTH = 20
+RELATED_HINT_COUNT = 3
+RAPID_GRADES = {
+    Qt.Key_1: ("Again", False),
+    Qt.Key_2: ("Hard", True),
+    Qt.Key_3: ("Good", True),
+    Qt.Key_4: ("Easy", True),
+}
+
+STORAGE_FORMATS = [("Plain JSON", None), ("Compressed (gzip)", "gzip")]
+if zstd is not None:
+    STORAGE_FORMATS.append(("Compressed (zstd)", "zstd"))
 
 class FadeInWidget(QWidget):
-    """Widget with fade-in animation."""
+    """Widget with fade-in animation.
+
+    The opacity effect is removed as soon as the fade finishes (or right away
+    when animations are disabled); left installed it would push every later
+    repaint of the page through offscreen compositing.
+    """
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.opacity_effect = None
+        self.fade_animation = None
+        if not animations_enabled():
+            return
         self.opacity_effect = QGraphicsOpacityEffect()
+        self.opacity_effect.setOpacity(0)
         self.setGraphicsEffect(self.opacity_effect)
         self.fade_animation = QPropertyAnimation(self.opacity_effect, b"opacity")
         self.fade_animation.setDuration(800)
         self.fade_animation.setStartValue(0)
         self.fade_animation.setEndValue(1)
+        self.fade_animation.finished.connect(self.remove_fade_effect)
         
     def fade_in(self):
+        if self.fade_animation is None:
+            return
+        if not animations_enabled():
+            self.remove_fade_effect()
+            return
         self.fade_animation.start()
 
+    def remove_fade_effect(self):
+        if self.fade_animation is not None:
+            self.fade_animation.stop()
+            self.fade_animation = None
+        self.opacity_effect = None
+        self.setGraphicsEffect(None)
+
 class AdminLoginDialog(QDialog):
     """Admin login dialog with modern styling."""
     def __init__(self, parent=None):
@@ -88,7 +141,7 @@ class SettingsDialog(QDialog):
     def __init__(self, parent=None, data=None):
         super().__init__(parent)
         self.setWindowTitle("⚙️ Settings")
-        self.setFixedSize(400, 300)
+        self.setFixedSize(400, 500)
         self.data = data
         layout = QVBoxLayout()
         layout.setSpacing(12)
@@ -118,11 +171,35 @@ class SettingsDialog(QDialog):
         """)
         layout.addWidget(self.time_input)
         
+        delay_label = QLabel("Quiz Feedback Delay (ms):")
+        delay_label.setStyleSheet("color: #1e293b; font-weight: bold;")
+        layout.addWidget(delay_label)
+        
+        self.delay_input = QLineEdit(str(self.data["settings"].get("feedback_delay_ms", FEEDBACK_DELAY_MS)))
+        self.delay_input.setStyleSheet(self.time_input.styleSheet())
+        layout.addWidget(self.delay_input)
+        
         self.sound_checkbox = QCheckBox("Enable Sound")
         self.sound_checkbox.setChecked(self.data["settings"]["sound_enabled"])
         self.sound_checkbox.setStyleSheet("margin: 10px; color: #1e293b;")
         layout.addWidget(self.sound_checkbox)
         
+        self.animations_checkbox = QCheckBox("Enable Animations")
+        self.animations_checkbox.setChecked(self.data["settings"].get("animations_enabled", True))
+        self.animations_checkbox.setStyleSheet("margin: 10px; color: #1e293b;")
+        layout.addWidget(self.animations_checkbox)
+        
+        storage_label = QLabel("Storage Format:")
+        storage_label.setStyleSheet("color: #1e293b; font-weight: bold;")
+        layout.addWidget(storage_label)
+        
+        self.storage_combo = QComboBox()
+        for label, compression in STORAGE_FORMATS:
+            self.storage_combo.addItem(label, compression)
+        current = self.storage_combo.findData(self.data["settings"].get("storage_compression"))
+        self.storage_combo.setCurrentIndex(max(current, 0))
+        layout.addWidget(self.storage_combo)
+        
         button_layout = QHBoxLayout()
         save_button = AnimatedButton("Save", "green")
         save_button.clicked.connect(self.save_settings)
@@ -140,11 +217,20 @@ class SettingsDialog(QDialog):
             if time_limit < 1 or time_limit > 60:
                 QMessageBox.warning(self, "Invalid Input", "Time limit must be between 1 and 60 seconds.")
                 return
+            feedback_delay = int(self.delay_input.text())
+            if feedback_delay < 0 or feedback_delay > 5000:
+                QMessageBox.warning(self, "Invalid Input", "Feedback delay must be between 0 and 5000 ms.")
+                return
             self.data["settings"]["default_time_limit"] = time_limit
+            self.data["settings"]["feedback_delay_ms"] = feedback_delay
             self.data["settings"]["sound_enabled"] = self.sound_checkbox.isChecked()
+            set_sound_enabled(self.sound_checkbox.isChecked())
+            self.data["settings"]["animations_enabled"] = self.animations_checkbox.isChecked()
+            set_animations_enabled(self.animations_checkbox.isChecked())
+            self.data["settings"]["storage_compression"] = self.storage_combo.currentData()
             self.accept()
         except ValueError:
-            QMessageBox.warning(self, "Invalid Input", "Please enter a valid number for time limit.")
+            QMessageBox.warning(self, "Invalid Input", "Please enter valid numbers for time limit and delay.")
 
 class InstructionsDialog(QDialog):
     """Modern instructions dialog."""
@@ -170,7 +256,8 @@ class InstructionsDialog(QDialog):
                 <ul>
                     <li><b>🎮 Start Quiz:</b> Test your knowledge with random questions</li>
                     <li><b>⏱️ Timed Quiz:</b> Challenge yourself with a time limit</li>
-                    <li><b>📊 View Stats:</b> Track your progress and accuracy</li>
+                    <li><b>⚡ Rapid Review:</b> Flip cards with Space and grade yourself with keys 1-4</li>
+                    <li><b>📈 Progress:</b> Chart your answers and accuracy per day, week or year</li>
                     <li><b>🔧 Admin Panel:</b> Manage flashcards (ask admin for password)</li>
                 </ul>
                 <h2 style='color: #dc2626;'>🔐 Admin Features</h2>
@@ -206,18 +293,201 @@ class InstructionsDialog(QDialog):
         
         self.setLayout(layout)
 
+STATS_VIEWS = (
+    # (label, rollup resolution, periods shown)
+    ("Last 30 days", "daily", 30),
+    ("Last 90 days", "daily", 90),
+    ("Last year", "daily", 365),
+    ("Last year by week", "weekly", 52),
+    ("Last 5 years by week", "weekly", 260),
+    ("By year", "yearly", 50),
+)
+HARD_CARD_ROWS = 20
+
+class ActivityChart(QWidget):
+    """Answers per period as bars, with accuracy drawn over them as a line."""
+    BAR_COLOR = QColor("#93c5fd")
+    LINE_COLOR = QColor("#16a34a")
+    AXIS_COLOR = QColor("#64748b")
+    MARGIN = (44, 12, 44, 28)  # left, top, right, bottom
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.points = []
+        self.setMinimumSize(560, 240)
+        self.setMouseTracking(True)
+        self.setStyleSheet("background: white;")
+
+    def set_points(self, points):
+        self.points = points
+        self.update()
+
+    def plot_rect(self):
+        left, top, right, bottom = self.MARGIN
+        return QRect(left, top, max(1, self.width() - left - right), max(1, self.height() - top - bottom))
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.fillRect(self.rect(), QColor("white"))
+        plot = self.plot_rect()
+        painter.setPen(QPen(self.AXIS_COLOR))
+        painter.drawLine(plot.bottomLeft(), plot.bottomRight())
+        if not self.points:
+            painter.end()
+            return
+        peak = max(answers for _, answers, _, _ in self.points) or 1
+        step = plot.width() / len(self.points)
+        bar_width = max(1, int(step * 0.8))
+        line = []
+        for i, (_, answers, correct, _) in enumerate(self.points):
+            x = plot.left() + i * step
+            if answers:
+                height = int(plot.height() * answers / peak)
+                painter.fillRect(int(x + (step - bar_width) / 2), plot.bottom() - height, bar_width, height,
+                                 self.BAR_COLOR)
+                line.append((int(x + step / 2), plot.bottom() - int(plot.height() * correct / answers)))
+        painter.setPen(QPen(self.LINE_COLOR, 2))
+        for start, end in zip(line, line[1:]):
+            painter.drawLine(start[0], start[1], end[0], end[1])
+        for x, y in line if len(line) == 1 else ():
+            painter.drawEllipse(x - 2, y - 2, 4, 4)
+        painter.setPen(QPen(self.AXIS_COLOR))
+        font = painter.font()
+        font.setPointSize(8)
+        painter.setFont(font)
+        painter.drawText(QRect(0, plot.top() - 6, plot.left() - 6, 14), Qt.AlignRight, str(peak))
+        painter.drawText(QRect(0, plot.bottom() - 8, plot.left() - 6, 14), Qt.AlignRight, "0")
+        painter.drawText(QRect(plot.right() + 6, plot.top() - 6, 40, 14), Qt.AlignLeft, "100%")
+        painter.drawText(QRect(plot.right() + 6, plot.bottom() - 8, 40, 14), Qt.AlignLeft, "0%")
+        label_top = plot.bottom() + 6
+        painter.drawText(QRect(plot.left(), label_top, plot.width(), 16), Qt.AlignLeft,
+                         self.points[0][0].isoformat())
+        painter.drawText(QRect(plot.left(), label_top, plot.width(), 16), Qt.AlignRight,
+                         self.points[-1][0].isoformat())
+        painter.end()
+
+    def mouseMoveEvent(self, event):
+        plot = self.plot_rect()
+        if not self.points or not plot.contains(event.pos()):
+            self.setToolTip("")
+            return
+        i = min(len(self.points) - 1, int((event.pos().x() - plot.left()) * len(self.points) / plot.width()))
+        start, answers, correct, latency = self.points[i]
+        text = f"{start.isoformat()}: {answers} answers"
+        if answers:
+            text += f", {correct / answers:.0%} correct"
+        if latency is not None:
+            text += f", {latency:.1f}s average"
+        self.setToolTip(text)
+
+class StatsDialog(QDialog):
+    """Accuracy and answer volume over time, read from the deck's precomputed rollups."""
+    def __init__(self, parent, rollups, cards):
+        super().__init__(parent)
+        self.setWindowTitle("📈 Progress")
+        self.resize(760, 640)
+        self.rollups = rollups
+        self.cards = cards
+        # Pick up answers the server or another window saved since this deck was loaded.
+        rollups.refresh()
+
+        layout = QVBoxLayout()
+        layout.setSpacing(12)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        title = QLabel("📈 Your Progress")
+        title.setFont(QFont("Inter", 18, QFont.Bold))
+        title.setAlignment(Qt.AlignCenter)
+        title.setStyleSheet("color: white; background: #2563eb; padding: 15px; border-radius: 8px;")
+        layout.addWidget(title)
+
+        view_layout = QHBoxLayout()
+        view_layout.addWidget(QLabel("Show:"))
+        self.view_combo = QComboBox()
+        for label, _, _ in STATS_VIEWS:
+            self.view_combo.addItem(label)
+        self.view_combo.currentIndexChanged.connect(self.show_view)
+        view_layout.addWidget(self.view_combo)
+        view_layout.addStretch()
+        layout.addLayout(view_layout)
+
+        self.summary_label = QLabel("")
+        self.summary_label.setFont(QFont("Inter", 12, QFont.Bold))
+        self.summary_label.setStyleSheet("color: #1e293b;")
+        layout.addWidget(self.summary_label)
+
+        self.chart = ActivityChart()
+        layout.addWidget(self.chart, 1)
+
+        hard_title = QLabel(f"🔥 Most missed cards (last {CARD_WEEKS} weeks)")
+        hard_title.setFont(QFont("Inter", 12, QFont.Bold))
+        hard_title.setStyleSheet("color: #1e293b;")
+        layout.addWidget(hard_title)
+
+        self.hard_table = QTableWidget(0, 3)
+        self.hard_table.setHorizontalHeaderLabels(["Question", "Answers", "Accuracy"])
+        self.hard_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.hard_table.verticalHeader().setVisible(False)
+        self.hard_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.hard_table, 1)
+
+        close_button = AnimatedButton("✅ Close", "green")
+        close_button.clicked.connect(self.accept)
+        layout.addWidget(close_button)
+
+        self.setLayout(layout)
+        self.show_view(0)
+        self.fill_hard_cards()
+
+    def show_view(self, index):
+        _, resolution, count = STATS_VIEWS[index]
+        points = self.rollups.series(resolution, count)
+        self.chart.set_points(points)
+        answers = sum(point[1] for point in points)
+        if not answers:
+            self.summary_label.setText("No answers in this period yet.")
+            return
+        correct = sum(point[2] for point in points)
+        active = sum(1 for point in points if point[1])
+        unit = {"daily": "days", "weekly": "weeks", "yearly": "years"}[resolution]
+        self.summary_label.setText(f"Answers: {answers} | Accuracy: {correct / answers:.1%} | "
+                                   f"Active {unit}: {active}/{len(points)}")
+
+    def fill_hard_cards(self):
+        totals = self.rollups.card_totals()
+        by_id = {card["id"]: card for card in self.cards if card["id"] in totals}
+        missed = sorted((item for item in totals.items() if item[0] in by_id and item[1][1] < item[1][0]),
+                        key=lambda item: (item[1][1] / item[1][0], -item[1][0]))[:HARD_CARD_ROWS]
+        self.hard_table.setRowCount(len(missed))
+        for row, (card_id, (answers, correct)) in enumerate(missed):
+            self.hard_table.setItem(row, 0, QTableWidgetItem(by_id[card_id]["question"]))
+            self.hard_table.setItem(row, 1, QTableWidgetItem(str(answers)))
+            self.hard_table.setItem(row, 2, QTableWidgetItem(f"{correct / answers:.0%}"))
+
 class QuizDialog(QDialog):
     """Modern quiz dialog with animations."""
-    def __init__(self, parent, cards, timed=False, time_limit=10):
+    def __init__(self, parent, cards, timed=False, time_limit=10, feedback_delay_ms=FEEDBACK_DELAY_MS,
+                 card_stats=None, sampler=None, length=None, checkpoint=None, start_index=0, start_correct=0,
+                 indexes=None, distractors=None, media=None, rollups=None):
         super().__init__(parent)
-        self.setWindowTitle("⏱️ Timed Quiz" if timed else "🎯 Quiz Mode")
+        self.setWindowTitle("⏱️ Timed Quiz" if timed else "🧠 Adaptive Quiz" if sampler else
+                            "🔤 Multiple Choice" if distractors else "🎯 Quiz Mode")
         self.resize(700, 500)
-        self.cards = cards
+        # Card order and scoring live in the engine; with a sampler it draws cards as the quiz goes.
+        self.engine = QuizEngine(cards, length, sampler, card_stats, checkpoint, start_index, start_correct,
+                                 distractors, rollups)
+        self.cards = self.engine.cards
+        self.total_questions = self.engine.total
         self.timed = timed
         self.time_limit = time_limit
-        self.current_card = 0
-        self.correct = 0
+        self.feedback_delay_ms = feedback_delay_ms
         self.start_time = time.time()
+        self.indexes = indexes
+        self.related_cache = {}
+        self.distractors = distractors
+        self.current_choices = []
+        self.media = media
         
         self.layout = QVBoxLayout()
         self.layout.setSpacing(12)
@@ -252,6 +522,12 @@ class QuizDialog(QDialog):
             }
         """)
         self.layout.addWidget(self.question_label)
+
+        # Card images are read from the media store only when their card comes up.
+        self.media_label = QLabel("")
+        self.media_label.setAlignment(Qt.AlignCenter)
+        self.media_label.hide()
+        self.layout.addWidget(self.media_label)
         
         self.answer_input = QLineEdit()
         self.answer_input.setPlaceholderText("Type your answer...")
@@ -274,6 +550,17 @@ class QuizDialog(QDialog):
         self.submit_button = AnimatedButton("🚀 Submit", "blue")
         self.submit_button.clicked.connect(self.check_answer)
         self.layout.addWidget(self.submit_button)
+
+        # Multiple choice replaces typing with one button per option (keys 1-4).
+        self.choice_buttons = []
+        if self.distractors:
+            self.answer_input.hide()
+            self.submit_button.hide()
+            for i in range(CHOICE_COUNT):
+                button = AnimatedButton("", "blue")
+                button.clicked.connect(lambda _, i=i: self.choose(i))
+                self.layout.addWidget(button)
+                self.choice_buttons.append(button)
         
         self.feedback_label = QLabel("")
         self.feedback_label.setAlignment(Qt.AlignCenter)
@@ -286,6 +573,11 @@ class QuizDialog(QDialog):
             }
         """)
         self.layout.addWidget(self.feedback_label)
+
+        self.related_label = QLabel("")
+        self.related_label.setWordWrap(True)
+        self.related_label.setStyleSheet("color: #475569; font-size: 13px; padding: 4px;")
+        self.layout.addWidget(self.related_label)
         
         if self.timed:
             self.timer_label = QLabel(f"⏰ Time left: {self.time_limit}s")
@@ -306,15 +598,24 @@ class QuizDialog(QDialog):
         self.setLayout(self.layout)
         self.next_question()
 
+    @property
+    def current_card(self):
+        return self.engine.index
+
+    @property
+    def correct(self):
+        return self.engine.correct
+
     def update_progress(self):
-        self.progress_label.setText(f"📊 Question {self.current_card + 1}/{len(self.cards)} | Score: {self.correct}/{self.current_card}")
+        self.progress_label.setText(f"📊 Question {self.current_card + 1}/{self.total_questions} | Score: {self.correct}/{self.current_card}")
 
     def update_timer(self):
-        if not self.timed or self.current_card >= len(self.cards):
+        if not self.timed or self.current_card >= self.total_questions:
             return
         elapsed = time.time() - self.start_time
         remaining = self.time_limit - elapsed
         if remaining <= 0:
+            play_sound("time_up")
             self.feedback_label.setText("⏰ Time's up!")
             self.feedback_label.setStyleSheet("""
                 QLabel {
@@ -327,7 +628,7 @@ class QuizDialog(QDialog):
                 }
             """)
             self.submit_button.setDisabled(True)
-            QTimer.singleShot(1500, self.next_question_enable_submit)
+            QTimer.singleShot(self.feedback_delay_ms, self.next_question_enable_submit)
         else:
             self.timer_label.setText(f"⏰ Time left: {remaining:.1f}s")
             if remaining <= 5:
@@ -344,22 +645,62 @@ class QuizDialog(QDialog):
             QTimer.singleShot(100, self.update_timer)
 
     def next_question(self):
-        if self.current_card >= len(self.cards):
+        card = self.engine.current()
+        if card is None:
             self.show_results()
             return
         self.update_progress()
-        self.question_label.setText(f"❓ {self.cards[self.current_card]['question']}")
+        set_card_text(self.question_label, card["question"], "❓ ")
+        show_card_media(self.media_label, self.media, card)
+        # Highlight the next card, when it is already known, while this one is answered; adaptive
+        # draws only pick it later, and set_card_text then shows it plain until it is highlighted.
+        HIGHLIGHTER.prefetch(upcoming["question"] for upcoming in self.engine.upcoming(2)[1:])
+        if self.distractors:
+            self.current_choices = self.engine.choices(card)
+            for i, button in enumerate(self.choice_buttons):
+                button.setVisible(i < len(self.current_choices))
+                button.setEnabled(True)
+                if i < len(self.current_choices):
+                    button.setText(f"{i + 1}. {self.current_choices[i]}")
         self.answer_input.clear()
         self.answer_input.setFocus()
         self.feedback_label.clear()
+        self.related_label.clear()
         self.start_time = time.time()
 
+    def choose(self, index):
+        if index < len(self.current_choices) and self.choice_buttons[index].isEnabled():
+            self.answer_input.setText(self.current_choices[index])
+            self.check_answer()
+
+    def keyPressEvent(self, event):
+        if self.distractors and Qt.Key_1 <= event.key() < Qt.Key_1 + len(self.current_choices):
+            self.choose(event.key() - Qt.Key_1)
+            return
+        super().keyPressEvent(event)
+
+    def related_hint(self, card):
+        """Questions of the cards most similar to `card`, fetched a batch of upcoming cards at a time."""
+        related = self.indexes.get("related") if self.indexes else None
+        if related is None:
+            return []
+        if card["id"] not in self.related_cache:
+            upcoming = [c["id"] for c in self.engine.upcoming(QUERY_BATCH)]
+            self.related_cache.update(related.related(upcoming or [card["id"]], RELATED_HINT_COUNT))
+        return [self.indexes.by_id[card_id]["question"] for card_id, _ in self.related_cache.get(card["id"], [])
+                if card_id in self.indexes.by_id]
+
     def check_answer(self):
-        if self.current_card >= len(self.cards):
+        card = self.engine.current()
+        if card is None:
             return
-        user_answer = self.answer_input.text().strip().lower()
-        correct_answer = self.cards[self.current_card]["answer"].lower()
-        if user_answer == correct_answer:
+        latency = time.time() - self.start_time
+        correct = is_correct(self.answer_input.text(), card["answer"])
+        # The cue goes first so it starts before any layout or related-card lookup.
+        play_sound("correct" if correct else "wrong")
+        hint = self.related_hint(card)
+        self.engine.record(correct, latency)
+        if correct:
             self.feedback_label.setText("✅ Correct!")
             self.feedback_label.setStyleSheet("""
                 QLabel {
@@ -371,9 +712,8 @@ class QuizDialog(QDialog):
                     border-radius: 6px;
                 }
             """)
-            self.correct += 1
         else:
-            self.feedback_label.setText(f"❌ Wrong! Answer: {self.cards[self.current_card]['answer']}")
+            self.feedback_label.setText(f"❌ Wrong! Answer: {card['answer']}")
             self.feedback_label.setStyleSheet("""
                 QLabel {
                     color: white;
@@ -384,16 +724,19 @@ class QuizDialog(QDialog):
                     border-radius: 6px;
                 }
             """)
-        self.current_card += 1
+        if hint:
+            self.related_label.setText("🔗 Related: " + " · ".join(hint))
         self.submit_button.setDisabled(True)
-        QTimer.singleShot(1500, self.next_question_enable_submit)
+        for button in self.choice_buttons:
+            button.setDisabled(True)
+        QTimer.singleShot(self.feedback_delay_ms, self.next_question_enable_submit)
 
     def next_question_enable_submit(self):
         self.submit_button.setEnabled(True)
         self.next_question()
 
     def show_results(self):
-        total = len(self.cards)
+        total = self.total_questions
         percentage = (self.correct / total) * 100 if total > 0 else 0
         if percentage >= 80:
             emoji, message = "🏆", "Excellent!"
@@ -405,6 +748,218 @@ class QuizDialog(QDialog):
                               f"{message}\nScore: {self.correct}/{total} ({percentage:.1f}%)")
         self.accept()
 
+class RapidReviewDialog(QDialog):
+    """Flip-card review with keyboard self-grading and no transition delay.
+
+    Space flips the card, 1-4 grade it (Again counts as wrong). The next card
+    is laid out on a hidden page of a stacked widget while the current one is
+    shown, so moving on is just a page swap.
+    """
+    FACE_STYLE = """
+        QFrame {
+            background: white;
+            border: 2px solid #d1d9e6;
+            border-radius: 8px;
+        }
+        QLabel {
+            border: none;
+            padding: 12px;
+        }
+    """
+
+    def __init__(self, parent, cards, feedback_delay_ms=RAPID_FEEDBACK_DELAY_MS, card_stats=None,
+                 checkpoint=None, start_index=0, start_correct=0, rollups=None):
+        super().__init__(parent)
+        self.setWindowTitle("⚡ Rapid Review")
+        self.resize(700, 500)
+        self.engine = QuizEngine(cards, card_stats=card_stats, checkpoint=checkpoint,
+                                 start_index=start_index, start_correct=start_correct, rollups=rollups)
+        self.cards = cards
+        self.feedback_delay_ms = feedback_delay_ms
+        self.reviewed = start_index
+        self.flipped = False
+        self.waiting = False
+        self.latencies = []
+        self.session_start = None
+        self.shown_at = 0.0
+
+        layout = QVBoxLayout()
+        layout.setSpacing(12)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        self.progress_label = QLabel("")
+        self.progress_label.setAlignment(Qt.AlignCenter)
+        self.progress_label.setStyleSheet("""
+            QLabel {
+                color: white;
+                background: #7c3aed;
+                padding: 12px;
+                border-radius: 6px;
+                font-size: 14px;
+                font-weight: bold;
+            }
+        """)
+        layout.addWidget(self.progress_label)
+
+        self.card_stack = QStackedWidget()
+        self.faces = [self._make_face(), self._make_face()]
+        for face in self.faces:
+            self.card_stack.addWidget(face)
+        layout.addWidget(self.card_stack, 1)
+
+        self.hint_label = QLabel("Space: flip | 1 Again · 2 Hard · 3 Good · 4 Easy | Esc: finish")
+        self.hint_label.setAlignment(Qt.AlignCenter)
+        self.hint_label.setStyleSheet("color: #64748b; font-size: 13px;")
+        layout.addWidget(self.hint_label)
+
+        grade_layout = QHBoxLayout()
+        self.flip_button = AnimatedButton("🔄 Flip", "blue")
+        self.flip_button.clicked.connect(self.flip)
+        self.flip_button.setFocusPolicy(Qt.NoFocus)
+        grade_layout.addWidget(self.flip_button)
+        self.grade_buttons = []
+        for key, color in zip(RAPID_GRADES, ("red", "orange", "green", "teal")):
+            name, _ = RAPID_GRADES[key]
+            button = AnimatedButton(f"{key - Qt.Key_0} {name}", color)
+            button.clicked.connect(lambda _checked, k=key: self.grade(k))
+            button.setEnabled(False)
+            button.setFocusPolicy(Qt.NoFocus)
+            grade_layout.addWidget(button)
+            self.grade_buttons.append(button)
+        layout.addLayout(grade_layout)
+
+        self.throughput_label = QLabel("")
+        self.throughput_label.setAlignment(Qt.AlignCenter)
+        self.throughput_label.setStyleSheet("""
+            QLabel {
+                color: #1e293b;
+                background: #f8fafc;
+                padding: 10px;
+                border: 2px solid #d1d9e6;
+                border-radius: 6px;
+                font-size: 14px;
+                font-weight: bold;
+            }
+        """)
+        layout.addWidget(self.throughput_label)
+
+        self.setLayout(layout)
+        self._fill_face(self.faces[self.current_card % 2], self.current_card)
+        self._fill_face(self.faces[(self.current_card + 1) % 2], self.current_card + 1)
+        self.show_current()
+
+    def _make_face(self):
+        face = QFrame()
+        face.setStyleSheet(self.FACE_STYLE)
+        face_layout = QVBoxLayout(face)
+        face.question_label = QLabel("")
+        face.question_label.setFont(QFont("Inter", 16, QFont.Bold))
+        face.question_label.setWordWrap(True)
+        face.question_label.setAlignment(Qt.AlignCenter)
+        face.question_label.setStyleSheet("color: #1e293b;")
+        face_layout.addWidget(face.question_label, 1)
+        face.answer_label = QLabel("")
+        face.answer_label.setFont(QFont("Inter", 15))
+        face.answer_label.setWordWrap(True)
+        face.answer_label.setAlignment(Qt.AlignCenter)
+        face.answer_label.setStyleSheet("color: #16a34a;")
+        face_layout.addWidget(face.answer_label, 1)
+        return face
+
+    def _fill_face(self, face, index):
+        """Lay out card `index` on a (hidden) face ahead of time."""
+        if index >= len(self.cards):
+            return
+        card = self.cards[index]
+        set_card_text(face.question_label, card["question"], "❓ ")
+        set_card_text(face.answer_label, card["answer"], "✅ ")
+        if index + 1 < len(self.cards):
+            HIGHLIGHTER.prefetch((self.cards[index + 1]["question"], self.cards[index + 1]["answer"]))
+        face.answer_label.setVisible(False)
+        face.layout().activate()
+
+    def show_current(self):
+        if self.current_card >= len(self.cards):
+            self.finish()
+            return
+        self.card_stack.setCurrentWidget(self.faces[self.current_card % 2])
+        self.flipped = False
+        self.waiting = False
+        self.flip_button.setEnabled(True)
+        for button in self.grade_buttons:
+            button.setEnabled(False)
+        self.update_progress()
+        self.shown_at = time.perf_counter()
+        if self.session_start is None:
+            self.session_start = self.shown_at
+
+    @property
+    def current_card(self):
+        return self.engine.index
+
+    @property
+    def correct(self):
+        return self.engine.correct
+
+    def flip(self):
+        if self.flipped or self.waiting or self.current_card >= len(self.cards):
+            return
+        self.flipped = True
+        self.faces[self.current_card % 2].answer_label.setVisible(True)
+        self.flip_button.setEnabled(False)
+        for button in self.grade_buttons:
+            button.setEnabled(True)
+
+    def grade(self, key):
+        if not self.flipped or self.waiting:
+            return
+        _, correct = RAPID_GRADES[key]
+        self.latencies.append(time.perf_counter() - self.shown_at)
+        finished_face = self.faces[self.current_card % 2]
+        play_sound("correct" if correct else "wrong")
+        self.engine.record(correct, self.latencies[-1])
+        self.reviewed += 1
+        self.update_throughput()
+        if self.feedback_delay_ms > 0:
+            self.waiting = True
+            finished_face.setStyleSheet(self.FACE_STYLE + (
+                "QFrame { border-color: #16a34a; }" if correct else "QFrame { border-color: #dc2626; }"))
+            QTimer.singleShot(self.feedback_delay_ms, lambda: self.advance(finished_face))
+        else:
+            self.advance(finished_face)
+
+    def advance(self, finished_face):
+        self.show_current()
+        # The face just graded becomes the buffer for the card after next.
+        if self.feedback_delay_ms > 0:
+            finished_face.setStyleSheet(self.FACE_STYLE)
+        self._fill_face(finished_face, self.current_card + 1)
+
+    def update_progress(self):
+        self.progress_label.setText(
+            f"⚡ Card {self.current_card + 1}/{len(self.cards)} | Score: {self.correct}/{self.reviewed}")
+
+    def update_throughput(self):
+        elapsed = time.perf_counter() - self.session_start
+        per_minute = self.reviewed / elapsed * 60 if elapsed > 0 else 0.0
+        average_ms = sum(self.latencies) / len(self.latencies) * 1000
+        self.throughput_label.setText(
+            f"🚀 {per_minute:.1f} reviews/min | ⏱️ avg {average_ms:.0f} ms | last {self.latencies[-1] * 1000:.0f} ms")
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key_Space, Qt.Key_Return, Qt.Key_Enter):
+            self.flip()
+        elif event.key() in RAPID_GRADES:
+            self.grade(event.key())
+        else:
+            super().keyPressEvent(event)
+
+    def finish(self):
+        percentage = (self.correct / self.reviewed) * 100 if self.reviewed else 0
+        QMessageBox.information(self, "⚡ Review Complete!",
+                              f"Reviewed {self.reviewed} cards\nScore: {self.correct}/{self.reviewed} ({percentage:.1f}%)")
+        self.accept()
+
 class LandingPage(FadeInWidget):
     """Modern landing page with animations."""
     def __init__(self, parent=None):
@@ -440,14 +995,38 @@ class LandingPage(FadeInWidget):
         """)
         layout.addWidget(intro_label)
         
+        # Decks come from the catalogue; no deck file is opened to list them.
+        self.deck_list = QListWidget()
+        self.deck_list.setMaximumHeight(140)
+        self.deck_list.setStyleSheet("""
+            QListWidget {
+                background: white;
+                border: 2px solid #d1d9e6;
+                border-radius: 8px;
+                font-size: 14px;
+                padding: 4px;
+            }
+            QListWidget::item:selected {
+                background: #2563eb;
+                color: white;
+            }
+        """)
+        self.deck_list.itemDoubleClicked.connect(lambda _: self.start_learning())
+        layout.addWidget(self.deck_list)
+        self.refresh_decks()
+        
         button_container = QWidget()
         button_layout = QVBoxLayout(button_container)
         button_layout.setSpacing(12)
         
         start_button = AnimatedButton("🎯 Start Learning", "blue")
-        start_button.clicked.connect(self.parent.show_main)
+        start_button.clicked.connect(self.start_learning)
         button_layout.addWidget(start_button)
         
+        new_deck_button = AnimatedButton("➕ New Deck", "green")
+        new_deck_button.clicked.connect(self.new_deck)
+        button_layout.addWidget(new_deck_button)
+        
         instructions_button = AnimatedButton("📖 Instructions", "teal")
         instructions_button.clicked.connect(self.show_instructions)
         button_layout.addWidget(instructions_button)
@@ -466,6 +1045,41 @@ class LandingPage(FadeInWidget):
         self.setLayout(layout)
         QTimer.singleShot(100, self.fade_in)
 
+    def refresh_decks(self):
+        """List the decks in the catalogue with their card counts and scores."""
+        catalogue = load_catalogue()
+        active = self.parent.deck.slug if hasattr(self.parent, "deck") else catalogue["active"]
+        self.deck_list.clear()
+        for slug, entry in catalogue["decks"].items():
+            cards = "?" if entry.get("cards") is None else entry["cards"]
+            stats = entry.get("stats") or {}
+            score = f" | {stats['correct'] / stats['total'] * 100:.0f}%" if stats.get("total") else ""
+            item = QListWidgetItem(f"📁 {entry['name']} | {cards} cards{score}")
+            item.setData(Qt.UserRole, slug)
+            self.deck_list.addItem(item)
+            if slug == active:
+                self.deck_list.setCurrentItem(item)
+
+    def start_learning(self):
+        item = self.deck_list.currentItem()
+        if item is not None and not self.parent.switch_deck(item.data(Qt.UserRole)):
+            return
+        self.parent.show_main()
+
+    def new_deck(self):
+        name, ok = QInputDialog.getText(self, "New Deck", "Deck name:")
+        if not ok or not name.strip():
+            return
+        try:
+            slug = create_deck(name, self.parent.data.get("settings"))
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Failed to create deck: {e}")
+            return
+        self.refresh_decks()
+        for i in range(self.deck_list.count()):
+            if self.deck_list.item(i).data(Qt.UserRole) == slug:
+                self.deck_list.setCurrentRow(i)
+
     def show_instructions(self):
         dialog = InstructionsDialog(self)
         dialog.exec_()
@@ -473,8 +1087,12 @@ class LandingPage(FadeInWidget):
     def show_admin_login(self):
         login_dialog = AdminLoginDialog(self)
         if login_dialog.exec_():
-            admin_panel = AdminPanel(self.parent, self.parent.data)
-            admin_panel.exec_()
+            admin_panel = AdminPanel(self.parent, self.parent.deck)
+            self.parent.admin_panel = admin_panel
+            try:
+                admin_panel.exec_()
+            finally:
+                self.parent.admin_panel = None
 
 class MainContent(FadeInWidget):
     """Modern main content with large buttons and animations."""
@@ -534,6 +1152,26 @@ class MainContent(FadeInWidget):
         
         buttons_layout.addWidget(quiz_frame)
         
+        study_frame = QFrame()
+        study_layout = QHBoxLayout(study_frame)
+        study_layout.setSpacing(12)
+        
+        self.rapid_button = AnimatedButton("⚡ Rapid Review", "purple")
+        self.rapid_button.clicked.connect(self.start_rapid_review)
+        study_layout.addWidget(self.rapid_button)
+        
+        self.adaptive_button = AnimatedButton("🧠 Adaptive Quiz", "teal")
+        self.adaptive_button.setToolTip("Focus on the cards you miss, answer slowly or haven't seen in a while")
+        self.adaptive_button.clicked.connect(self.start_adaptive_quiz)
+        study_layout.addWidget(self.adaptive_button)
+        
+        self.choice_button = AnimatedButton("🔤 Multiple Choice", "blue")
+        self.choice_button.setToolTip("Pick the answer from four options")
+        self.choice_button.clicked.connect(self.start_choice_quiz)
+        study_layout.addWidget(self.choice_button)
+        
+        buttons_layout.addWidget(study_frame)
+        
         self.view_button = AnimatedButton("📋 View Flashcards", "teal")
         self.view_button.clicked.connect(self.show_flashcards)
         buttons_layout.addWidget(self.view_button)
@@ -546,6 +1184,11 @@ class MainContent(FadeInWidget):
         self.instructions_button.clicked.connect(self.show_instructions)
         utility_layout.addWidget(self.instructions_button)
         
+        self.progress_button = AnimatedButton("📈 Progress", "orange")
+        self.progress_button.setToolTip("Accuracy and answers per day, week and year")
+        self.progress_button.clicked.connect(self.show_progress)
+        utility_layout.addWidget(self.progress_button)
+        
         self.settings_button = AnimatedButton("⚙️ Settings", "green")
         self.settings_button.clicked.connect(self.show_settings)
         utility_layout.addWidget(self.settings_button)
@@ -577,6 +1220,7 @@ class MainContent(FadeInWidget):
         self.table.setColumnCount(3)
         self.table.setHorizontalHeaderLabels(["#", "Question", "Answer"])
         self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setItemDelegate(CodeDelegate(self.table))
         self.table.setStyleSheet("""
             QTableWidget {
                 background: white;
@@ -613,13 +1257,22 @@ class MainContent(FadeInWidget):
         self.update_stats()
         QTimer.singleShot(100, self.fade_in)
 
+    def refresh_deck(self):
+        """Show the deck that was just switched to."""
+        self.hide_flashcards()
+        self.update_stats()
+
     def update_stats(self):
         stats = self.data["stats"]
         total_cards = len(self.data["flashcards"])
         if stats["total"] > 0:
             percent = (stats["correct"] / stats["total"]) * 100
+            today = ""
+            if hasattr(self.parent, "deck"):
+                answers, correct = self.parent.deck.rollups.totals("daily")
+                today = f" | 📅 Today: {correct}/{answers}" if answers else " | 📅 Today: nothing yet"
             self.stats_label.setText(
-                f"📊 Score: {stats['correct']}/{stats['total']} ({percent:.1f}%) | "
+                f"📊 Score: {stats['correct']}/{stats['total']} ({percent:.1f}%){today} | "
                 f"📚 Cards: {total_cards}"
             )
         else:
@@ -632,11 +1285,38 @@ class MainContent(FadeInWidget):
             return
         self.table.setRowCount(len(self.data["flashcards"]))
         for i, card in enumerate(self.data["flashcards"]):
-            self.table.setItem(i, 0, QTableWidgetItem(str(i + 1)))
-            self.table.setItem(i, 1, QTableWidgetItem(card["question"]))
-            self.table.setItem(i, 2, QTableWidgetItem(card["answer"]))
+            self.set_table_row(i, card)
         self.table_frame.setVisible(True)
 
+    def set_table_row(self, row, card):
+        number_item = QTableWidgetItem(str(row + 1))
+        number_item.setData(Qt.UserRole, card["id"])
+        self.table.setItem(row, 0, number_item)
+        self.table.setItem(row, 1, QTableWidgetItem(card["question"]))
+        self.table.setItem(row, 2, QTableWidgetItem(card["answer"]))
+
+    def apply_card_diff(self, diff):
+        """Update the stats and only the changed table rows after a merge."""
+        self.update_stats()
+        if self.table_frame.isHidden():
+            return
+        rows = {self.table.item(row, 0).data(Qt.UserRole): row for row in range(self.table.rowCount())}
+        for card in diff["updated"]:
+            row = rows.get(card["id"])
+            if row is not None:
+                self.table.item(row, 1).setText(card["question"])
+                self.table.item(row, 2).setText(card["answer"])
+        removed_rows = sorted((rows[card_id] for card_id in diff["removed"] if card_id in rows), reverse=True)
+        for row in removed_rows:
+            self.table.removeRow(row)
+        for card in diff["added"]:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+            self.set_table_row(row, card)
+        if removed_rows:
+            for row in range(removed_rows[-1], self.table.rowCount()):
+                self.table.item(row, 0).setText(str(row + 1))
+
     def hide_flashcards(self):
         self.table_frame.setVisible(False)
 
@@ -645,7 +1325,9 @@ class MainContent(FadeInWidget):
             QMessageBox.warning(self, "No Flashcards",
                               "No flashcards available!\nPlease add flashcards in the Admin Panel.")
             return
-        cards = self.data["flashcards"].copy()
+        cards = self.select_tagged_cards()
+        if cards is None:
+            return
         random.shuffle(cards)
         time_limit = self.data["settings"]["default_time_limit"] if timed else 10
         if timed:
@@ -656,13 +1338,164 @@ class MainContent(FadeInWidget):
             )
             if not ok:
                 return
-        dialog = QuizDialog(self, cards, timed, time_limit)
+        self.run_session("timed" if timed else "quiz", cards, {"time_limit": time_limit})
+
+    def select_tagged_cards(self):
+        """Ask for an optional tag filter when the deck has tags; None if cancelled."""
+        tag_index = self.parent.indexes.get("tags") if getattr(self.parent, "indexes", None) else None
+        if tag_index is None or not tag_index.bitmaps:
+            return self.data["flashcards"].copy()
+        tags = ", ".join(tag_index.tag_counts())
+        while True:
+            expression, ok = QInputDialog.getText(
+                self, "Quiz Filter",
+                f"Tags: {tags}\nFilter by tags (e.g. python AND recursion NOT beginner), or leave empty for all cards:")
+            if not ok:
+                return None
+            try:
+                card_ids = tag_index.select(expression)
+            except ValueError as e:
+                QMessageBox.warning(self, "Invalid Filter", f"Invalid tag filter: {e}")
+                continue
+            if card_ids:
+                return [self.parent.indexes.by_id[card_id] for card_id in card_ids]
+            QMessageBox.warning(self, "No Flashcards", "No flashcards match that tag filter.")
+
+    def start_adaptive_quiz(self):
+        if not self.data["flashcards"]:
+            QMessageBox.warning(self, "No Flashcards",
+                              "No flashcards available!\nPlease add flashcards in the Admin Panel.")
+            return
+        length, ok = QInputDialog.getInt(self, "Adaptive Quiz Setup", "Number of questions:",
+                                         ADAPTIVE_QUIZ_LENGTH, 1, 1000, 1)
+        if not ok:
+            return
+        self.run_session("adaptive", [], {"length": length})
+
+    def start_choice_quiz(self):
+        if not self.data["flashcards"]:
+            QMessageBox.warning(self, "No Flashcards",
+                              "No flashcards available!\nPlease add flashcards in the Admin Panel.")
+            return
+        cards = self.data["flashcards"].copy()
+        random.shuffle(cards)
+        self.run_session("choice", cards, {})
+
+    def start_rapid_review(self):
+        if not self.data["flashcards"]:
+            QMessageBox.warning(self, "No Flashcards",
+                              "No flashcards available!\nPlease add flashcards in the Admin Panel.")
+            return
+        cards = self.data["flashcards"].copy()
+        random.shuffle(cards)
+        self.run_session("rapid", cards, {})
+
+    def run_session(self, mode, cards, options, answers=()):
+        """Run a quiz session, checkpointing every answer so it survives a crash.
+
+        `answers` holds the results already given when resuming a session;
+        `cards` then starts with the cards they belong to.
+        """
+        settings = self.data["settings"]
+        card_stats = self.data.setdefault("card_stats", {})
+        indexes = getattr(self.parent, "indexes", None)
+        options = dict(options, deck=self.parent.deck.slug if hasattr(self.parent, "deck") else None)
+        media = self.parent.deck.media if hasattr(self.parent, "deck") else None
+        rollups = self.parent.deck.rollups if hasattr(self.parent, "deck") else None
+        distractors = None
+        if mode == "choice":
+            distractors = indexes.get("distractors") if indexes else None
+            distractors = distractors or DistractorIndex(self.data["flashcards"])
+        start_index, start_correct = len(answers), sum(answers)
+        try:
+            checkpoint = QuizCheckpoint.start(mode, [card["id"] if card else "" for card in cards], options, answers)
+        except OSError as e:
+            print(f"Checkpoint error: {e}")
+            checkpoint = None
+        if mode == "rapid":
+            dialog = RapidReviewDialog(self, cards, settings.get("rapid_feedback_delay_ms", RAPID_FEEDBACK_DELAY_MS),
+                                       card_stats, checkpoint, start_index, start_correct, rollups)
+        elif mode == "adaptive":
+            sampler = AdaptiveSampler(list(self.data["flashcards"]), card_stats)
+            dialog = QuizDialog(self, cards, feedback_delay_ms=settings.get("feedback_delay_ms", FEEDBACK_DELAY_MS),
+                                sampler=sampler, length=options["length"], checkpoint=checkpoint,
+                                start_index=start_index, start_correct=start_correct, indexes=indexes, media=media,
+                                rollups=rollups)
+        else:
+            dialog = QuizDialog(self, cards, mode == "timed", options.get("time_limit", 10),
+                                settings.get("feedback_delay_ms", FEEDBACK_DELAY_MS), card_stats=card_stats,
+                                checkpoint=checkpoint, start_index=start_index, start_correct=start_correct,
+                                indexes=indexes, distractors=distractors, media=media, rollups=rollups)
         dialog.exec_()
-        self.data["stats"]["correct"] += dialog.correct
-        self.data["stats"]["total"] += len(cards)
+        if mode == "rapid":
+            answered = dialog.reviewed
+        elif mode == "adaptive":
+            answered = dialog.current_card
+        else:
+            answered = len(cards)
+        if answered:
+            self.record_quiz_results(dialog.correct, answered)
+        if checkpoint:
+            checkpoint.finish()
+
+    def offer_resume(self):
+        """Offer to resume a quiz session that was interrupted by a crash."""
+        saved = QuizCheckpoint.load()
+        if saved is None:
+            return
+        answers = saved["answers"]
+        if not answers:
+            QuizCheckpoint.discard()
+            return
+        reply = QMessageBox.question(self, "Resume Quiz",
+                                   f"An unfinished quiz was found ({len(answers)} questions answered).\n"
+                                   "Do you want to resume it?",
+                                   QMessageBox.Yes | QMessageBox.No)
+        deck = saved["options"].get("deck")
+        other_deck = deck and hasattr(self.parent, "deck") and deck != self.parent.deck.slug
+        if reply != QMessageBox.Yes:
+            if other_deck:
+                self.record_other_deck_results(deck, sum(answers), len(answers))
+            else:
+                self.record_quiz_results(sum(answers), len(answers))
+            QuizCheckpoint.discard()
+            return
+        if other_deck and not self.parent.switch_deck(deck):
+            return
+        by_id = {card["id"]: card for card in self.data["flashcards"]}
+        answered = [by_id.get(card_id) for card_id in saved["cards"][:len(answers)]]
+        remaining = [by_id[card_id] for card_id in saved["cards"][len(answers):] if card_id in by_id]
+        self.parent.show_main()
+        self.run_session(saved["mode"], answered + remaining, saved["options"], answers)
+
+    def record_quiz_results(self, correct, total):
+        """Add a finished session's results to the lifetime stats and save."""
+        self.data["stats"]["correct"] += correct
+        self.data["stats"]["total"] += total
         self.parent.save_data()
         self.update_stats()
 
+    def record_other_deck_results(self, slug, correct, total):
+        """Add an unfinished session's results to the deck it was taken on, without switching to it."""
+        catalogue = load_catalogue()
+        if slug not in catalogue["decks"]:
+            print(f"Dropping unfinished quiz results for deleted deck {slug}")
+            return
+        try:
+            deck = Deck.open(deck_file(catalogue, slug), slug, indexes=None)
+            deck.data["stats"]["correct"] += correct
+            deck.data["stats"]["total"] += total
+            deck.save()
+            record_deck(slug, deck.data)
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Could not save the quiz results to deck {slug}: {e}")
+
+    def show_progress(self):
+        if not hasattr(self.parent, "deck"):
+            return
+        dialog = StatsDialog(self, self.parent.deck.rollups, self.data["flashcards"])
+        dialog.exec_()
+
     def show_instructions(self):
         dialog = InstructionsDialog(self)
         dialog.exec_()
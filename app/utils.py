@@ -1,9 +1,31 @@
 from PyQt5.QtWidgets import (
     QPushButton, QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
-    QMessageBox
+    QMessageBox, QApplication, QStyle, QStyledItemDelegate, QStyleOptionViewItem, QFileDialog
 )
-from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QRect, pyqtProperty
-from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt, QEvent, QObject, QRect, QSize, pyqtSignal
+from PyQt5.QtGui import QFont, QTextDocument, QImageReader, QPixmap
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from tags import normalize_tags
+from highlight import HIGHLIGHTER, has_code
+from media import IMAGE_FILTER
+import html
+import threading
+import time
+
+# Global animation switch, driven by the "animations_enabled" setting.
+ANIMATIONS_ENABLED = True
+DOCUMENT_CACHE_SIZE = 256  # laid-out cells kept by each CodeDelegate
+THUMBNAIL_SIZE = 40
+THUMBNAIL_CACHE_BYTES = 8 << 20
+CARD_IMAGE_SIZE = QSize(520, 260)
+
+def set_animations_enabled(enabled):
+    global ANIMATIONS_ENABLED
+    ANIMATIONS_ENABLED = bool(enabled)
+
+def animations_enabled():
+    return ANIMATIONS_ENABLED
 
 class AnimatedButton(QPushButton):
     """Custom animated button with modern styling."""
@@ -18,8 +40,9 @@ class AnimatedButton(QPushButton):
             "teal": {"normal": "#14b8a6", "hover": "#0d9488", "pressed": "#0f766e"}
         }
         self.scheme = self.color_schemes.get(color_scheme, self.color_schemes["blue"])
+        # Hover feedback comes from the :hover background in the stylesheet,
+        # which only repaints the button; it never animates the geometry.
         self.setup_style()
-        self.setup_animation()
 
     def setup_style(self):
         self.setStyleSheet(f"""
@@ -46,35 +69,247 @@ class AnimatedButton(QPushButton):
             }}
         """)
 
-    def setup_animation(self):
-        self.animation = QPropertyAnimation(self, b"geometry")
-        self.animation.setDuration(150)
-        self.animation.setEasingCurve(QEasingCurve.OutQuad)
-
-    def enterEvent(self, event):
-        self.animate_scale(1.03)
-        super().enterEvent(event)
-
-    def leaveEvent(self, event):
-        self.animate_scale(1.0)
-        super().leaveEvent(event)
-
-    def animate_scale(self, scale):
-        rect = self.geometry()
-        new_width = int(rect.width() * scale)
-        new_height = int(rect.height() * scale)
-        new_x = rect.x() - (new_width - rect.width()) // 2
-        new_y = rect.y() - (new_height - rect.height()) // 2
-        self.animation.setStartValue(rect)
-        self.animation.setEndValue(QRect(new_x, new_y, new_width, new_height))
-        self.animation.start()
+class CardTextUpdater(QObject):
+    """Swaps highlighted HTML into card labels once the highlighting worker has rendered it."""
+    rendered = pyqtSignal(object, str, str)  # label, text, prefix
+
+    def __init__(self):
+        super().__init__()
+        self.rendered.connect(self.swap)
+
+    def notify(self, label, text, prefix):
+        try:
+            self.rendered.emit(label, text, prefix)  # from the worker thread; delivered to the UI thread
+        except RuntimeError:
+            pass
+
+    @staticmethod
+    def swap(label, text, prefix):
+        try:
+            if label.property("card_text") == text:  # still showing that card
+                set_card_text(label, text, prefix)
+        except RuntimeError:  # the label was closed meanwhile
+            pass
+
+_CARD_TEXT_UPDATER = None
+
+def set_card_text(label, text, prefix=""):
+    """Show card text on a label, syntax-highlighted when it contains code.
+
+    Code not highlighted yet is shown as plain text at once and swapped for
+    the highlighted version when the worker has rendered it, so moving to a
+    card never waits for Pygments (as with CodeDelegate).
+    """
+    global _CARD_TEXT_UPDATER
+    label.setProperty("card_text", text)
+    rendered = HIGHLIGHTER.get(text) if has_code(text) else None
+    if rendered is None:
+        label.setTextFormat(Qt.PlainText)
+        label.setText(prefix + text)
+        if has_code(text):
+            if _CARD_TEXT_UPDATER is None:
+                _CARD_TEXT_UPDATER = CardTextUpdater()
+            updater = _CARD_TEXT_UPDATER
+            HIGHLIGHTER.prefetch([text], lambda _text: updater.notify(label, text, prefix))
+    else:
+        label.setTextFormat(Qt.RichText)
+        label.setText(html.escape(prefix) + rendered)
+
+class CodeDelegate(QStyledItemDelegate):
+    """Paints table cells that contain code as highlighted rich text.
+
+    A cell whose HTML is not cached yet is drawn as plain text while the
+    highlighting worker renders it, then the view repaints, so scrolling
+    never waits for Pygments.
+    """
+    rendered = pyqtSignal()
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.documents = OrderedDict()  # text -> QTextDocument
+        self.rendered.connect(view.viewport().update)
+
+    def document(self, text):
+        document = self.documents.get(text)
+        if document is not None:
+            self.documents.move_to_end(text)
+            return document
+        rendered = HIGHLIGHTER.get(text)
+        if rendered is None:
+            HIGHLIGHTER.prefetch([text], self._notify)
+            return None
+        document = QTextDocument()
+        document.setDocumentMargin(4)
+        document.setHtml(rendered)
+        self.documents[text] = document
+        if len(self.documents) > DOCUMENT_CACHE_SIZE:
+            self.documents.popitem(last=False)
+        return document
+
+    def _notify(self, _text):
+        try:
+            self.rendered.emit()  # from the worker thread; delivered to the view's thread
+        except RuntimeError:  # the table was closed meanwhile
+            pass
+
+    def paint(self, painter, option, index):
+        text = index.data(Qt.DisplayRole)
+        document = self.document(text) if isinstance(text, str) and has_code(text) else None
+        if document is None:
+            super().paint(painter, option, index)
+            return
+        options = QStyleOptionViewItem(option)
+        self.initStyleOption(options, index)
+        options.text = ""
+        style = options.widget.style() if options.widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, options, painter, options.widget)
+        painter.save()
+        painter.translate(option.rect.topLeft())
+        painter.setClipRect(0, 0, option.rect.width(), option.rect.height())
+        document.setTextWidth(option.rect.width())
+        document.drawContents(painter)
+        painter.restore()
+
+def read_image(path, bound):
+    """Decode an image scaled down to fit `bound` (a QSize); a null QImage if it cannot be read.
+
+    Scaling happens while decoding, so a large screenshot is never held at
+    full size. Safe to call off the GUI thread.
+    """
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and (size.width() > bound.width() or size.height() > bound.height()):
+        reader.setScaledSize(size.scaled(bound, Qt.KeepAspectRatio))
+    return reader.read()
+
+def show_card_media(label, store, card):
+    """Load a card's first image into a label as the card is shown; hide the label if it has none."""
+    digests = card.get("media") if store is not None else None
+    if not digests:
+        label.clear()
+        label.hide()
+        return
+    image = read_image(store.path(digests[0]), CARD_IMAGE_SIZE)
+    if image.isNull():
+        label.setText("🖼️ Image not found")
+    else:
+        label.setPixmap(QPixmap.fromImage(image))
+    label.setToolTip(f"{len(digests)} images attached" if len(digests) > 1 else "")
+    label.show()
+
+class ThumbnailCache(QObject):
+    """Card image thumbnails decoded on a worker thread.
+
+    `get` returns a cached QImage or None, queueing the decode; `ready` is
+    emitted with the hash once it is cached. The least recently used
+    thumbnails are dropped once they take more than `budget` bytes.
+    """
+    ready = pyqtSignal(str)
+
+    def __init__(self, store, size=THUMBNAIL_SIZE, budget=THUMBNAIL_CACHE_BYTES, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.bound = QSize(size, size)
+        self.budget = budget
+        self.images = OrderedDict()
+        self.bytes = 0
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def get(self, digest):
+        with self.lock:
+            image = self.images.get(digest)
+            if image is not None:
+                self.images.move_to_end(digest)
+                return image
+            if digest in self.pending:
+                return None
+            self.pending.add(digest)
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnails")
+        self.executor.submit(self._load, digest)
+        return None
+
+    def _load(self, digest):
+        image = read_image(self.store.path(digest), self.bound)
+        with self.lock:
+            self.pending.discard(digest)
+            self.images[digest] = image
+            self.bytes += image.sizeInBytes()
+            while self.bytes > self.budget and len(self.images) > 1:
+                _, dropped = self.images.popitem(last=False)
+                self.bytes -= dropped.sizeInBytes()
+        try:
+            self.ready.emit(digest)
+        except RuntimeError:  # the view was closed meanwhile
+            pass
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    """Draws the thumbnail of the image hash stored in a cell's UserRole, once the cache has it."""
+    def __init__(self, view, cache):
+        super().__init__(view)
+        self.cache = cache
+        cache.ready.connect(view.viewport().update)
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        digest = index.data(Qt.UserRole)
+        image = self.cache.get(digest) if digest else None
+        if image is None or image.isNull():
+            return
+        size = image.size().scaled(option.rect.size() - QSize(4, 4), Qt.KeepAspectRatio)
+        target = QRect(0, 0, size.width(), size.height())
+        target.moveCenter(option.rect.center())
+        painter.drawImage(target, image)
+
+    def sizeHint(self, option, index):
+        return self.cache.bound + QSize(8, 8)
+
+class PaintProfiler:
+    """Count repaints per widget class and time each frame.
+
+    A frame is one UpdateRequest on a top-level window, which covers painting
+    every dirty widget plus any graphics-effect compositing. Installed by
+    wrapping QApplication.notify (see main.setup_app) when the
+    CODECARD_PROFILE_PAINT environment variable is set.
+    """
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.frame_times = []
+
+    def notify(self, notify, receiver, event):
+        event_type = event.type()
+        if event_type == QEvent.Paint:
+            self.counts[type(receiver).__name__] += 1
+        elif event_type == QEvent.UpdateRequest:
+            start = time.perf_counter()
+            result = notify(receiver, event)
+            self.frame_times.append(time.perf_counter() - start)
+            return result
+        return notify(receiver, event)
+
+    def report(self):
+        frames = sorted(self.frame_times) or [0.0]
+        lines = [f"{sum(self.counts.values())} paint events in {len(self.frame_times)} frames, "
+                 f"{sum(frames) * 1000:.1f} ms total, p95 frame {frames[int(len(frames) * 0.95)] * 1000:.2f} ms"]
+        for name, count in sorted(self.counts.items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<24}{count:>7}")
+        return "\n".join(lines)
 
 class FlashcardDialog(QDialog):
     """Modern flashcard add/edit dialog."""
-    def __init__(self, parent=None, question="", answer="", edit_mode=False):
+    def __init__(self, parent=None, question="", answer="", edit_mode=False, tags=(), media=(), store=None):
         super().__init__(parent)
         self.setWindowTitle("✏️ Edit Flashcard" if edit_mode else "➕ Add Flashcard")
-        self.setFixedSize(500, 350)
+        self.setFixedSize(500, 480 if store is not None else 430)
+        self.media = list(media)
+        self.store = store
         layout = QVBoxLayout()
         layout.setSpacing(12)
         layout.setContentsMargins(20, 20, 20, 20)
@@ -127,6 +362,42 @@ class FlashcardDialog(QDialog):
         """)
         layout.addWidget(self.answer_input)
         
+        t_label = QLabel("🏷️ Tags:")
+        t_label.setStyleSheet("color: #1e293b; font-weight: bold; font-size: 14px;")
+        layout.addWidget(t_label)
+        
+        self.tags_input = QLineEdit(", ".join(tags))
+        self.tags_input.setPlaceholderText("Comma-separated, e.g. python, recursion")
+        self.tags_input.setStyleSheet("""
+            QLineEdit {
+                padding: 12px;
+                border: 2px solid #d1d9e6;
+                border-radius: 6px;
+                font-size: 14px;
+                background: white;
+            }
+            QLineEdit:focus {
+                border-color: #2563eb;
+                background: #f8fafc;
+            }
+        """)
+        layout.addWidget(self.tags_input)
+
+        # Images are copied into the deck's media store as they are attached; the card keeps their hashes.
+        if store is not None:
+            media_layout = QHBoxLayout()
+            self.media_label = QLabel()
+            self.media_label.setStyleSheet("color: #1e293b; font-weight: bold; font-size: 14px;")
+            attach_button = AnimatedButton("📎 Attach Images", "blue")
+            attach_button.clicked.connect(self.attach_images)
+            clear_button = AnimatedButton("🧹 Clear", "orange")
+            clear_button.clicked.connect(self.clear_images)
+            media_layout.addWidget(self.media_label, 1)
+            media_layout.addWidget(attach_button)
+            media_layout.addWidget(clear_button)
+            layout.addLayout(media_layout)
+            self.update_media_label()
+
         button_layout = QHBoxLayout()
         self.ok_button = AnimatedButton("💾 Save", "green")
         self.ok_button.clicked.connect(self.accept)
@@ -139,4 +410,29 @@ class FlashcardDialog(QDialog):
         self.setLayout(layout)
     
     def get_data(self):
-        return self.question_input.text().strip(), self.answer_input.text().strip()
\ No newline at end of file
+        return self.question_input.text().strip(), self.answer_input.text().strip()
+
+    def get_tags(self):
+        return normalize_tags(self.tags_input.text())
+
+    def get_media(self):
+        return list(self.media)
+
+    def update_media_label(self):
+        self.media_label.setText(f"🖼️ Images: {len(self.media)}" if self.media else "🖼️ No images")
+
+    def attach_images(self):
+        file_names, _ = QFileDialog.getOpenFileNames(self, "Attach Images", "", IMAGE_FILTER)
+        for file_name in file_names:
+            try:
+                digest = self.store.add_file(file_name)
+            except OSError as e:
+                QMessageBox.warning(self, "Error", f"Could not attach {file_name}: {e}")
+                continue
+            if digest not in self.media:
+                self.media.append(digest)
+        self.update_media_label()
+
+    def clear_images(self):
+        self.media = []
+        self.update_media_label()
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""Count repaints and paint time for a scripted hover/scroll session.
+
+Usage: QT_QPA_PLATFORM=offscreen python benchmarks/bench_rendering.py [app_dir] [card_count]
+
+Pass the app directory of another checkout to compare before/after.
+"""
+import os
+import sys
+import tempfile
+
+APP_DIR = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+CARD_COUNT = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+sys.path.insert(0, os.path.abspath(APP_DIR))
+os.chdir(tempfile.mkdtemp())
+
+from PyQt5.QtTest import QTest
+from PyQt5.QtWidgets import QPushButton
+
+from data import make_card
+from main import FlashcardApp, ProfilingApplication
+from utils import PaintProfiler
+
+def reset(app):
+    app.profiler = PaintProfiler()
+
+def report(app, label):
+    profiler = app.profiler
+    frames = sorted(profiler.frame_times) or [0.0]
+    p95 = frames[int(len(frames) * 0.95)]
+    print(f"{label:<16}{sum(profiler.counts.values()):>8}{len(profiler.frame_times):>8}"
+          f"{sum(frames) * 1000:>12.1f}{p95 * 1000:>10.2f}")
+
+def main():
+    # The app's own paint profiler, so the numbers match CODECARD_PROFILE_PAINT=1 runs.
+    app = ProfilingApplication(sys.argv)
+    app.aboutToQuit.disconnect()
+    window = FlashcardApp()
+    window.data["flashcards"][:] = [make_card(f"Question {i}", f"Answer {i}") for i in range(CARD_COUNT)]
+    window.show()
+    window.show_main()
+    QTest.qWait(1200)  # let the fade-ins finish
+
+    print(f"{'phase':<16}{'paints':>8}{'frames':>8}{'frame ms':>12}{'p95 ms':>10}")
+    buttons = [b for b in window.main_content.findChildren(QPushButton) if b.isVisible()]
+    reset(app)
+    for _ in range(5):
+        for button in buttons:
+            QTest.mouseMove(button)
+            QTest.qWait(60)
+            QTest.mouseMove(window.main_content, window.main_content.rect().bottomRight())
+            QTest.qWait(60)
+    QTest.qWait(200)
+    report(app, "hover buttons")
+
+    window.main_content.show_flashcards()
+    QTest.qWait(100)
+    table = window.main_content.table
+    reset(app)
+    bar = table.verticalScrollBar()
+    for step in range(0, bar.maximum(), max(bar.maximum() // 100, 1)):
+        bar.setValue(step)
+        QTest.qWait(5)
+    report(app, "scroll table")
+
+if __name__ == "__main__":
+    main()
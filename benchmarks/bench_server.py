@@ -0,0 +1,68 @@
+"""Measure classroom-server answer throughput on localhost.
+
+Usage: python benchmarks/bench_server.py [learners] [answers_per_learner] [card_count]
+
+Starts the server in-process on an ephemeral port against a throwaway deck,
+then has every learner open a session over its own keep-alive connection
+and submit answers as fast as it can.
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+os.chdir(tempfile.mkdtemp())
+
+from data import make_card, save_data, load_data
+from deck import Deck
+from server import ClassroomServer, SERVER_INDEXES
+
+LEARNERS = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+ANSWERS = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+CARD_COUNT = int(sys.argv[3]) if len(sys.argv) > 3 else 5000
+
+async def request(reader, writer, method, path, body=None):
+    payload = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(payload)}\r\n\r\n".encode()
+                 + payload)
+    headers = await reader.readuntil(b"\r\n\r\n")
+    length = int(next(line.split(b":")[1] for line in headers.split(b"\r\n")
+                      if line.lower().startswith(b"content-length")))
+    return json.loads(await reader.readexactly(length))
+
+async def learner(port, n, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    session = await request(reader, writer, "POST", "/api/sessions",
+                            {"user": f"learner{n}", "mode": "adaptive", "length": ANSWERS})
+    while not session["finished"]:
+        start = time.perf_counter()
+        result = await request(reader, writer, "POST", f"/api/sessions/{session['id']}/answer",
+                               {"answer": "42", "latency": 1.5})
+        latencies.append(time.perf_counter() - start)
+        session = result["session"]
+    writer.close()
+
+async def run():
+    data = load_data(default_cards=[])
+    data["flashcards"] = [make_card(f"What is {i} * 2?", str(i * 2)) for i in range(CARD_COUNT)]
+    save_data(data, overwrite=True)
+    server = ClassroomServer(Deck.open(indexes=SERVER_INDEXES), flush_interval=0.5)
+    listener = await server.start("127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(learner(port, n, latencies) for n in range(LEARNERS)))
+    elapsed = time.perf_counter() - start
+    await server.stop()
+    latencies.sort()
+    saved = Deck.open(indexes=None).data["stats"]["total"]
+    print(f"{len(latencies)} answers from {LEARNERS} learners in {elapsed:.2f}s: "
+          f"{len(latencies) / elapsed:.0f} answers/s")
+    print(f"request latency p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms; {saved} answers saved")
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,52 @@
+"""Compare on-disk size and save/load time of the deck file containers.
+
+Usage: python benchmarks/bench_storage.py [card_count]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from data import make_card, open_data_file, write_data_file, zstd
+
+CONTAINERS = [(None, None), ("gzip", 1), ("gzip", 6), ("gzip", 9)]
+if zstd is not None:
+    CONTAINERS += [("zstd", 3), ("zstd", 9)]
+
+def build_deck(count):
+    return {
+        "flashcards": [
+            make_card(f"What does snippet #{i} print?\n```python\nprint(sum(range({i % 97})))\n```",
+                      str(sum(range(i % 97))))
+            for i in range(count)
+        ],
+        "stats": {"correct": 0, "total": 0},
+        "settings": {"default_time_limit": 10, "auto_save": True, "sound_enabled": True},
+        "version": "2.1",
+        "revision": 1,
+    }
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    deck = build_deck(count)
+    print(f"{count} cards")
+    print(f"{'container':<12}{'size (MB)':>12}{'save (s)':>10}{'load (s)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for compression, level in CONTAINERS:
+            path = os.path.join(tmp, "deck.json")
+            start = time.perf_counter()
+            write_data_file(path, deck, compression, level)
+            save_time = time.perf_counter() - start
+            start = time.perf_counter()
+            with open_data_file(path) as f:
+                json.load(f)
+            load_time = time.perf_counter() - start
+            name = f"{compression}-{level}" if compression else "plain"
+            size = os.path.getsize(path) / 1e6
+            print(f"{name:<12}{size:>12.2f}{save_time:>10.2f}{load_time:>10.2f}")
+
+if __name__ == "__main__":
+    main()
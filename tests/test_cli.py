@@ -0,0 +1,9 @@
+import os
+
+import cli
+
+def test_missing_deck_path_is_an_error_and_creates_nothing(workdir, capsys):
+    assert cli.main(["--deck", "typo.json", "stats"]) == 2
+    assert "typo.json" in capsys.readouterr().err
+    assert not os.path.exists("typo.json")
+    assert not os.path.exists("typo.json.lock")
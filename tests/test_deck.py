@@ -0,0 +1,89 @@
+import pytest
+
+from data import load_data, make_card
+from deck import Deck
+
+@pytest.fixture
+def deck(workdir):
+    path = str(workdir / "deck.json")
+    cards = [make_card("What is 2 + 2?", "4", tags=["math"]),
+             make_card("Capital of France?", "Paris", tags=["geography"]),
+             make_card("def keyword?", "Defines a function", tags=["python"])]
+    return Deck(load_data(path, cards), path)
+
+def ids(cards):
+    return [card["id"] for card in cards]
+
+def test_add_card_is_indexed_and_searchable(deck):
+    card = deck.add_card("Largest planet?", "Jupiter", tags=["Space Science"])
+    assert deck.card(card["id"]) is card
+    assert card["tags"] == ["space-science"]
+    assert deck.search("jupiter") == [card["id"]]
+    assert deck.search(tag_mask=deck.tag_mask("space-science")) == [card["id"]]
+
+def test_update_card_replaces_text_and_tags(deck):
+    card = deck.cards[0]
+    deck.update_card(card, "What is 3 + 3?", "6")
+    assert (card["question"], card["answer"]) == ("What is 3 + 3?", "6")
+    assert "tags" not in card
+    assert deck.search(tag_mask=deck.tag_mask("math")) == []
+    assert deck.search("3 + 3") == [card["id"]]
+
+def test_remove_cards_drops_them_from_indexes(deck):
+    removed = deck.cards[1]["id"]
+    deck.remove_cards([removed])
+    assert removed not in ids(deck.cards)
+    assert deck.card(removed) is None
+    assert deck.search("paris") == []
+
+def test_import_cards_reports_invalid_and_renames_duplicate_ids(deck):
+    existing = deck.cards[0]["id"]
+    added, errors = deck.import_cards([{"id": existing, "question": "Q", "answer": "A"},
+                                       {"question": "", "answer": "A"}])
+    assert len(added) == 1 and added[0]["id"] != existing
+    assert [error["index"] for error in errors] == [1]
+    assert len(deck.cards) == 4
+
+def test_undo_and_redo_restore_order_and_fields(deck):
+    original = ids(deck.cards)
+    deck.remove_cards([original[0], original[2]])
+    deck.edit_cards([(deck.cards[0], {"question": "Changed?", "answer": "Yes"})])
+    deck.undo()
+    assert deck.cards[0]["question"] == "Capital of France?"
+    deck.undo()
+    assert ids(deck.cards) == original
+    deck.redo()
+    assert ids(deck.cards) == [original[1]]
+    assert deck.search("paris") == [original[1]]
+
+def test_merge_duplicates_folds_stats_into_first_card(deck):
+    first, second = deck.cards[0], deck.add_card("What is 2 + 2 ?", "4")
+    deck.data["card_stats"] = {first["id"]: {"attempts": 2, "errors": 1, "last_seen": 1.0},
+                               second["id"]: {"attempts": 3, "errors": 0, "last_seen": 2.0}}
+    assert deck.merge_duplicates([[(first, 1.0), (second, 0.9)]]) == 1
+    assert deck.card(second["id"]) is None
+    assert deck.data["card_stats"][first["id"]]["attempts"] == 5
+
+def test_save_and_reopen_round_trips_cards(deck):
+    card = deck.add_card("New?", "Saved", tags=["persisted"])
+    deck.save()
+    reopened = Deck.open(deck.path, indexes=None)
+    assert ids(reopened.cards) == ids(deck.cards)
+    assert reopened.cards[-1] == card
+
+@pytest.mark.parametrize("count", [3, 60])
+def test_bulk_edit_leaves_indexes_as_a_fresh_build(deck, count):
+    for i in range(60):
+        deck.add_card(f"Card {i}?", f"answer {i % 7}", tags=[f"t{i % 3}"])
+    progress = []
+    deck.progress = lambda done, total: progress.append((done, total))
+    edited = deck.cards[::len(deck.cards) // count][:count]
+    deck.edit_cards([(card, {"question": card["question"].upper(), "answer": card["answer"] + "!",
+                             "tags": ["bulk"]}) for card in edited])
+    fresh = Deck(deck.data, deck.path, indexes=("distractors", "tags"))
+    for name in ("question", "answer"):
+        assert deck.indexes[name].entries == fresh.indexes[name].entries
+    assert deck.indexes["distractors"].pools == fresh.indexes["distractors"].pools
+    assert deck.indexes["tags"].tag_counts() == fresh.indexes["tags"].tag_counts()
+    assert sorted(deck.search(tag_mask=deck.tag_mask("bulk"))) == sorted(ids(edited))
+    assert progress[-1] == (2 * count, 2 * count)
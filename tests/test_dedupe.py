@@ -0,0 +1,27 @@
+from dedupe import MinHasher, find_duplicate_clusters, normalize_text
+
+def card(card_id, question, answer):
+    return {"id": card_id, "question": question, "answer": answer}
+
+def test_near_duplicates_cluster_behind_the_first_card():
+    cards = [card("a", "What does the len() function return in Python?", "The number of items"),
+             card("b", "Capital of France?", "Paris"),
+             card("c", "What does the len function return in python", "The number of items."),
+             card("d", "What is a closure?", "A function with captured variables")]
+    clusters = find_duplicate_clusters(cards)
+    assert [[member["id"] for member, _ in cluster] for cluster in clusters] == [["a", "c"]]
+    assert clusters[0][0][1] == 1.0 and clusters[0][1][1] >= 0.6
+
+def test_single_card_and_distinct_cards_have_no_clusters():
+    assert find_duplicate_clusters([card("a", "Q?", "A")]) == []
+    assert find_duplicate_clusters([card("a", "Capital of Peru?", "Lima"), card("b", "2 + 2?", "4")]) == []
+
+def test_marker_characters_in_card_text_are_ignored():
+    cards = [card("a", "Split\x1fhere?", "x\x1ey"), card("b", "Split here?", "x y"), card("c", "Other", "z")]
+    signatures = MinHasher().signatures(cards)
+    assert signatures.shape == (3, 64)
+    assert (signatures[0] == signatures[1]).all()
+    assert [[member["id"] for member, _ in cluster] for cluster in find_duplicate_clusters(cards)] == [["a", "b"]]
+
+def test_normalize_text_ignores_case_accents_and_punctuation():
+    assert normalize_text("Café, NAÏVE!") == normalize_text("cafe naive ")
@@ -0,0 +1,42 @@
+import random
+
+from distractors import DistractorIndex, answer_class
+
+def card(card_id, answer):
+    return {"id": card_id, "answer": answer}
+
+def test_widened_pool_does_not_depend_on_bucket_order():
+    target, shorter, longer = card("t", "two words"), card("s", "one"), card("l", "four words in here")
+    assert [answer_class(c["answer"])[1] for c in (shorter, target, longer)] == [1, 2, 3]
+    index = DistractorIndex([target])
+    index.add(longer)
+    index.add(shorter)
+    fresh = DistractorIndex([shorter, longer, target])
+    assert index.pool("t") == fresh.pool("t") == ["s", "l"]
+    assert DistractorIndex([longer, target, shorter]).pools == fresh.pools
+
+def test_incremental_updates_match_a_rebuild():
+    rng = random.Random(3)
+    words = ["alpha", "beta gamma", "one two three four", "x = 1", "f(x) + g(y) * h(z) / 2", "42", "true"]
+
+    def answer():
+        return rng.choice(words) + ("" if rng.random() < 0.7 else f" {rng.randrange(30)}")
+
+    # Few answers per class, so many pools widen; starting from long answers only creates the buckets
+    # in a different order than a fresh build of the final deck does.
+    live = {f"{i:04x}": card(f"{i:04x}", "one two three four five") for i in range(3)}
+    index = DistractorIndex(list(live.values()))
+    for step in range(3, 120):
+        if rng.random() < 0.3:
+            card_id = rng.choice(sorted(live))
+            index.remove(card_id)
+            del live[card_id]
+        else:
+            live[f"{step:04x}"] = card(f"{step:04x}", answer())
+            index.add(live[f"{step:04x}"])
+    edited = rng.sample(sorted(live), 10)
+    for card_id in edited:
+        live[card_id]["answer"] = answer()
+    index.update_many([live[card_id] for card_id in edited], list(live.values()))
+    fresh = DistractorIndex(sorted(live.values(), key=lambda c: c["id"], reverse=True))
+    assert index.pools == fresh.pools and index.widened == fresh.widened
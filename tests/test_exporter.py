@@ -0,0 +1,46 @@
+import pytest
+
+import data
+from data import iter_stored_cards, load_data, open_data_file, read_cards, write_data_file
+from exporter import copy_stream, export_cards
+
+CARDS = [
+    {"id": "a1", "question": "Quote \"this\", then\nbreak", "answer": "naïve → café", "tags": ["python", "c++"]},
+    {"id": "b2", "question": "No tags?", "answer": "None"},
+    {"id": "c3", "question": "Brackets ] and { braces", "answer": "\\u escapes \\", "tags": ["sql"]},
+]
+
+@pytest.mark.parametrize("suffix", [".json", ".ndjson", ".jsonl", ".csv", ".json.gz", ".ndjson.gz", ".csv.gz"])
+def test_exported_cards_read_back_unchanged(suffix):
+    path = "cards" + suffix
+    reports = []
+    assert export_cards(iter(CARDS), path, progress=lambda done, total: reports.append(done), chunk_size=2) == 3
+    assert reports == [2, 3]
+    with open(path, "rb") as f:
+        assert (f.read(2) == b"\x1f\x8b") == suffix.endswith(".gz")
+    assert read_cards(path) == CARDS
+
+def test_read_cards_accepts_a_deck_file_and_rejects_other_json():
+    write_data_file("deck.json.gz", {"flashcards": CARDS}, "gzip")
+    assert read_cards("deck.json.gz") == CARDS
+    write_data_file("bad.json", {"cards": CARDS})
+    with pytest.raises(ValueError):
+        read_cards("bad.json")
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_stored_cards_stream_back_from_the_deck_and_its_copy(compression):
+    deck = load_data("deck.json", [dict(card) for card in CARDS])
+    write_data_file("deck.json", deck, compression)
+    # A tiny read size makes the stream reader refill mid-token.
+    assert list(iter_stored_cards("deck.json", read_size=7)) == CARDS
+    with open_data_file("deck.json", binary=True) as src:
+        copied = copy_stream(src, "copy.json.gz", compress=True)
+    assert copied > 0 and read_cards("copy.json.gz") == CARDS
+    assert list(iter_stored_cards("copy.json.gz", read_size=7)) == CARDS
+
+def test_export_data_streams_the_stored_deck(monkeypatch):
+    monkeypatch.setattr(data, "DATA_FILE", "flashcards.json")
+    load_data(default_cards=[dict(card) for card in CARDS])
+    for path in ("full.json.gz", "cards.ndjson", "cards.csv.gz"):
+        data.export_data(path)
+        assert read_cards(path) == CARDS
@@ -0,0 +1,40 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import highlight
+from highlight import HighlightCache, card_html, highlight_html
+
+def test_code_is_escaped_and_fenced_blocks_become_pre():
+    rendered = highlight_html("Use `a < b` here:\n```python\nprint('<hi>')\n```\ndone")
+    assert '<code style="' in rendered and "a &lt; b" in rendered
+    assert rendered.count("<pre") == 1 and "<hi>" not in rendered and rendered.endswith("done")
+    assert card_html("no code at all") is None
+
+def test_least_recently_used_entry_is_evicted():
+    cache = HighlightCache(size=2)
+    first, second, third = "`one`", "`two`", "`three`"
+    cache.render(first)
+    cache.render(second)
+    assert cache.get(first) is not None  # now the most recent
+    cache.render(third)
+    assert cache.get(second) is None
+    assert cache.get(first) is not None and cache.get(third) is not None
+    assert len(cache.entries) == 2
+
+def test_prefetch_calls_back_for_queued_and_cached_texts(monkeypatch):
+    rendered = []
+    monkeypatch.setattr(highlight, "highlight_html", lambda text: rendered.append(text) or f"<p>{text}</p>")
+    cache = HighlightCache()
+    cache.executor = ThreadPoolExecutor(max_workers=1)
+    release = threading.Event()
+    cache.executor.submit(release.wait)  # keep the worker busy so the text stays queued
+    calls = []
+    text = "`x = 1`"
+    cache.prefetch([text, "plain"], lambda done: calls.append(("first", done)))
+    cache.prefetch([text], lambda done: calls.append(("second", done)))
+    assert calls == [] and list(cache.pending) == [cache.key(text)]
+    release.set()
+    cache.executor.shutdown(wait=True)
+    assert calls == [("first", text), ("second", text)] and rendered == [text] and not cache.pending
+    cache.prefetch([text], lambda done: calls.append(("cached", done)))
+    assert calls[-1] == ("cached", text) and cache.get(text) == f"<p>{text}</p>"
@@ -0,0 +1,35 @@
+from history import Command, CommandLog
+
+class Sized(Command):
+    def __init__(self, label, size):
+        self.label = label
+        self.size = size
+
+    def undo(self, deck):
+        return self.label
+
+    def redo(self, deck):
+        return self.label
+
+def test_oldest_commands_are_dropped_past_the_budget():
+    log = CommandLog(budget=100)
+    for index in range(5):
+        assert log.record(Sized(f"c{index}", 30))
+    assert [command.label for command in log.undo_stack] == ["c2", "c3", "c4"]
+    assert log.size == 90
+    assert not log.record(Sized("huge", 101))
+    assert not log.can_undo() and log.size == 0
+
+def test_size_follows_undo_redo_and_a_new_record():
+    log = CommandLog(budget=100)
+    for index in range(3):
+        log.record(Sized(f"c{index}", 20))
+    assert log.undo(None) == ("c2", "c2") and log.undo(None) == ("c1", "c1")
+    assert log.size == 60 and log.redo_label() == "c1"
+    assert log.redo(None) == ("c1", "c1")
+    log.record(Sized("d", 50))
+    assert not log.can_redo()
+    assert log.size == sum(command.size for command in log.undo_stack) == 90
+    log.record(Sized("e", 30))
+    assert [command.label for command in log.undo_stack] == ["c1", "d", "e"]
+    assert log.size == 100
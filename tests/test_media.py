@@ -0,0 +1,66 @@
+import hashlib
+import os
+
+import cli
+from data import BACKUP_DIR, load_data, make_card
+from deck import Deck
+from media import MediaStore, media_dir, normalize_media
+
+def test_store_names_blobs_by_hash_and_keeps_one_copy(workdir):
+    store = MediaStore(str(workdir / "deck.media"))
+    digest = store.add_bytes(b"png bytes")
+    source = workdir / "same.png"
+    source.write_bytes(b"png bytes")
+    assert store.add_file(str(source)) == digest == hashlib.sha256(b"png bytes").hexdigest()
+    assert store.path(digest).endswith(os.path.join(digest[:2], digest))
+    assert list(store.digests()) == [digest]
+    assert not [name for name in os.listdir(os.path.dirname(store.path(digest))) if name.endswith(".tmp")]
+
+def test_normalize_media_keeps_valid_unique_hashes():
+    digest = "ab" * 32
+    assert normalize_media([digest.upper(), digest, "not-a-hash", 7]) == [digest]
+    assert normalize_media(digest) == [digest]
+    assert normalize_media(None) == []
+
+def test_prune_removes_only_unreferenced_blobs(workdir):
+    store = MediaStore(str(workdir / "deck.media"))
+    used, unused = store.add_bytes(b"used"), store.add_bytes(b"unused")
+    cards = [{"id": "1", "question": "Q", "answer": "A", "media": [used]}]
+    assert store.prune(cards, dry_run=True) == (1, len(b"unused"))
+    assert store.exists(unused)
+    assert store.prune(iter(cards)) == (1, len(b"unused"))
+    assert list(store.digests()) == [used]
+
+def test_cli_prune_keeps_images_listed_in_backups(workdir, capsys):
+    path = str(workdir / "deck.json")
+    store = MediaStore(media_dir(path))
+    live, backed_up, orphan = store.add_bytes(b"live"), store.add_bytes(b"old"), store.add_bytes(b"orphan")
+    deck = Deck(load_data(path, [make_card("Q1", "A1", media=[live]), make_card("Q2", "A2", media=[backed_up])]), path)
+    deck.save(overwrite=True)
+    deck.remove_cards([deck.cards[1]["id"]])
+    deck.save()  # backs up the file that still lists `backed_up`
+    assert os.listdir(BACKUP_DIR)
+    assert cli.main(["--deck", path, "media", "--prune"]) == 0
+    assert "Removed 1 unused images" in capsys.readouterr().out
+    assert sorted(store.digests()) == sorted([live, backed_up])
+    assert not store.exists(orphan)
+
+def test_thumbnail_cache_decodes_off_thread_and_keeps_to_budget(workdir):
+    from PyQt5.QtGui import QImage, QColor
+    from utils import ThumbnailCache
+    store = MediaStore(str(workdir / "deck.media"))
+    digests = []
+    for color in ("red", "blue"):
+        image = QImage(400, 200, QImage.Format_RGB32)
+        image.fill(QColor(color))
+        image.save(str(workdir / "image.png"))
+        digests.append(store.add_file(str(workdir / "image.png")))
+    cache = ThumbnailCache(store, size=40, budget=40 * 20 * 4)
+    assert cache.get(digests[0]) is None
+    cache.executor.shutdown(wait=True)
+    thumbnail = cache.get(digests[0])
+    assert (thumbnail.width(), thumbnail.height()) == (40, 20)
+    cache.executor = None
+    cache.get(digests[1])
+    cache.executor.shutdown(wait=True)
+    assert list(cache.images) == [digests[1]]
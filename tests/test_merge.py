@@ -0,0 +1,76 @@
+import json
+import os
+
+from data import card_digest, load_data, make_card, merge_flashcards, save_data, write_data_file
+
+PATH = "flashcards.json"
+
+def load(*questions):
+    """Load a new deck in this process, one card per question."""
+    return load_data(PATH, [make_card(question, question.lower()) for question in questions])
+
+def save_theirs(change):
+    """Apply `change` to the card list on disk, as another process saving would."""
+    with open(PATH, encoding="utf-8") as f:
+        theirs = json.load(f)
+    change(theirs["flashcards"])
+    theirs["revision"] += 1
+    write_data_file(PATH, theirs)
+    stat = os.stat(PATH)
+    os.utime(PATH, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+def card(cards, question):
+    return next(card for card in cards if card["question"] == question)
+
+def on_disk():
+    with open(PATH, encoding="utf-8") as f:
+        return {card["question"]: card["answer"] for card in json.load(f)["flashcards"]}
+
+def test_edits_to_different_cards_are_both_kept():
+    data = load("A", "B")
+    save_theirs(lambda cards: card(cards, "B").update(answer="theirs"))
+    card(data["flashcards"], "A")["answer"] = "ours"
+    diff = save_data(data, path=PATH)
+    assert diff["conflicts"] == [] and [c["question"] for c in diff["updated"]] == ["B"]
+    assert on_disk() == {"A": "ours", "B": "theirs"}
+
+def test_same_card_edited_on_both_sides_keeps_the_local_edit():
+    data = load("A", "B")
+    save_theirs(lambda cards: card(cards, "A").update(answer="theirs"))
+    edited = card(data["flashcards"], "A")
+    edited["answer"] = "ours"
+    assert save_data(data, path=PATH)["conflicts"] == [edited["id"]]
+    assert on_disk() == {"A": "ours", "B": "b"}
+
+def test_delete_against_edit_keeps_the_edited_card():
+    data = load("A", "B", "C")
+    def theirs(cards):
+        cards.remove(card(cards, "A"))
+        cards.remove(card(cards, "B"))
+        card(cards, "C").update(answer="theirs")
+    save_theirs(theirs)
+    untouched = card(data["flashcards"], "B")["id"]
+    card(data["flashcards"], "A")["answer"] = "ours"
+    removed = card(data["flashcards"], "C")
+    data["flashcards"].remove(removed)
+    diff = save_data(data, path=PATH)
+    assert sorted(diff["conflicts"]) == sorted([card(data["flashcards"], "A")["id"], removed["id"]])
+    assert diff["removed"] == [untouched]
+    # B was untouched here, so their delete wins; each edit survives the other side's delete.
+    assert on_disk() == {"A": "ours", "C": "theirs"}
+
+def test_cards_added_on_both_sides_are_all_kept():
+    data = load("A")
+    save_theirs(lambda cards: cards.append(make_card("Theirs", "t")))
+    data["flashcards"].append(make_card("Ours", "o"))
+    diff = save_data(data, path=PATH)
+    assert diff["conflicts"] == [] and [c["question"] for c in diff["added"]] == ["Theirs"]
+    assert on_disk() == {"A": "a", "Ours": "o", "Theirs": "t"}
+
+def test_base_is_kept_as_digests_of_card_contents():
+    base_card = make_card("Q", "A", tags=["x"])
+    edited = dict(base_card, tags=["x", "y"])
+    assert card_digest(base_card) == card_digest(dict(reversed(list(base_card.items()))))
+    assert card_digest(edited) != card_digest(base_card)
+    merged, conflicts = merge_flashcards({base_card["id"]: card_digest(base_card)}, [edited], [dict(base_card)])
+    assert merged == [edited] and conflicts == []
@@ -0,0 +1,44 @@
+from data import make_card
+from quiz import QuizEngine, is_correct
+from rollups import Rollups
+from sampling import AdaptiveSampler
+
+def make_cards(count=3):
+    return [make_card(f"Question {i}?", f"Answer {i}") for i in range(count)]
+
+def test_is_correct_ignores_case_and_surrounding_whitespace():
+    assert is_correct("  answer 1 ", "Answer 1")
+    assert not is_correct("Answer 2", "Answer 1")
+
+def test_typed_answers_are_scored_and_recorded():
+    cards, card_stats = make_cards(), {}
+    engine = QuizEngine(cards, card_stats=card_stats)
+    assert engine.answer("answer 0", latency=1.5) is True
+    assert engine.answer("wrong", latency=2.0) is False
+    assert engine.answer("ANSWER 2") is True
+    assert engine.finished and engine.current() is None
+    assert engine.correct == 2 and engine.index == 3
+    assert card_stats[cards[1]["id"]]["errors"] == 1
+    assert card_stats[cards[0]["id"]]["attempts"] == 1
+
+def test_resumed_session_keeps_earlier_score():
+    cards = make_cards()
+    engine = QuizEngine(cards, start_index=2, start_correct=1)
+    assert engine.current() is cards[2]
+    engine.record(True)
+    assert engine.finished and engine.correct == 2
+
+def test_sampler_draws_up_to_length():
+    cards, card_stats = make_cards(5), {}
+    engine = QuizEngine([], 4, AdaptiveSampler(cards, card_stats))
+    while not engine.finished:
+        engine.record(False, 1.0)
+    assert len(engine.cards) == engine.total == 4
+    assert sum(stats["attempts"] for stats in card_stats.values()) == 4
+
+def test_answers_feed_the_rollups():
+    cards, rollups = make_cards(), Rollups()
+    engine = QuizEngine(cards, card_stats={}, rollups=rollups)
+    engine.record(True, 1.0, now=1_700_000_000)
+    engine.record(False, 3.0, now=1_700_000_000)
+    assert rollups.totals("daily", now=1_700_000_000) == (2, 1)
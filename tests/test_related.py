@@ -0,0 +1,69 @@
+import numpy as np
+
+from related import RelatedIndex, card_checksum, related_index_path
+
+CARDS = [
+    {"id": "lists", "question": "How do you append to a Python list?", "answer": "list.append(item)"},
+    {"id": "dicts", "question": "How do you read a Python dict key safely?", "answer": "dict.get(key)"},
+    {"id": "sets", "question": "How do you add to a Python set?", "answer": "set.add(item)"},
+    {"id": "bread", "question": "What makes bread dough rise?", "answer": "Yeast"},
+]
+
+def built(cards, path=None):
+    index = RelatedIndex(path)
+    index.rebuild(cards)
+    index.wait()
+    return index
+
+def test_related_cards_are_ranked_by_shared_terms():
+    index = built(CARDS)
+    assert index.ready
+    matches = index.related(["lists", "bread", "unknown"])
+    assert set(matches) == {"lists", "bread"}
+    ranked = [card_id for card_id, _ in matches["lists"]]
+    assert ranked[0] == "sets" and "lists" not in ranked and "bread" not in ranked
+    scores = [score for _, score in matches["lists"]]
+    assert scores == sorted(scores, reverse=True) and 0 < scores[-1] <= 1
+    assert matches["bread"] == []
+    assert len(index.related(["lists"], k=1)["lists"]) == 1
+
+def test_removed_cards_drop_out_of_results_before_the_next_build():
+    index = built(CARDS)
+    matrix = index.matrix
+    index.remove("sets")
+    index.wait()
+    assert "sets" not in index.matrix.row_of
+    index.matrix = matrix  # as queries see it while the worker is still building
+    assert "sets" not in [card_id for card_id, _ in index.related(["lists"])["lists"]]
+
+def test_vectors_persist_and_only_edited_cards_are_retokenized(workdir):
+    path = related_index_path(str(workdir / "deck.json"))
+    assert path.endswith("deck.related.npz")
+    index = built(CARDS, path)
+    index.save()
+    assert not index.changed
+
+    reopened = RelatedIndex(path)
+    assert reopened.vectors.keys() == index.vectors.keys() and reopened.vocabulary == index.vocabulary
+    for card_id, (checksum, terms, counts) in index.vectors.items():
+        assert reopened.vectors[card_id][0] == checksum
+        assert np.array_equal(reopened.vectors[card_id][1], terms)
+        assert np.array_equal(reopened.vectors[card_id][2], counts)
+
+    tokenized = []
+    vectorize = reopened._vectorize
+    reopened._vectorize = lambda card: tokenized.append(card["id"]) or vectorize(card)
+    edited = [dict(card) for card in CARDS]
+    edited[3]["answer"] = "Yeast, a Python-free fungus"
+    edited[0]["tags"] = ["python"]
+    reopened.rebuild(edited)
+    reopened.wait()
+    assert tokenized == ["bread"] and reopened.vectors["bread"][0] == card_checksum(edited[3])
+    assert reopened.related(["lists"]) == built(edited).related(["lists"])
+
+def test_unreadable_index_file_is_ignored(workdir):
+    path = str(workdir / "broken.related.npz")
+    with open(path, "wb") as f:
+        f.write(b"not an npz file")
+    index = RelatedIndex(path)
+    assert index.vectors == {} and not index.ready
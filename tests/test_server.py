@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+from data import load_data, make_card
+from deck import Deck
+from rollups import Rollups, rollups_path
+from server import ClassroomServer, MAX_LATENCY_S, SERVER_INDEXES, users_file
+
+async def request(reader, writer, method, path, body=None):
+    payload = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(payload)}\r\n\r\n".encode()
+                 + payload)
+    headers = await reader.readuntil(b"\r\n\r\n")
+    status = int(headers.split(b" ")[1])
+    length = int(next(line.split(b":")[1] for line in headers.split(b"\r\n")
+                      if line.lower().startswith(b"content-length")))
+    return status, json.loads(await reader.readexactly(length))
+
+async def study(path, known):
+    server = ClassroomServer(Deck.open(path, indexes=SERVER_INDEXES), flush_interval=0.05)
+    listener = await server.start("127.0.0.1", 0)
+    reader, writer = await asyncio.open_connection("127.0.0.1", listener.sockets[0].getsockname()[1])
+    try:
+        status, session = await request(reader, writer, "POST", "/api/sessions", {"user": "ada", "length": 3})
+        assert status == 201 and session["total"] == 3
+        answers = []
+        while not session["finished"]:
+            answer = known.get(session["card"]["question"], "wrong")
+            status, result = await request(reader, writer, "POST", f"/api/sessions/{session['id']}/answer",
+                                           {"answer": answer, "latency": 1.0})
+            assert status == 200
+            answers.append(result["correct"])
+            session = result["session"]
+        status, user = await request(reader, writer, "GET", "/api/users/ada")
+        assert status == 200 and user["stats"] == {"correct": sum(answers), "total": 3}
+        status, _ = await request(reader, writer, "GET", "/api/sessions/missing")
+        assert status == 404
+    finally:
+        writer.close()
+        await server.stop()
+    return answers
+
+def test_sessions_and_answers_are_persisted(workdir):
+    path = str(workdir / "class.json")
+    cards = [make_card(f"What is {i}+{i} ?", str(i + i)) for i in range(4)] + [make_card("Capital of Peru?", "Lima")]
+    Deck(load_data(path, cards), path).save(overwrite=True)
+    answers = asyncio.run(study(path, {card["question"]: card["answer"] for card in cards[:4]}))
+    saved = load_data(path, [])
+    assert saved["stats"]["total"] == 3 and saved["stats"]["correct"] == sum(answers)
+    assert sum(stats["attempts"] for stats in saved["card_stats"].values()) == 3
+    with open(users_file(path), encoding="utf-8") as f:
+        assert json.load(f)["ada"]["stats"]["total"] == 3
+    assert Rollups(rollups_path(path)).totals()[0] == 3
+
+async def send_invalid(path):
+    server = ClassroomServer(Deck.open(path, indexes=SERVER_INDEXES), flush_interval=0.05)
+    listener = await server.start("127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        _, session = await request(reader, writer, "POST", "/api/sessions", {"user": "eve", "length": 2})
+        answer_path = f"/api/sessions/{session['id']}/answer"
+        for latency in (float("nan"), float("inf"), -1.0, "slow"):
+            status, result = await request(reader, writer, "POST", answer_path, {"answer": "x", "latency": latency})
+            assert status == 400 and "latency" in result["error"]
+        status, result = await request(reader, writer, "POST", answer_path, {"answer": "x", "latency": 1e9})
+        assert status == 200 and result["session"]["index"] == 1
+        status, _ = await request(reader, writer, "GET", f"/api/sessions/{session['id']}")
+        assert status == 200
+    finally:
+        writer.close()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(b"POST /api/sessions HTTP/1.1\r\nHost: localhost\r\nContent-Length: -1\r\n\r\n")
+        assert (await reader.readline()).startswith(b"HTTP/1.1 400")
+    finally:
+        writer.close()
+        await server.stop()
+
+def test_invalid_latency_and_negative_content_length_are_rejected(workdir):
+    path = str(workdir / "class.json")
+    Deck(load_data(path, [make_card("Capital of Peru?", "Lima")]), path).save(overwrite=True)
+    asyncio.run(send_invalid(path))
+    saved = load_data(path, [])
+    assert saved["stats"]["total"] == 1
+    assert [stats["latency"] for stats in saved["card_stats"].values()] == [MAX_LATENCY_S]
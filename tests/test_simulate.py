@@ -0,0 +1,11 @@
+import random
+
+from simulate import FORGETTING_CURVES, Learner
+
+def test_lapse_never_raises_stability_of_a_hard_card():
+    learner = Learner(random.Random(0), FORGETTING_CURVES["exponential"], {"hard": 2.0})
+    learner.review("hard", 0)
+    learned = learner.stability["hard"]
+    learner.rng.random = lambda: 1.0  # always forgets
+    learner.review("hard", 3600)
+    assert learner.stability["hard"] == learned == learner.initial_stability("hard")
@@ -0,0 +1,29 @@
+import io
+import wave
+
+import pytest
+
+import sound
+from sound import CUES, NullSoundBackend, init_sound, play_sound, set_sound_enabled, sound_engine, synthesize
+
+@pytest.fixture
+def null_sound(monkeypatch):
+    monkeypatch.setenv("CODECARD_SOUND", "null")
+    monkeypatch.setattr(sound, "_ENGINE", sound.SoundEngine(NullSoundBackend(), enabled=False))
+    init_sound(True)
+    return sound_engine().backend
+
+def test_null_backend_counts_cues_while_enabled(null_sound):
+    assert isinstance(null_sound, NullSoundBackend)
+    play_sound("correct")
+    play_sound("correct")
+    play_sound("wrong")
+    set_sound_enabled(False)
+    play_sound("time_up")
+    assert null_sound.played == {"correct": 2, "wrong": 1, "time_up": 0}
+
+def test_cues_synthesize_to_mono_wav():
+    for notes in CUES.values():
+        with wave.open(io.BytesIO(synthesize(notes))) as f:
+            assert (f.getnchannels(), f.getsampwidth(), f.getframerate()) == (1, 2, sound.SAMPLE_RATE)
+            assert f.getnframes() == sum(int(sound.SAMPLE_RATE * seconds) for _, seconds in notes)
@@ -0,0 +1,49 @@
+import pytest
+
+from tags import TagIndex, normalize_tags
+
+def card(card_id, *tags):
+    return {"id": card_id, "tags": list(tags)}
+
+@pytest.fixture
+def index():
+    return TagIndex([card("a", "python", "web"), card("b", "python"), card("c", "sql", "web"), card("d")])
+
+@pytest.mark.parametrize("expression, expected", [
+    ("", ["a", "b", "c", "d"]),
+    ("python", ["a", "b"]),
+    ("Python AND web", ["a"]),
+    ("python web", ["a"]),
+    ("python or sql", ["a", "b", "c"]),
+    ("NOT web", ["b", "d"]),
+    ("python NOT web", ["b"]),
+    ("NOT NOT sql", ["c"]),
+    ("sql OR python AND web", ["a", "c"]),
+    ("(sql OR python) AND web", ["a", "c"]),
+    ("(sql OR python) NOT (web AND sql)", ["a", "b"]),
+    ("missing OR sql", ["c"]),
+])
+def test_query_combines_tags(index, expression, expected):
+    assert sorted(index.select(expression)) == expected
+
+@pytest.mark.parametrize("expression", ["(python", "python)", "AND web", "python OR", "NOT", "()", "web AND OR sql"])
+def test_malformed_queries_raise_value_error(index, expression):
+    with pytest.raises(ValueError):
+        index.query(expression)
+
+def test_incremental_changes_match_a_rebuild(index):
+    index.remove("b")
+    index.add(card("e", "rust", "web"))
+    assert index.slots["e"] == 1  # the slot b freed is reused
+    cards = {"a": card("a", "web"), "c": card("c", "sql", "web"), "d": card("d", "sql"), "e": card("e", "rust", "web"),
+             "f": card("f", "python")}
+    index.update_many([cards["a"], cards["d"], cards["f"]], list(cards.values()))
+    fresh = TagIndex(list(cards.values()))
+    assert index.tag_counts() == fresh.tag_counts() == {"rust": 1, "sql": 2, "web": 3, "python": 1}
+    for expression in ("web", "sql OR rust", "NOT web", "python", ""):
+        assert sorted(index.select(expression)) == sorted(fresh.select(expression))
+    assert index.contains(index.query("sql"), "d") and not index.contains(index.query("sql"), "b")
+
+def test_normalize_tags_dedupes_and_joins_words():
+    assert normalize_tags(" Web Dev, python,web dev,, ") == ["web-dev", "python"]
+    assert normalize_tags("solo") == normalize_tags(["Solo", "SOLO"]) == ["solo"]